@@ -0,0 +1,26 @@
+"""
+Application layer - Game rules, commands and the headless engine
+Drives the domain model without any UI
+"""
+
+from .scheduler import Scheduler, Task
+from .events import (
+    Event, EventBus, EventBatch, PlayerMovedEvent, PlayerAttackEvent,
+    CreatureAttackEvent, CreatureKilledEvent, ItemPickedUpEvent, ItemUsedEvent,
+    LevelChangedEvent, PlayerFaintedEvent, HeartbeatEvent, GameOverEvent
+)
+from .heartbeat import Heartbeat, HEART_SOUNDS
+from .creature_ai import CreaturePlanner, LevelPlan
+from .game_engine import GameEngine, GameStats, Action
+from .autoplay import ExplorerBot
+
+__all__ = [
+    'Scheduler', 'Task',
+    'Event', 'EventBus', 'EventBatch', 'PlayerMovedEvent', 'PlayerAttackEvent',
+    'CreatureAttackEvent', 'CreatureKilledEvent', 'ItemPickedUpEvent', 'ItemUsedEvent',
+    'LevelChangedEvent', 'PlayerFaintedEvent', 'HeartbeatEvent', 'GameOverEvent',
+    'Heartbeat', 'HEART_SOUNDS',
+    'CreaturePlanner', 'LevelPlan',
+    'GameEngine', 'GameStats', 'Action',
+    'ExplorerBot'
+]
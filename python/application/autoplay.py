@@ -0,0 +1,120 @@
+"""
+Autoplay - Scripted bot for headless games
+Plays well enough to produce meaningful statistics for balance work
+"""
+
+from typing import Dict, Optional, Tuple
+
+from domain.dungeon import CellType
+from domain.item import ItemType
+from domain.value_objects import Direction
+from .game_engine import Action, GameEngine, flood_distances
+
+# Rest until the heart rate recovers to this HEARTR value
+REST_HEART_RATE = 12
+
+# Hunt creatures within this many steps instead of heading downstairs
+HUNT_RADIUS = 6
+
+# Distance maps kept per (level, goal) before the cache is flushed
+PATH_CACHE_SIZE = 64
+
+
+class ExplorerBot:
+    """
+    Greedy policy: fight what is here, pick up what is here, keep a torch
+    lit, rest when exhausted and otherwise walk toward prey or the stairs.
+    """
+
+    def __init__(self, hunt_radius: int = HUNT_RADIUS, rest_heart_rate: int = REST_HEART_RATE):
+        self.hunt_radius = hunt_radius
+        self.rest_heart_rate = rest_heart_rate
+        self._stairs: Dict[int, Optional[Tuple[int, int]]] = {}
+        self._paths: Dict[Tuple[int, Tuple[int, int]], Dict[Tuple[int, int], int]] = {}
+        self._engine: Optional[GameEngine] = None
+
+    def __call__(self, engine: GameEngine) -> Action:
+        if engine is not self._engine:
+            self._engine = engine
+            self._stairs.clear()
+            self._paths.clear()
+
+        player = engine.player
+        position = player.position
+
+        if engine.creature_at(position) is not None:
+            return Action.ATTACK
+        if engine.heart_rate < self.rest_heart_rate:
+            if engine.damage * 2 > engine.power and self._has(engine, "heal"):
+                return Action.USE_FLASK
+            return Action.WAIT
+        if engine.floor_items.get(position):
+            return Action.GET
+        if engine.light == 0 and self._has_torch(engine):
+            return Action.USE_TORCH
+        if engine.dungeon.get_cell(position).cell_type == CellType.STAIRS_DOWN:
+            return Action.CLIMB
+
+        goal = self._goal(engine)
+        if goal is None:
+            return Action.WAIT
+        return self._walk_toward(engine, goal)
+
+    def _has(self, engine: GameEngine, prop: str) -> bool:
+        return any(prop in item.template.properties for item in engine.player.backpack)
+
+    def _has_torch(self, engine: GameEngine) -> bool:
+        return any(item.item_type == ItemType.TORCH and item.properties["remaining"] > 0
+                   for item in engine.player.backpack)
+
+    def _goal(self, engine: GameEngine) -> Optional[Tuple[int, int]]:
+        """Nearest creature within the hunt radius, otherwise the stairs"""
+        position = engine.player.position
+        depth = position.level
+
+        prey = [
+            (position.distance_to(c.position), (c.position.row, c.position.col))
+            for c in engine.creatures.get(depth, ())
+            if c.is_active
+        ]
+        if prey:
+            dist, cell = min(prey)
+            if dist <= self.hunt_radius or depth == engine.num_levels - 1:
+                return cell
+
+        if depth not in self._stairs:
+            self._stairs[depth] = next(
+                (rc for rc, cell in engine.level.cells.items()
+                 if cell.cell_type == CellType.STAIRS_DOWN), None
+            )
+        return self._stairs[depth]
+
+    def _walk_toward(self, engine: GameEngine, goal: Tuple[int, int]) -> Action:
+        """Turn toward, or step along, the shortest path to goal"""
+        position = engine.player.position
+        key = (position.level, goal)
+        distances = self._paths.get(key)
+        if distances is None:
+            if len(self._paths) >= PATH_CACHE_SIZE:
+                self._paths.clear()
+            distances = self._paths[key] = flood_distances(engine.level, goal)
+
+        here = distances.get((position.row, position.col))
+        if here is None:
+            return Action.WAIT
+
+        for direction in Direction:
+            step = position.move(direction)
+            if distances.get((step.row, step.col), here) < here:
+                return self._face(engine.player.direction, direction)
+        return Action.WAIT
+
+    @staticmethod
+    def _face(facing: Direction, wanted: Direction) -> Action:
+        if facing == wanted:
+            return Action.MOVE
+        if facing.turn_around() == wanted:
+            return Action.MOVE_BACK
+        if facing.turn_left() == wanted:
+            return Action.TURN_LEFT
+        return Action.TURN_RIGHT
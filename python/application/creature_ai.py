@@ -0,0 +1,146 @@
+"""
+Creature AI - Port of the CMOVE decision logic in creature.cpp
+Per-level planning data is computed once and shared by every creature move
+"""
+
+import random
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from domain.creature import Creature
+from domain.dungeon import Dungeon, Level
+from domain.value_objects import Direction
+
+Cell = Tuple[int, int]
+
+AGGRESSIVE = "aggressive"
+PATROL = "patrol"
+DEFENSIVE = "defensive"
+
+# Defensive creatures only leave their post for a player this close
+DEFEND_RADIUS = 4
+
+# Player-centric maps kept per level; forks exploring different moves
+# from the same position hit the same entries
+PLAYER_CACHE_SIZE = 8
+
+_DELTAS = {direction: direction.to_delta() for direction in Direction}
+
+
+class LevelPlan:
+    """
+    Shared planning data for one level layout
+    Passable neighbours are fixed for the life of the level. Sight lines
+    and the walking-distance field depend only on the player's cell, so
+    each is computed once per player position and reused by every
+    creature, whichever engine (or fork) asks.
+    """
+
+    def __init__(self, level: Level):
+        # neighbors[cell] = ((direction, next_cell), ...) in Direction order
+        self.neighbors: Dict[Cell, Tuple[Tuple[Direction, Cell], ...]] = {}
+        cells = level.cells
+        for (row, col), cell in cells.items():
+            if not cell.is_passable:
+                continue
+            steps = []
+            for direction, (drow, dcol) in _DELTAS.items():
+                nxt = (row + drow, col + dcol)
+                neighbor = cells.get(nxt)
+                if neighbor is not None and neighbor.is_passable:
+                    steps.append((direction, nxt))
+            self.neighbors[(row, col)] = tuple(steps)
+        self._sight: Dict[Cell, Dict[Cell, Direction]] = {}
+        self._distances: Dict[Cell, Dict[Cell, int]] = {}
+
+    def sight(self, player: Cell) -> Dict[Cell, Direction]:
+        """Cells with an open row/column line to the player, mapped to the
+        direction that leads toward the player"""
+        seen = self._sight.get(player)
+        if seen is None:
+            if len(self._sight) >= PLAYER_CACHE_SIZE:
+                self._sight.clear()
+            seen = self._sight[player] = {}
+            neighbors = self.neighbors
+            for direction, (drow, dcol) in _DELTAS.items():
+                toward = direction.turn_around()
+                row, col = player
+                while True:
+                    nxt = (row + drow, col + dcol)
+                    if nxt not in neighbors:
+                        break
+                    seen[nxt] = toward
+                    row, col = nxt
+        return seen
+
+    def distances(self, player: Cell) -> Dict[Cell, int]:
+        """Walking distance from the player to every reachable cell"""
+        field = self._distances.get(player)
+        if field is None:
+            if len(self._distances) >= PLAYER_CACHE_SIZE:
+                self._distances.clear()
+            field = self._distances[player] = {player: 0}
+            neighbors = self.neighbors
+            frontier = [player]
+            step = 0
+            while frontier:
+                step += 1
+                next_frontier = []
+                for cell in frontier:
+                    for _, nxt in neighbors.get(cell, ()):
+                        if nxt not in field:
+                            field[nxt] = step
+                            next_frontier.append(nxt)
+                frontier = next_frontier
+        return field
+
+
+class CreaturePlanner:
+    """Chooses creature moves using the shared LevelPlan of their level"""
+
+    def __init__(self):
+        self._plans: Dict[Tuple[UUID, int], LevelPlan] = {}
+
+    def plan(self, dungeon: Dungeon, depth: int) -> LevelPlan:
+        """LevelPlan for a level; cell types never change, so it is built once"""
+        key = (dungeon.id, depth)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = LevelPlan(dungeon.levels[depth])
+        return plan
+
+    def choose(self, plan: LevelPlan, creature: Creature, behavior: str, player: Cell,
+               occupancy: Counter, rng: random.Random) -> Optional[Direction]:
+        """Direction the creature steps next, or None to stay put"""
+        here = (creature.position.row, creature.position.col)
+        toward = plan.sight(player).get(here)
+
+        if behavior == DEFENSIVE:
+            distances = plan.distances(player)
+            distance = distances.get(here)
+            if distance is None or distance > DEFEND_RADIUS:
+                return None
+            for direction, nxt in plan.neighbors[here]:
+                if distances.get(nxt, distance) < distance and (nxt == player or not occupancy[nxt]):
+                    return direction
+            return None
+
+        if toward is not None:
+            return toward
+
+        if behavior == PATROL:
+            # Keep walking the current heading; pick a new corridor at walls
+            options = [(d, nxt) for d, nxt in plan.neighbors[here] if not occupancy[nxt]]
+            for direction, _ in options:
+                if direction == creature.direction:
+                    return direction
+            back = creature.direction.turn_around()
+            forward = [d for d, _ in options if d != back]
+            if forward:
+                return rng.choice(forward)
+            return back if options else None
+
+        # Aggressive (CMOVE): unseen players leave the creature wandering
+        options = [direction for direction, _ in plan.neighbors[here]]
+        return rng.choice(options) if options else None
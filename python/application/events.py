@@ -0,0 +1,288 @@
+"""
+Event system - Typed events and a batched, allocation-free EventBus
+Game logic claims preallocated event records; subscribers receive them in
+per-type batches when the bus is flushed once per tick
+"""
+
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Type
+from uuid import UUID
+
+from domain.value_objects import Position
+
+# Records preallocated per event type; a full ring is dispatched early
+DEFAULT_RING_CAPACITY = 256
+
+
+class Event:
+    """Base event - every record carries the game time it happened at"""
+    __slots__ = ('timestamp',)
+
+    def __init__(self, timestamp: int = 0):
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name, None)!r}" for name in self.field_names())
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def field_names(cls) -> List[str]:
+        """Every slot from the base class down, in declaration order"""
+        names: List[str] = []
+        for klass in reversed(cls.__mro__):
+            names.extend(klass.__dict__.get('__slots__', ()))
+        return names
+
+
+class PlayerMovedEvent(Event):
+    __slots__ = ('from_position', 'to_position')
+
+    def __init__(self, timestamp: int = 0, from_position: Optional[Position] = None,
+                 to_position: Optional[Position] = None):
+        super().__init__(timestamp)
+        self.from_position = from_position
+        self.to_position = to_position
+
+
+class PlayerAttackEvent(Event):
+    __slots__ = ('creature_id', 'hit', 'damage')
+
+    def __init__(self, timestamp: int = 0, creature_id: Optional[UUID] = None,
+                 hit: bool = False, damage: int = 0):
+        super().__init__(timestamp)
+        self.creature_id = creature_id
+        self.hit = hit
+        self.damage = damage
+
+
+class CreatureAttackEvent(Event):
+    __slots__ = ('creature_id', 'hit', 'damage')
+
+    def __init__(self, timestamp: int = 0, creature_id: Optional[UUID] = None,
+                 hit: bool = False, damage: int = 0):
+        super().__init__(timestamp)
+        self.creature_id = creature_id
+        self.hit = hit
+        self.damage = damage
+
+
+class CreatureKilledEvent(Event):
+    __slots__ = ('creature_id', 'position')
+
+    def __init__(self, timestamp: int = 0, creature_id: Optional[UUID] = None,
+                 position: Optional[Position] = None):
+        super().__init__(timestamp)
+        self.creature_id = creature_id
+        self.position = position
+
+
+class ItemPickedUpEvent(Event):
+    __slots__ = ('item_id', 'position')
+
+    def __init__(self, timestamp: int = 0, item_id: Optional[UUID] = None,
+                 position: Optional[Position] = None):
+        super().__init__(timestamp)
+        self.item_id = item_id
+        self.position = position
+
+
+class ItemUsedEvent(Event):
+    __slots__ = ('item_id',)
+
+    def __init__(self, timestamp: int = 0, item_id: Optional[UUID] = None):
+        super().__init__(timestamp)
+        self.item_id = item_id
+
+
+class LevelChangedEvent(Event):
+    __slots__ = ('from_level', 'to_level')
+
+    def __init__(self, timestamp: int = 0, from_level: int = 0, to_level: int = 0):
+        super().__init__(timestamp)
+        self.from_level = from_level
+        self.to_level = to_level
+
+
+class PlayerFaintedEvent(Event):
+    __slots__ = ('fainted',)
+
+    def __init__(self, timestamp: int = 0, fainted: bool = False):
+        super().__init__(timestamp)
+        self.fainted = fainted
+
+
+class HeartbeatEvent(Event):
+    """The heart sounds; sound indexes heartbeat.HEART_SOUNDS"""
+    __slots__ = ('sound', 'rate')
+
+    def __init__(self, timestamp: int = 0, sound: int = 0, rate: int = 0):
+        super().__init__(timestamp)
+        self.sound = sound
+        self.rate = rate
+
+
+class GameOverEvent(Event):
+    __slots__ = ('won',)
+
+    def __init__(self, timestamp: int = 0, won: bool = False):
+        super().__init__(timestamp)
+        self.won = won
+
+
+EventHandler = Callable[['EventBatch'], None]
+
+
+class EventBatch:
+    """Read-only view of the records dispatched for one event type
+
+    Records are reused after the handler returns; copy anything that
+    must outlive the call.
+    """
+    __slots__ = ('records', 'count')
+
+    def __init__(self):
+        self.records: List[Event] = []
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Event]:
+        return islice(self.records, self.count)
+
+    def __getitem__(self, index: int) -> Event:
+        if not -self.count <= index < self.count:
+            raise IndexError("event batch index out of range")
+        return self.records[index % self.count]
+
+
+class EventRing:
+    """Double-buffered pool of preallocated records for one event type"""
+    __slots__ = ('event_type', 'capacity', 'front', 'back', 'count',
+                 'scratch', 'handlers', 'batch', 'dispatching')
+
+    def __init__(self, event_type: Type[Event], capacity: int):
+        self.event_type = event_type
+        self.capacity = capacity
+        self.front = [event_type() for _ in range(capacity)]
+        self.back = [event_type() for _ in range(capacity)]
+        self.count = 0
+        self.scratch = event_type()  # claimed when nobody is listening
+        self.handlers: List[EventHandler] = []
+        self.batch = EventBatch()
+        self.dispatching = False
+
+
+class EventBus:
+    """
+    Publish/subscribe hub with per-type handler tables
+    Each concrete event type gets a ring whose handler list is resolved
+    through the type's MRO when subscriptions change, so dispatch never
+    inspects event types. Nothing is allocated per event.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY,
+                 on_pending: Optional[Callable[[], None]] = None):
+        self.capacity = capacity
+        # Called when the first deliverable event after a flush is claimed,
+        # so an owner of many buses can flush only the busy ones
+        self.on_pending = on_pending
+        self._subscribers: Dict[type, List[EventHandler]] = {}
+        self._rings: Dict[type, EventRing] = {}
+        self._pending: List[EventRing] = []
+
+    def subscribe(self, event_type: Type[Event], handler: EventHandler) -> None:
+        """Register a batch handler for event_type and its subclasses"""
+        self._subscribers.setdefault(event_type, []).append(handler)
+        self._resolve_handlers()
+
+    def unsubscribe(self, event_type: Type[Event], handler: EventHandler) -> None:
+        """Remove a previously registered handler"""
+        handlers = self._subscribers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            self._resolve_handlers()
+
+    def has_subscribers(self, event_type: Type[Event]) -> bool:
+        """True when claiming event_type would deliver to someone"""
+        return bool(self._ring(event_type).handlers)
+
+    def claim(self, event_type: Type[Event], timestamp: int) -> Event:
+        """Reserve the next record for event_type and stamp it
+
+        The caller fills in the remaining fields. This is the hot path
+        used by game logic.
+        """
+        ring = self._rings.get(event_type) or self._ring(event_type)
+        if not ring.handlers:
+            record = ring.scratch
+        else:
+            count = ring.count
+            if count == 0:
+                if not self._pending and self.on_pending is not None:
+                    self.on_pending()
+                self._pending.append(ring)
+            elif count == ring.capacity:
+                if ring.dispatching:
+                    # A handler is re-publishing its own type mid-dispatch
+                    ring.front.extend(event_type() for _ in range(ring.capacity))
+                    ring.back.extend(event_type() for _ in range(ring.capacity))
+                    ring.capacity *= 2
+                else:
+                    self._dispatch(ring)
+                    count = 0
+            ring.count = count + 1
+            record = ring.front[count]
+        record.timestamp = timestamp
+        return record
+
+    def publish(self, event: Event) -> None:
+        """Copy an already-built event into the bus"""
+        record = self.claim(type(event), event.timestamp)
+        for name in event.field_names():
+            setattr(record, name, getattr(event, name))
+
+    def flush(self) -> int:
+        """Deliver every pending batch, returns events dispatched"""
+        pending = self._pending
+        delivered = 0
+        index = 0
+        # Handlers may publish while we flush; those land in the same pass
+        while index < len(pending):
+            ring = pending[index]
+            index += 1
+            if ring.count:
+                delivered += ring.count
+                self._dispatch(ring)
+        pending.clear()
+        return delivered
+
+    def _dispatch(self, ring: EventRing) -> None:
+        batch = ring.batch
+        batch.records, batch.count = ring.front, ring.count
+        ring.front, ring.back = ring.back, ring.front
+        ring.count = 0
+        ring.dispatching = True
+        try:
+            for handler in ring.handlers:
+                handler(batch)
+        finally:
+            ring.dispatching = False
+
+    def _ring(self, event_type: Type[Event]) -> EventRing:
+        ring = self._rings.get(event_type)
+        if ring is None:
+            ring = self._rings[event_type] = EventRing(event_type, self.capacity)
+            ring.handlers = self._handlers_for(event_type)
+        return ring
+
+    def _handlers_for(self, event_type: Type[Event]) -> List[EventHandler]:
+        return [
+            handler
+            for klass in event_type.__mro__
+            for handler in self._subscribers.get(klass, ())
+        ]
+
+    def _resolve_handlers(self) -> None:
+        for event_type, ring in self._rings.items():
+            ring.handlers = self._handlers_for(event_type)
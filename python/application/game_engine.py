@@ -0,0 +1,968 @@
+"""
+Game engine - Headless port of the dodgame.cpp main loop
+Runs a complete seeded game on the domain model, driven by the scheduler
+"""
+
+import copy
+import random
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from enum import IntEnum
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from config.game_config import GameConfig, DEFAULT_CONFIG, CreatureStats
+from domain.combat import (
+    CombatService, offense_factor, defense_factor, exertion,
+    EMPTY_HAND_MAGIC_OFFENSE, EMPTY_HAND_PHYS_OFFENSE, NO_SHIELD_FACTOR
+)
+from domain.creature import Creature, CreatureType
+from domain.dungeon import Dungeon, Level, Cell, CellType, create_standard_level
+from domain.item import Item, ItemTemplate, ItemType, FLASK
+from domain.player import Player, PlayerDeathException
+from domain.value_objects import Position, Direction, Health
+from game_constants import ITEMS, MovementCosts, CombatMechanics
+from .creature_ai import CreaturePlanner
+from .events import (
+    EventBus, PlayerMovedEvent, PlayerAttackEvent, CreatureAttackEvent,
+    CreatureKilledEvent, ItemPickedUpEvent, ItemUsedEvent, LevelChangedEvent,
+    PlayerFaintedEvent, HeartbeatEvent, GameOverEvent
+)
+from .heartbeat import (
+    Heartbeat, heart_rate, beat_delay, FAINT_RATE, RECOVER_RATE, RECOVERY_FLOOR
+)
+from .scheduler import Scheduler, Task
+
+# Carried weight before any objects (POBJWT at game start)
+BASE_WEIGHT = 35
+
+# Torch burn task period (TID_TORCHBURN)
+TORCH_TICK_MS = 1000
+
+# Engine attributes a snapshot carries; everything else is rebuilt on restore
+SNAPSHOT_FIELDS = (
+    "config", "seed", "num_levels", "level_size", "rng", "stats", "won", "dead",
+    "busy_until", "dungeon", "player", "creatures", "floor_items", "torch",
+    "reveal_count", "_occupied", "_heart_idle", "_saved_time", "_saved_sound",
+    "_saved_tasks",
+)
+
+
+class Action(IntEnum):
+    """Player actions understood by the engine"""
+    WAIT = 0
+    MOVE = 1
+    MOVE_BACK = 2
+    TURN_LEFT = 3
+    TURN_RIGHT = 4
+    TURN_AROUND = 5
+    ATTACK = 6
+    GET = 7
+    USE_TORCH = 8
+    USE_FLASK = 9
+    CLIMB = 10
+
+
+# Milliseconds each action keeps the player busy
+ACTION_TIME = {
+    Action.WAIT: 250,
+    Action.MOVE: MovementCosts.MOVE_FORWARD,
+    Action.MOVE_BACK: MovementCosts.MOVE_BACKWARD,
+    Action.TURN_LEFT: MovementCosts.TURN,
+    Action.TURN_RIGHT: MovementCosts.TURN,
+    Action.TURN_AROUND: MovementCosts.TURN,
+    Action.ATTACK: int(CombatMechanics.ATTACK_COOLDOWN * 1000),
+    Action.GET: 500,
+    Action.USE_TORCH: 500,
+    Action.USE_FLASK: 500,
+    Action.CLIMB: MovementCosts.CLIMB,
+}
+
+
+@dataclass
+class GameStats:
+    """Counters collected while a game runs"""
+    creatures_killed: int = 0
+    attacks: int = 0
+    hits: int = 0
+    damage_taken: int = 0
+    items_picked: int = 0
+    torches_used: int = 0
+    flasks_used: int = 0
+    deepest_level: int = 0
+
+
+def generate_level(rng: random.Random, depth: int, size: int = 32,
+                   start: Tuple[int, int] = (17, 11), final: bool = False) -> Level:
+    """Carve a maze level with a recursive backtracker
+
+    Corridor nodes sit on odd coordinates so every level shares the same
+    node grid and a climb always lands on an open cell.
+    """
+    level = create_standard_level(depth, size, size)
+    last = size - 2 if size % 2 == 0 else size - 1
+
+    stack = [start]
+    level.set_cell(start[0], start[1], Cell(CellType.FLOOR))
+    visited = {start}
+    while stack:
+        row, col = stack[-1]
+        options = [
+            (row + drow, col + dcol)
+            for drow, dcol in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 1 <= row + drow <= last and 1 <= col + dcol <= last
+            and (row + drow, col + dcol) not in visited
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nrow, ncol = rng.choice(options)
+        level.set_cell((row + nrow) // 2, (col + ncol) // 2, Cell(CellType.FLOOR))
+        level.set_cell(nrow, ncol, Cell(CellType.FLOOR))
+        visited.add((nrow, ncol))
+        stack.append((nrow, ncol))
+
+    # Knock out a few walls so the maze has loops
+    for _ in range(size):
+        row, col = rng.randrange(1, last), rng.randrange(1, last)
+        if (row + col) % 2 == 1:
+            level.set_cell(row, col, Cell(CellType.FLOOR))
+
+    if not final:
+        distances = flood_distances(level, start)
+        far = max(distances, key=lambda rc: (distances[rc], rc))
+        level.set_cell(far[0], far[1], Cell(CellType.STAIRS_DOWN))
+
+    return level
+
+
+def flood_distances(level: Level, origin: Tuple[int, int]) -> Dict[Tuple[int, int], int]:
+    """Breadth-first walking distance from origin to every reachable cell"""
+    distances = {origin: 0}
+    frontier = [origin]
+    cells = level.cells
+    while frontier:
+        next_frontier = []
+        for row, col in frontier:
+            step = distances[(row, col)] + 1
+            for nxt in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if nxt in distances:
+                    continue
+                cell = cells.get(nxt)
+                if cell is not None and cell.is_passable:
+                    distances[nxt] = step
+                    next_frontier.append(nxt)
+        frontier = next_frontier
+    return distances
+
+
+class GameEngine:
+    """
+    Headless game session
+    Owns the dungeon, player and creatures for one seeded game. Player
+    actions run immediately; creatures, torches and recovery run as
+    scheduler tasks exactly like the TCBs in sched.cpp. Everything that
+    happens is claimed on the event bus and flushed once per step.
+    """
+
+    def __init__(self, config: GameConfig = DEFAULT_CONFIG, seed: int = 0,
+                 num_levels: int = 5, level_size: int = 32,
+                 scheduler: Optional[Scheduler] = None,
+                 event_bus: Optional[EventBus] = None):
+        self.config = config
+        self.seed = seed
+        self.num_levels = num_levels
+        self.level_size = level_size
+        self.rng = random.Random(seed)
+        self.combat = CombatService(self.rng)
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.events = event_bus if event_bus is not None else EventBus()
+        self.stats = GameStats()
+
+        self.won = False
+        self.dead = False
+        self.busy_until = self.scheduler.cur_time
+
+        self._build_templates()
+        self._build_dungeon()
+
+        power = config.player.starting_power
+        self.player = Player(position=self.dungeon.entrance, health=Health(power, power),
+                             scheduler=self.scheduler)
+        self.player.right_hand = self._new_item(self.weapon_templates[0])
+        self.player.backpack.append(self._new_item(self.torch_templates[0]))
+        self.torch: Optional[Item] = None
+
+        # Copy-on-write bookkeeping; see fork()
+        self._shared_levels: Set[int] = set()
+        self._shared_creatures: Set[int] = set()
+        self._floor_items_shared = False
+
+        # Cells _reveal has uncovered so far; lets observers skip rescans
+        self.reveal_count = 0
+        # Objects told of each batch of cells _reveal uncovers, through
+        # cells_revealed(depth, cells); held weakly, so they drop out on their own
+        self.reveal_observers: "weakref.WeakSet" = weakref.WeakSet()
+
+        # Move planning data shared by all creatures (and forks) per level
+        self.ai = CreaturePlanner()
+        # Active creatures per cell on the player's level
+        self._occupied: Counter = Counter()
+
+        self._creature_tasks: Dict[UUID, Task] = {}
+        self._tasks: List[Task] = [
+            self.scheduler.schedule(self._heart_delay(), self._heart_slow),
+            self.scheduler.schedule(TORCH_TICK_MS, self._torch_burn),
+        ]
+        # (next run, period) while HSLOW is parked with nothing to recover
+        self._heart_idle: Optional[Tuple[int, int]] = None
+        # Audible beats are off until a front end asks for them (HBEATF)
+        self.heartbeat = Heartbeat(self.scheduler, lambda: self.heart_rate, self._heart_beat)
+        self._activate_level(self.player.position.level)
+        self._reveal(self.player.position)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _build_templates(self) -> None:
+        """Turn config entries into domain templates"""
+        config = self.config
+
+        self.creature_types: List[CreatureType] = []
+        self.creature_stats: Dict[str, CreatureStats] = {}
+        for stats in sorted(config.creatures.values(), key=lambda s: s.power):
+            self.creature_types.append(CreatureType(
+                stats.name, stats.power, stats.damage, stats.phys_defense,
+                stats.move_speed, stats.name
+            ))
+            self.creature_stats[stats.name] = stats
+
+        self.weapon_templates: List[ItemTemplate] = []
+        self.shield_templates: List[ItemTemplate] = []
+        for obj in sorted(config.objects.values(), key=lambda o: o.value):
+            if obj.obj_type == "SWORD":
+                self.weapon_templates.append(ItemTemplate(
+                    obj.name, ItemType.WEAPON, obj.value, obj.weight, obj.name,
+                    {"damage": obj.value, "magic_offense": obj.magic_offense,
+                     "phys_offense": obj.phys_offense}
+                ))
+            elif obj.obj_type == "SHIELD":
+                self.shield_templates.append(ItemTemplate(
+                    obj.name, ItemType.ARMOR, obj.value, obj.weight, obj.name,
+                    {"defense": obj.value, "magic_defense": obj.magic_defense,
+                     "phys_defense": obj.phys_defense}
+                ))
+
+        self.torch_templates: List[ItemTemplate] = []
+        for key, torch in sorted(config.torches.items(), key=lambda kv: kv[1].burn_time):
+            stats = ITEMS.get(f"{key}_TORCH")
+            self.torch_templates.append(ItemTemplate(
+                torch.name, ItemType.TORCH, torch.burn_time,
+                stats.weight if stats else 10, torch.name,
+                {"duration": torch.burn_time, "phys_light": torch.phys_light,
+                 "magic_light": torch.magic_light}
+            ))
+
+    def _build_dungeon(self) -> None:
+        """Generate every level and populate it"""
+        row, col = self.config.player.starting_position
+        start = (row | 1, col | 1)
+
+        self.dungeon = Dungeon(entrance=Position(start[0], start[1], 0))
+        self.creatures: Dict[int, List[Creature]] = {}
+        self.floor_items: Dict[Position, List[Item]] = {}
+
+        for depth in range(self.num_levels):
+            final = depth == self.num_levels - 1
+            level = generate_level(self.rng, depth, self.level_size, start, final)
+            self.dungeon.add_level(level)
+
+            distances = flood_distances(level, start)
+            open_cells = sorted(rc for rc, dist in distances.items() if dist >= 4)
+            self.creatures[depth] = self._spawn_creatures(depth, open_cells, final)
+            self._spawn_items(depth, open_cells)
+
+    def _spawn_creatures(self, depth: int, open_cells: List[Tuple[int, int]],
+                         final: bool) -> List[Creature]:
+        """Place creatures, tougher ones appearing on deeper levels"""
+        if not self.creature_types or not open_cells:
+            return []
+
+        boss = self.creature_types[-1]
+        common = self.creature_types[:-1] or [boss]
+        pool = common[:min(len(common), depth + 2)]
+
+        creatures = []
+        for _ in range(4 + depth * 2):
+            row, col = self.rng.choice(open_cells)
+            kind = self.rng.choice(pool)
+            creatures.append(kind.create_instance(Position(row, col, depth)))
+        if final:
+            row, col = open_cells[-1]
+            creatures.append(boss.create_instance(Position(row, col, depth)))
+        return creatures
+
+    def _spawn_items(self, depth: int, open_cells: List[Tuple[int, int]]) -> None:
+        """Scatter torches, flasks and equipment"""
+        if not open_cells:
+            return
+
+        tier = min(depth, 2)
+        templates = [self.torch_templates, [FLASK], self.weapon_templates, self.shield_templates]
+        for choices in templates:
+            if not choices:
+                continue
+            template = choices[min(tier, len(choices) - 1)]
+            row, col = self.rng.choice(open_cells)
+            position = Position(row, col, depth)
+            item = self._new_item(template)
+            item.position = position
+            self.floor_items.setdefault(position, []).append(item)
+
+    def _new_item(self, template: ItemTemplate) -> Item:
+        """Create an item instance, tracking torch fuel"""
+        item = Item(template=template)
+        if template.item_type == ItemType.TORCH:
+            item.properties["remaining"] = template.properties["duration"]
+        return item
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def now(self) -> int:
+        """Current game time in milliseconds"""
+        return self.scheduler.cur_time
+
+    @property
+    def is_over(self) -> bool:
+        """True once the player has won or died"""
+        return self.won or self.dead
+
+    @property
+    def level(self) -> Level:
+        """Level the player is on"""
+        return self.dungeon.levels[self.player.position.level]
+
+    @property
+    def power(self) -> int:
+        """PPOW - player power"""
+        return self.player.health.maximum
+
+    @property
+    def damage(self) -> int:
+        """PDAM - accumulated player damage"""
+        return self.player.health.maximum - self.player.health.current
+
+    @property
+    def weight(self) -> int:
+        """POBJWT - carried weight"""
+        return BASE_WEIGHT + self.player.total_weight.value
+
+    @property
+    def heart_rate(self) -> int:
+        """HEARTR - current heart rate value"""
+        return heart_rate(self.power, self.damage)
+
+    @property
+    def light(self) -> int:
+        """Physical light from the active torch"""
+        if self.torch is not None and self.torch.is_active:
+            return self.torch.light_level.physical
+        return 0
+
+    def creature_at(self, position: Position) -> Optional[Creature]:
+        """CFIND2 - first live creature on a cell"""
+        for creature in self.creatures.get(position.level, ()):
+            if creature.is_active and creature.position == position:
+                return creature
+        return None
+
+    def is_passable(self, position: Position) -> bool:
+        """True when the player or a creature may enter the cell"""
+        return self.dungeon.get_cell(position).is_passable
+
+    # ------------------------------------------------------------------
+    # Player actions
+    # ------------------------------------------------------------------
+
+    def step(self, action: Action) -> None:
+        """Perform an action and let the world run until it completes"""
+        self.perform(action)
+        self.advance(max(0, self.busy_until - self.now))
+        self.events.flush()
+
+    def advance(self, milliseconds: int) -> None:
+        """Run scheduled tasks for the given span of game time"""
+        self.scheduler.run_until(self.now + milliseconds)
+
+    def perform(self, action: Action) -> None:
+        """Execute a player action at the current time"""
+        if self.is_over:
+            return
+
+        action = Action(action)
+        self.busy_until = self.now + ACTION_TIME[action]
+        if self.player.is_fainting:
+            return
+
+        try:
+            if action == Action.MOVE:
+                self._move(self.player.direction)
+            elif action == Action.MOVE_BACK:
+                self._move(self.player.direction.turn_around())
+            elif action == Action.TURN_LEFT:
+                self.player.turn("LEFT")
+            elif action == Action.TURN_RIGHT:
+                self.player.turn("RIGHT")
+            elif action == Action.TURN_AROUND:
+                self.player.turn("AROUND")
+            elif action == Action.ATTACK:
+                self._attack()
+            elif action == Action.GET:
+                self._get()
+            elif action == Action.USE_TORCH:
+                self._use_torch()
+            elif action == Action.USE_FLASK:
+                self._use_flask()
+            elif action == Action.CLIMB:
+                self._climb()
+        except PlayerDeathException:
+            self._die()
+
+        self._heart_update()
+
+    def _move(self, direction: Direction) -> None:
+        """PMOVE - step one cell, paying for the exertion"""
+        source = self.player.position
+        target = source.move(direction)
+        if not self.is_passable(target):
+            return
+        self.player.position = target
+        self._reveal(target)
+
+        event = self.events.claim(PlayerMovedEvent, self.now)
+        event.from_position = source
+        event.to_position = target
+        self._hurt_player((self.weight >> 3) + 3)
+
+    def _attack(self) -> None:
+        """PATTK - swing whatever is in the right hand"""
+        weapon = self.player.right_hand
+        if weapon is not None and weapon.item_type == ItemType.WEAPON:
+            magic = offense_factor(weapon.template.properties.get("magic_offense", 0))
+            phys = offense_factor(weapon.template.properties.get("phys_offense", 0))
+        else:
+            magic, phys = EMPTY_HAND_MAGIC_OFFENSE, EMPTY_HAND_PHYS_OFFENSE
+
+        self.stats.attacks += 1
+        self._hurt_player(exertion(self.power, magic, phys))
+
+        creature = self.creature_at(self.player.position)
+        if creature is None:
+            return
+
+        stats = self.creature_stats[creature.name]
+        creature_damage = creature.health.maximum - creature.health.current
+        event = self.events.claim(PlayerAttackEvent, self.now)
+        event.creature_id = creature.id
+        event.hit = False
+        event.damage = 0
+
+        if not self.combat.attack(self.power, creature.health.maximum, creature_damage):
+            return
+        if self.light == 0 and self.combat.unlit_miss():
+            return
+
+        self.stats.hits += 1
+        new_damage = self.combat.damage(
+            self.power, magic, phys,
+            defense_factor(stats.magic_defense), defense_factor(stats.phys_defense),
+            creature_damage
+        )
+        creature.take_damage(new_damage - creature_damage)
+        event.hit = True
+        event.damage = new_damage - creature_damage
+        if not creature.is_active:
+            self._kill(creature)
+
+    def _kill(self, creature: Creature) -> None:
+        """Remove a creature and grant the player its power"""
+        self.stats.creatures_killed += 1
+        event = self.events.claim(CreatureKilledEvent, self.now)
+        event.creature_id = creature.id
+        event.position = creature.position
+
+        task = self._creature_tasks.pop(creature.id, None)
+        if task is not None:
+            self.scheduler.cancel(task)
+        self._occupied[(creature.position.row, creature.position.col)] -= 1
+
+        gain = creature.health.maximum >> 3
+        health = self.player.health
+        maximum = min(self.config.player.max_power, health.maximum + gain)
+        self.player.health = Health(health.current + maximum - health.maximum, maximum)
+        self._heart_wake()
+
+        if creature.creature_type is self.creature_types[-1]:
+            self.won = True
+            self.events.claim(GameOverEvent, self.now).won = True
+
+    def _get(self) -> None:
+        """PGET - pick up the top item, equipping it when it is an upgrade"""
+        items = self.floor_items.get(self.player.position)
+        if not items:
+            return
+
+        if self._floor_items_shared:
+            self.floor_items = {pos: list(stack) for pos, stack in self.floor_items.items()}
+            self._floor_items_shared = False
+            items = self.floor_items[self.player.position]
+            items[-1] = self._clone_item(items[-1])
+
+        item = items.pop()
+        if not items:
+            del self.floor_items[self.player.position]
+        item.position = None
+        self.stats.items_picked += 1
+        event = self.events.claim(ItemPickedUpEvent, self.now)
+        event.item_id = item.id
+        event.position = self.player.position
+
+        hand = {ItemType.WEAPON: "RIGHT", ItemType.ARMOR: "LEFT"}.get(item.item_type)
+        if hand is not None:
+            current = self.player.right_hand if hand == "RIGHT" else self.player.left_hand
+            if current is None or current.value < item.value:
+                if current is not None:
+                    self.player.stow_item(hand)
+                self.player.pick_up_item(item, hand)
+                return
+        self.player.backpack.append(item)
+
+    def _use_torch(self) -> None:
+        """Light the longest-burning torch from the backpack"""
+        torches = [i for i in self.player.backpack
+                   if i.item_type == ItemType.TORCH and i.properties["remaining"] > 0]
+        if not torches:
+            return
+
+        torch = max(torches, key=lambda i: i.properties["remaining"])
+        self.player.backpack.remove(torch)
+        # Backpack items may be shared with forks; the lit torch is ours alone
+        torch = self._clone_item(torch)
+        if self.torch is not None:
+            self.torch.is_active = False
+        torch.activate()
+        self.torch = torch
+        self.stats.torches_used += 1
+        self.events.claim(ItemUsedEvent, self.now).item_id = torch.id
+
+    def _use_flask(self) -> None:
+        """Drink the first flask in the backpack"""
+        for item in self.player.backpack:
+            if "heal" in item.template.properties:
+                self.player.backpack.remove(item)
+                self.player.heal(item.template.properties["heal"])
+                self._heart_wake()
+                self.stats.flasks_used += 1
+                self.events.claim(ItemUsedEvent, self.now).item_id = item.id
+                return
+
+    def _climb(self) -> None:
+        """PCLIMB - descend when standing on stairs"""
+        position = self.player.position
+        if self.dungeon.get_cell(position).cell_type != CellType.STAIRS_DOWN:
+            return
+
+        self._deactivate_level(position.level)
+        below = Position(position.row, position.col, position.level + 1)
+        self.player.position = below
+        self.stats.deepest_level = max(self.stats.deepest_level, below.level)
+        self._activate_level(below.level)
+        self._reveal(below)
+
+        event = self.events.claim(LevelChangedEvent, self.now)
+        event.from_level = position.level
+        event.to_level = below.level
+
+    def _reveal(self, position: Position) -> None:
+        """Dungeon.reveal_area, copying the level first if a fork shares it"""
+        level = self.dungeon.levels.get(position.level)
+        if level is None:
+            return
+        cells = level.cells
+        hidden = [
+            (row, col)
+            for row in range(position.row - 1, position.row + 2)
+            for col in range(position.col - 1, position.col + 2)
+            if (row, col) in cells and not cells[(row, col)].is_revealed
+        ]
+        if not hidden:
+            return
+
+        if position.level in self._shared_levels:
+            level = copy.copy(level)
+            level.cells = cells = dict(cells)
+            self.dungeon.levels[position.level] = level
+            self._shared_levels.discard(position.level)
+        # Cell objects may still be shared, so replace rather than mutate
+        for rc in hidden:
+            cell = cells[rc]
+            cells[rc] = Cell(cell.cell_type, True, cell.properties)
+        self.reveal_count += len(hidden)
+        for observer in self.reveal_observers:
+            observer.cells_revealed(position.level, hidden)
+
+    def _clone_item(self, item: Item) -> Item:
+        """Private copy of an item this engine is about to change"""
+        clone = copy.copy(item)
+        clone.properties = dict(item.properties)
+        return clone
+
+    # ------------------------------------------------------------------
+    # Player condition
+    # ------------------------------------------------------------------
+
+    def _hurt_player(self, amount: int) -> None:
+        """Add to PDAM; raises PlayerDeathException when it exceeds PPOW"""
+        if amount > 0:
+            self.stats.damage_taken += amount
+            self.player.take_damage(amount)
+            self._heart_wake()
+
+    def _heart_update(self) -> None:
+        """HUPDAT - faint and recover from the heart rate"""
+        if self.dead:
+            return
+        rate = self.heart_rate
+        was_fainting = self.player.is_fainting
+        if not was_fainting:
+            if rate <= FAINT_RATE:
+                # Lasts until the heart recovers, not for a set time
+                self.player.faint()
+        elif rate >= RECOVER_RATE:
+            self.player.recover()
+
+        if self.player.is_fainting != was_fainting:
+            self.events.claim(PlayerFaintedEvent, self.now).fainted = self.player.is_fainting
+
+    def _heart_delay(self) -> int:
+        """Delay until the next HSLOW in milliseconds"""
+        return beat_delay(self.heart_rate)
+
+    def _heart_slow(self, now: int) -> Optional[int]:
+        """HSLOW - damage recovery each heartbeat"""
+        if self.is_over:
+            return None
+        self.player.heal(self.damage >> 6)
+        self._heart_update()
+        delay = self._heart_delay()
+        if self.damage < RECOVERY_FLOOR:
+            # Further runs change nothing until PDAM or PPOW does, and until
+            # then they fall on a fixed cadence, so park the task.
+            self._heart_idle = (now + delay, delay)
+            return None
+        return delay
+
+    def _heart_wake(self) -> None:
+        """Resume a parked HSLOW at the run it would have made next"""
+        if self._heart_idle is None or self.is_over:
+            return
+        due, period = self._heart_idle
+        if due <= self.now:
+            due += ((self.now - due) // period + 1) * period
+        self._heart_idle = None
+        self._tasks[0] = self.scheduler.schedule(due - self.now, self._heart_slow)
+
+    def _heart_beat(self, now: int, sound: int) -> None:
+        """CLOCK heartbeat - HEART_SOUNDS[sound] plays now"""
+        event = self.events.claim(HeartbeatEvent, now)
+        event.sound = sound
+        event.rate = self.heart_rate
+
+    def _torch_burn(self, now: int) -> Optional[int]:
+        """BURNER - torches burn down once a second"""
+        if self.is_over:
+            return None
+        torch = self.torch
+        if torch is not None and torch.is_active:
+            torch.properties["remaining"] -= 1
+            if torch.properties["remaining"] <= 0:
+                torch.is_active = False
+                torch.light_level = torch.light_level.decay(torch.light_level.total())
+        return TORCH_TICK_MS
+
+    def _die(self) -> None:
+        """Player has died - stop the world"""
+        self.dead = True
+        self.player.recover()
+        self.events.claim(GameOverEvent, self.now).won = False
+        self.detach()
+        self._creature_tasks.clear()
+        self._heart_idle = None
+
+    # ------------------------------------------------------------------
+    # Creatures
+    # ------------------------------------------------------------------
+
+    def _activate_level(self, depth: int) -> None:
+        """Start creature tasks for the level the player entered"""
+        if depth in self._shared_creatures:
+            self.creatures[depth] = [copy.copy(c) for c in self.creatures[depth]]
+            self._shared_creatures.discard(depth)
+        self._occupied = Counter()
+        for creature in self.creatures.get(depth, ()):
+            if creature.is_active:
+                self._occupied[(creature.position.row, creature.position.col)] += 1
+                stats = self.creature_stats[creature.name]
+                self._creature_tasks[creature.id] = self.scheduler.schedule(
+                    stats.move_speed, self._creature_task(creature)
+                )
+
+    def _deactivate_level(self, depth: int) -> None:
+        """Stop creature tasks for a level the player left"""
+        for creature in self.creatures.get(depth, ()):
+            task = self._creature_tasks.pop(creature.id, None)
+            if task is not None:
+                self.scheduler.cancel(task)
+
+    def _creature_task(self, creature: Creature):
+        """Build the CMOVE task for one creature"""
+        stats = self.creature_stats[creature.name]
+
+        def run(now: int) -> Optional[int]:
+            if self.is_over or not creature.is_active:
+                return None
+            if creature.position == self.player.position:
+                self._creature_attack(creature, stats)
+                return stats.attack_speed
+            self._creature_move(creature)
+            return stats.move_speed
+
+        return run
+
+    def _creature_attack(self, creature: Creature, stats: CreatureStats) -> None:
+        """Creature strikes the player, blunted by the best shield"""
+        magic_def = phys_def = NO_SHIELD_FACTOR
+        for item in (self.player.left_hand, self.player.right_hand):
+            if item is not None and item.item_type == ItemType.ARMOR:
+                magic_def = min(magic_def, defense_factor(item.template.properties.get("magic_defense", 0)))
+                phys_def = min(phys_def, defense_factor(item.template.properties.get("phys_defense", 0)))
+
+        power = creature.health.maximum
+        event = self.events.claim(CreatureAttackEvent, self.now)
+        event.creature_id = creature.id
+        event.hit = False
+        event.damage = 0
+        if not self.combat.attack(power, self.power, self.damage):
+            return
+
+        new_damage = self.combat.damage(
+            power, offense_factor(stats.magic_offense), offense_factor(stats.phys_offense),
+            magic_def, phys_def, self.damage
+        )
+        event.hit = True
+        event.damage = new_damage - self.damage
+        try:
+            self._hurt_player(new_damage - self.damage)
+        except PlayerDeathException:
+            self._die()
+            return
+        self._heart_update()
+
+    def _creature_move(self, creature: Creature) -> None:
+        """Step the creature as its behavior pattern decides"""
+        target = self.player.position
+        plan = self.ai.plan(self.dungeon, target.level)
+        direction = self.ai.choose(
+            plan, creature, self.creature_stats[creature.name].behavior_pattern,
+            (target.row, target.col), self._occupied, self.rng
+        )
+        if direction is None:
+            return
+
+        here = creature.position
+        there = here.move(direction)
+        occupied = self._occupied
+        occupied[(here.row, here.col)] -= 1
+        occupied[(there.row, there.col)] += 1
+        creature.direction = direction
+        creature.move_to(there)
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def fork(self) -> 'GameEngine':
+        """Logically independent copy of this game for lookahead
+
+        Levels, inactive creature lists and floor items are shared with
+        the fork and copied by whichever side first writes to them, so the
+        cost is proportional to the creatures on the current level rather
+        than the size of the dungeon. The fork runs on its own scheduler
+        and event bus.
+        """
+        state = self.__getstate__()
+        fork = GameEngine.__new__(GameEngine)
+        fork.__dict__.update(state)
+
+        fork.rng = random.Random()
+        fork.rng.setstate(self.rng.getstate())
+        fork.combat = CombatService(fork.rng)
+        fork.stats = copy.copy(self.stats)
+        fork.player = copy.copy(self.player)
+        fork.player.backpack = list(self.player.backpack)
+        if self.torch is not None:
+            fork.torch = self._clone_item(self.torch)
+
+        fork.dungeon = copy.copy(self.dungeon)
+        fork.dungeon.levels = dict(self.dungeon.levels)
+        fork.creatures = dict(self.creatures)
+        active = self.player.position.level
+        if active in fork.creatures:
+            fork.creatures[active] = [copy.copy(c) for c in self.creatures[active]]
+
+        fork.ai = self.ai
+        fork._occupied = Counter(self._occupied)
+
+        for engine in (self, fork):
+            engine._shared_levels = set(self.dungeon.levels)
+            engine._shared_creatures = set(self.creatures) - {active}
+            engine._floor_items_shared = True
+
+        fork.attach(Scheduler(self.now), EventBus())
+        return fork
+
+    def snapshot(self) -> dict:
+        """The complete game state, including pending tasks, keyed by SNAPSHOT_FIELDS
+
+        Values are the engine's live objects, so a save format should
+        encode them before the engine runs on. Templates are left out;
+        restore() rebuilds them from the config.
+        """
+        state = self.__getstate__()
+        return {name: state[name] for name in SNAPSHOT_FIELDS}
+
+    @classmethod
+    def restore(cls, state: dict, scheduler: Optional[Scheduler] = None,
+                event_bus: Optional[EventBus] = None) -> 'GameEngine':
+        """Rebuild an engine from snapshot() state, optionally on a shared scheduler
+
+        Items and creatures are pointed at the templates built from the
+        state's config by name, so a decoded snapshot plays exactly like
+        the original. Subscribers are not part of a snapshot; attach them
+        to event_bus.
+        """
+        engine = cls.__new__(cls)
+        engine.__dict__.update((name, state[name]) for name in SNAPSHOT_FIELDS)
+        engine.combat = CombatService(engine.rng)
+        engine._build_templates()
+        engine._bind_templates()
+        engine._detach_shared()
+        engine.attach(scheduler if scheduler is not None else Scheduler(engine._saved_time),
+                      event_bus if event_bus is not None else EventBus())
+        return engine
+
+    def _bind_templates(self) -> None:
+        """Swap item templates and creature types for this engine's own, by name"""
+        templates = {template.name: template for template in chain(
+            self.weapon_templates, self.shield_templates, self.torch_templates, [FLASK])}
+        types = {kind.name: kind for kind in self.creature_types}
+        player = self.player
+        for item in chain(player.backpack, [player.left_hand, player.right_hand, self.torch],
+                          chain.from_iterable(self.floor_items.values())):
+            if item is not None and item.template is not None:
+                item.template = templates.get(item.template.name, item.template)
+        for creature in chain.from_iterable(self.creatures.values()):
+            creature.creature_type = types.get(creature.creature_type.name, creature.creature_type)
+
+    def _detach_shared(self) -> None:
+        """Forget copy-on-write sharing; the engine owns everything it holds"""
+        self._shared_levels = set()
+        self._shared_creatures = set()
+        self._floor_items_shared = False
+        self.ai = CreaturePlanner()
+
+    def __getstate__(self) -> dict:
+        # Task callbacks are bound methods and closures, so store each
+        # pending task by what it drives, in the order the scheduler will
+        # run them; ties then break the same way after a restore.
+        keys = {id(self._tasks[0]): "heart", id(self._tasks[1]): "torch"}
+        keys.update((id(task), cid) for cid, task in self._creature_tasks.items())
+        keys.update((id(task), name) for name, task in self.player.scheduled_tasks().items())
+        if self.heartbeat.running:
+            keys[id(self.heartbeat.task)] = "beat"
+
+        state = self.__dict__.copy()
+        for name in ("scheduler", "events", "heartbeat", "ai", "_tasks", "_creature_tasks",
+                     "reveal_observers"):
+            del state[name]
+        state["_saved_time"] = self.now
+        state["_saved_sound"] = self.heartbeat.sound
+        state["_saved_tasks"] = [
+            (keys[id(task)], task.next_time)
+            for task in self.scheduler.pending() if id(task) in keys
+        ]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        # Nothing is shared with another engine after unpickling
+        self._detach_shared()
+        self.attach(Scheduler(state["_saved_time"]), EventBus())
+
+    def attach(self, scheduler: Scheduler, event_bus: EventBus) -> None:
+        """Move the engine onto scheduler and event_bus, shifting its clock to match"""
+        saved_time = self.__dict__.pop("_saved_time", None)
+        saved_tasks = self.__dict__.pop("_saved_tasks", None)
+        saved_sound = self.__dict__.pop("_saved_sound", None)
+        if saved_time is None:
+            # Moving a live engine: capture its tasks first
+            state = self.__getstate__()
+            self.detach()
+            saved_time, saved_tasks = state["_saved_time"], state["_saved_tasks"]
+            saved_sound = state["_saved_sound"]
+
+        offset = scheduler.cur_time - saved_time
+        self.scheduler = scheduler
+        self.events = event_bus
+        self.busy_until += offset
+        if self._heart_idle is not None:
+            self._heart_idle = (self._heart_idle[0] + offset, self._heart_idle[1])
+        self.heartbeat = Heartbeat(scheduler, lambda: self.heart_rate, self._heart_beat)
+        self.heartbeat.sound = saved_sound
+        self.player.attach(scheduler)
+        # Observers of a copy have not seen it yet; a moved engine keeps its own
+        self.__dict__.setdefault("reveal_observers", weakref.WeakSet())
+
+        creatures = {c.id: c for level in self.creatures.values() for c in level}
+        self._tasks = [Task(self._heart_slow, 0), Task(self._torch_burn, 0)]
+        for task in self._tasks:
+            task.active = False
+        self._creature_tasks = {}
+
+        for key, next_time in saved_tasks:
+            delay = next_time + offset - scheduler.cur_time
+            if key == "heart":
+                self._tasks[0] = scheduler.schedule(delay, self._heart_slow)
+            elif key == "torch":
+                self._tasks[1] = scheduler.schedule(delay, self._torch_burn)
+            elif key == "beat":
+                self.heartbeat.start(delay)
+            elif key in ("recover", "pulse"):
+                self.player.resume(key, delay)
+            else:
+                self._creature_tasks[key] = scheduler.schedule(
+                    delay, self._creature_task(creatures[key])
+                )
+
+    def detach(self) -> None:
+        """Cancel every task the engine has on its scheduler, so time stops for it there"""
+        for task in chain(self._tasks, self._creature_tasks.values(),
+                          self.player.scheduled_tasks().values()):
+            self.scheduler.cancel(task)
+        self.heartbeat.stop()
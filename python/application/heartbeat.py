@@ -0,0 +1,71 @@
+"""
+Heartbeat module - Port of the heart handling in sched.cpp CLOCK and HUPDAT
+Schedules each beat and faint transition directly instead of polling a counter
+"""
+
+from typing import Callable, Optional
+
+from .scheduler import Scheduler, Task
+
+# Milliseconds per jiffy; task delays in sched.cpp are counted in these
+JIFFY_MS = 17
+
+# HEARTR at or below this faints; at or above RECOVER_RATE recovers
+FAINT_RATE = 3
+RECOVER_RATE = 4
+
+# hrtSound[0] and hrtSound[1], indexed by HEARTS + 1
+HEART_SOUNDS = ("17_heart.wav", "18_heart.wav")
+
+# HSLOW recovers PDAM >> 6, so below this it no longer changes anything
+RECOVERY_FLOOR = 64
+
+
+def heart_rate(power: int, damage: int) -> int:
+    """HEARTR as computed by Player::HUPDAT"""
+    return (power * 64) // max(1, power + damage * 2) - 18
+
+
+def beat_delay(rate: int) -> int:
+    """Milliseconds between beats (or HSLOW runs) at heart rate HEARTR"""
+    return max(1, rate) * JIFFY_MS
+
+
+class Heartbeat:
+    """
+    Audible heartbeat - the HEARTC countdown in Scheduler::CLOCK
+    The original reloads HEARTC from HEARTR each time the heart sounds, so
+    a beat's successor is fixed the moment it plays. One scheduler task
+    per beat therefore reproduces the timing exactly, with no work at all
+    between beats however the rate changes meanwhile.
+    """
+
+    def __init__(self, scheduler: Scheduler, rate: Callable[[], int],
+                 on_beat: Callable[[int, int], None]):
+        self.scheduler = scheduler
+        self.rate = rate
+        self.on_beat = on_beat
+        self.sound = 1               # HEARTS + 1, index into HEART_SOUNDS
+        self.task: Optional[Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and self.task.active
+
+    def start(self, delay: Optional[int] = None) -> None:
+        """HBEATF on - first beat after delay (one period by default)"""
+        if not self.running:
+            if delay is None:
+                delay = beat_delay(self.rate())
+            self.task = self.scheduler.schedule(delay, self._beat)
+
+    def stop(self) -> None:
+        """HBEATF off"""
+        if self.task is not None:
+            self.scheduler.cancel(self.task)
+            self.task = None
+
+    def _beat(self, now: int) -> Optional[int]:
+        self.on_beat(now, self.sound)
+        self.sound ^= 1
+        return beat_delay(self.rate())
@@ -0,0 +1,92 @@
+"""
+Scheduler module - Port of sched.cpp
+Time-ordered task queue that drives creatures, torches and the heart
+"""
+
+import heapq
+import itertools
+from typing import Callable, List, Optional, Tuple
+
+# A task callback receives the current time (ms) and returns the delay
+# until it should run again, or None to retire the task.
+TaskCallback = Callable[[int], Optional[int]]
+
+
+class Task:
+    """Task control block - equivalent to TCBLND entries"""
+
+    __slots__ = ('callback', 'next_time', 'active')
+
+    def __init__(self, callback: TaskCallback, next_time: int):
+        self.callback = callback
+        self.next_time = next_time
+        self.active = True
+
+
+class Scheduler:
+    """
+    Discrete-event scheduler
+    The original polled every task each jiffy; here tasks sit in a heap
+    keyed by next_time so idle time costs nothing.
+    """
+
+    def __init__(self, start_time: int = 0):
+        self.cur_time = start_time
+        self._queue: List[Tuple[int, int, Task]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def schedule(self, delay: int, callback: TaskCallback) -> Task:
+        """Add a task that first runs after delay milliseconds"""
+        task = Task(callback, self.cur_time + delay)
+        heapq.heappush(self._queue, (task.next_time, next(self._seq), task))
+        return task
+
+    def reschedule(self, task: Task, delay: int) -> Task:
+        """Move a task to run delay milliseconds from now"""
+        task.active = False
+        return self.schedule(delay, task.callback)
+
+    def cancel(self, task: Task) -> None:
+        """Retire a task; it is dropped lazily when it reaches the front"""
+        task.active = False
+
+    def next_time(self) -> Optional[int]:
+        """Time of the next pending task, if any"""
+        queue = self._queue
+        while queue and not queue[0][2].active:
+            heapq.heappop(queue)
+        return queue[0][0] if queue else None
+
+    def pending(self) -> List[Task]:
+        """Live tasks in the order they will run"""
+        return [task for _, _, task in sorted(self._queue) if task.active]
+
+    def run_until(self, time: int) -> int:
+        """Run every task due at or before time, returns tasks executed"""
+        queue = self._queue
+        executed = 0
+
+        while queue and queue[0][0] <= time:
+            due, _, task = heapq.heappop(queue)
+            if not task.active:
+                continue
+
+            self.cur_time = due
+            delay = task.callback(due)
+            executed += 1
+
+            if delay is None or not task.active:
+                task.active = False
+            else:
+                task.next_time = due + delay
+                heapq.heappush(queue, (task.next_time, next(self._seq), task))
+
+        self.cur_time = max(self.cur_time, time)
+        return executed
+
+    def clear(self) -> None:
+        """Drop every pending task"""
+        self._queue.clear()
@@ -30,7 +30,9 @@ class DisplayConfig:
     scanlines: bool = False
     scanline_intensity: float = 0.3
     crt_curvature: float = 0.0  # 0.0 = flat, 1.0 = maximum curve
+    curvature_bilinear: bool = False  # Smoother curved picture, several times the cost
     phosphor_glow: bool = False
+    phosphor_decay: float = 0.5  # Afterglow kept from one frame to the next, 0.0 = none
     
     # Color settings
     color_temperature: float = 6500  # Kelvin - affects color warmth
@@ -55,7 +57,9 @@ class DisplayConfig:
             'scanlines': self.scanlines,
             'scanline_intensity': self.scanline_intensity,
             'crt_curvature': self.crt_curvature,
+            'curvature_bilinear': self.curvature_bilinear,
             'phosphor_glow': self.phosphor_glow,
+            'phosphor_decay': self.phosphor_decay,
             'color_temperature': self.color_temperature,
             'contrast': self.contrast,
             'brightness': self.brightness,
@@ -81,6 +85,7 @@ PRESETS = {
         scanline_intensity=0.4,
         crt_curvature=0.3,
         phosphor_glow=True,
+        phosphor_decay=0.6,  # Slow P4-style afterglow
         color_temperature=5500,  # Warmer, like old CRTs
         screen_flicker=True,
         flicker_intensity=0.05,
@@ -93,6 +98,7 @@ PRESETS = {
         scanline_intensity=0.3,
         crt_curvature=0.2,
         phosphor_glow=True,
+        phosphor_decay=0.4,
         color_temperature=6200,
         vignette=True
     ),
@@ -109,6 +115,7 @@ PRESETS = {
         scanlines=True,
         scanline_intensity=0.2,
         phosphor_glow=True,
+        phosphor_decay=0.25,
         color_temperature=8000,  # Cooler, blue-ish
         contrast=1.2,
         saturation=1.3,
@@ -3,7 +3,7 @@ Game configuration system - exposing internal values for modding
 Based on Michael Spencer's documentation
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Dict, List
 import json
 
@@ -30,6 +30,7 @@ class CreatureStats:
     phys_defense: int  # 0-199 percentage
     damage: int
     sound_id: int
+    behavior_pattern: str = "aggressive"  # "aggressive", "patrol" or "defensive"
 
 @dataclass
 class ObjectStats:
@@ -74,8 +75,11 @@ class GameConfig:
     def load_from_json(cls, filename: str) -> 'GameConfig':
         """Load configuration from JSON file"""
         with open(filename, 'r') as f:
-            data = json.load(f)
-        
+            return cls.from_dict(json.load(f))
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GameConfig':
+        """Build a configuration from to_dict() output; missing sections keep defaults"""
         config = cls()
         
         # Load player config
@@ -105,25 +109,14 @@ class GameConfig:
                 
         return config
     
+    def to_dict(self) -> dict:
+        """Configuration as plain dicts and values, the layout of the JSON file"""
+        return asdict(self)
+    
     def save_to_json(self, filename: str):
         """Save configuration to JSON file"""
-        data = {
-            'player': self.player.__dict__,
-            'creatures': {name: creature.__dict__ 
-                         for name, creature in self.creatures.items()},
-            'objects': {name: obj.__dict__ 
-                       for name, obj in self.objects.items()},
-            'torches': {name: torch.__dict__ 
-                       for name, torch in self.torches.items()},
-            'heartbeat_base_rate': self.heartbeat_base_rate,
-            'faint_threshold': self.faint_threshold,
-            'death_threshold': self.death_threshold,
-            'attack_probability_scale': self.attack_probability_scale,
-            'damage_scale': self.damage_scale
-        }
-        
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump(self.to_dict(), f, indent=2)
 
 # Default configuration - matches original game
 DEFAULT_CONFIG = GameConfig()
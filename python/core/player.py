@@ -5,7 +5,12 @@ Handles player state, movement, and actions
 
 from enum import IntEnum
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
+
+from domain.player import TaskScheduler
+
+# Milliseconds per jiffy; HEARTR and FAINT count in these
+JIFFY_MS = 17
 
 class Direction(IntEnum):
     """Player facing direction"""
@@ -39,7 +44,7 @@ class PlayerBlock:
     
     # Heart system
     heart_rate: int = 4   # HEARTR - Base heart rate
-    heart_counter: int = 4  # HEARTC - Countdown
+    heart_counter: int = 4  # HEARTC - Countdown (save files only)
     heart_state: int = 0   # HEARTS - Animation state
     heartbeat_on: bool = True  # HBEATF
     
@@ -48,7 +53,7 @@ class PlayerBlock:
     left_light: int = 0   # PMLITE
     
     # Other
-    faint_counter: int = 0  # FAINT
+    faint_counter: int = 0  # FAINT - ms left in a faint
     backpack_end: int = 0   # BAGPTR
 
 class Player:
@@ -57,34 +62,53 @@ class Player:
     Port of player.cpp / HUMAN.ASM
     """
     
-    def __init__(self):
+    def __init__(self, scheduler: TaskScheduler):
         self.state = PlayerBlock()
         self.turning = False
         self.moving = False
         
-    def update(self, delta_time: float):
-        """Update player state each frame"""
-        # Update heartbeat
+        # Beats and faint recovery are tasks on the owner's scheduler, so
+        # nothing runs between them
+        self.scheduler = scheduler
+        self._beat_task: Any = None
+        self._recover_task: Any = None
         if self.state.heartbeat_on:
-            self.update_heartbeat(delta_time)
+            self._beat_task = scheduler.schedule(self._beat_delay(), self._beat)
             
-        # Update fainting
-        if self.state.faint_counter > 0:
-            self.state.faint_counter -= delta_time
+    def set_heartbeat(self, on: bool):
+        """HBEATF - start or silence the heartbeat"""
+        self.state.heartbeat_on = on
+        if on and self._beat_task is None:
+            self._beat_task = self.scheduler.schedule(self._beat_delay(), self._beat)
+        elif not on and self._beat_task is not None:
+            self.scheduler.cancel(self._beat_task)
+            self._beat_task = None
             
-    def update_heartbeat(self, delta_time: float):
+    def _beat_delay(self) -> int:
+        return max(1, self.state.heart_rate) * JIFFY_MS
+        
+    def _beat(self, now: int) -> Optional[int]:
         """
-        Update heart counter and trigger heartbeat
+        Heartbeat task - the HEARTC reload in CLOCK
         Original used interrupt-driven timing
         """
-        self.state.heart_counter -= delta_time
+        self.trigger_heartbeat()
         
-        if self.state.heart_counter <= 0:
-            # Reset counter
-            self.state.heart_counter = self.state.heart_rate
-            
-            # Trigger heartbeat sound and animation
-            self.trigger_heartbeat()
+        # Weight and the last beat's exertion set the time to the next one
+        self.calculate_heart_rate()
+        self.moving = False
+        return self._beat_delay()
+        
+    def faint(self, duration: int):
+        """Faint for duration milliseconds, recovering on schedule"""
+        if self._recover_task is not None:
+            self.scheduler.cancel(self._recover_task)
+        self.state.faint_counter = duration
+        self._recover_task = self.scheduler.schedule(duration, self._recover)
+        
+    def _recover(self, now: int) -> None:
+        self.state.faint_counter = 0
+        self._recover_task = None
             
     def trigger_heartbeat(self):
         """Play heartbeat sound and update display"""
@@ -129,12 +153,12 @@ class Player:
             
         new_row = self.state.row + delta_row
         new_col = self.state.col + delta_col
+        self.moving = True
         
         # Check collision with dungeon walls
         # if dungeon.is_valid_position(new_row, new_col):
         #     self.state.row = new_row
         #     self.state.col = new_col
-        #     self.moving = True
         
     def _get_direction_delta(self):
         """Get row/col delta for current direction"""
@@ -152,6 +176,7 @@ class Player:
         
         if obj_id < 0:
             return  # No weapon in hand
+        self.moving = True
             
         # Get weapon stats and calculate damage
         # weapon = object_manager.get_object(obj_id)
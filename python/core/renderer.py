@@ -2,13 +2,369 @@
 Renderer module with bezel and CRT effect support
 """
 
+import math
+import sys
 import pygame
 import numpy as np
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
 
 from config.display_config import DisplayConfig, BezelStyle
 
+# Every third row of the picture is a scanline
+SCANLINE_SPACING = 3
+
+# Vignette darkening starts this far out, as a fraction of the radius
+VIGNETTE_START = 0.5
+
+# Color temperature that leaves colors unchanged (D65 white)
+NEUTRAL_TEMPERATURE = 6500
+
+# Rec. 601 luma weights, used for saturation
+LUMA = np.array([0.299, 0.587, 0.114])
+
+# Fractional bits in the fixed-point saturation tables
+COLOR_SHIFT = 8
+
+# Edge bulge at crt_curvature 1.0, as a fraction of the half width
+CURVATURE_STRENGTH = 0.5
+
+# Bilinear weight steps per pixel; the four weights sum to SUBPIXELS ** 2 = 256
+SUBPIXELS = 16
+
+# Alternate 8-bit channels of a 32-bit pixel
+CHANNEL_MASK = np.uint32(0x00FF00FF)
+
+# Phosphor bloom is blurred at 1/BLOOM_SCALE size and added at BLOOM_STRENGTH
+BLOOM_SCALE = 4
+BLOOM_STRENGTH = 0.25
+
+# Fractional bits of the phosphor decay factor
+DECAY_SHIFT = 8
+
+# Afterglow below this many levels is invisible, so the screen has settled
+PHOSPHOR_FLOOR = 0.5
+
+# Past this many separate dirty rects, or this share of the game surface,
+# redrawing all of it is cheaper
+MAX_DIRTY_RECTS = 32
+DIRTY_FULL_FRACTION = 0.5
+
+RectLike = Union[pygame.Rect, Tuple[int, int, int, int]]
+
+def kelvin_to_rgb(kelvin: float) -> np.ndarray:
+    """Approximate RGB (0-255) of a black body at this temperature"""
+    t = max(1000.0, min(40000.0, kelvin)) / 100
+    if t <= 66:
+        red = 255.0
+        green = 99.4708025861 * np.log(t) - 161.1195681661
+    else:
+        red = 329.698727446 * (t - 60) ** -0.1332047592
+        green = 288.1221695283 * (t - 60) ** -0.0755148492
+    if t >= 66:
+        blue = 255.0
+    elif t <= 19:
+        blue = 0.0
+    else:
+        blue = 138.5177312231 * np.log(t - 10) - 305.0447927307
+    return np.clip([red, green, blue], 0, 255)
+
+class ColorGrade:
+    """
+    DisplayConfig color settings compiled for per-pixel use
+    Temperature, contrast and brightness fold into one lookup table per
+    channel; saturation is a 3x3 matrix mixing each channel with luma.
+    Both are applied with NumPy table lookups, never per-pixel Python.
+    32-bit pixels are looked up two bytes at a time, in 16-bit tables
+    built for their channel order.
+    """
+    
+    def __init__(self, temperature: float, contrast: float, brightness: float,
+                 saturation: float):
+        gains = kelvin_to_rgb(temperature) / kelvin_to_rgb(NEUTRAL_TEMPERATURE)
+        levels = np.arange(256) / 255.0
+        curves = ((levels[None, :] * gains[:, None] - 0.5) * contrast + 0.5) * brightness
+        self.luts = np.clip(np.rint(curves * 255), 0, 255).astype(np.uint8)
+        self.saturation = saturation
+        self.matrix = saturation * np.eye(3) + (1 - saturation) * np.outer(np.ones(3), LUMA)
+        
+        # matrix = s*I + (1-s)*luma, so each output channel is a shared luma
+        # term plus its own scaled input: two table lookups per channel
+        scale = 1 << COLOR_SHIFT
+        self._luma_tables = np.rint(
+            (1 - saturation) * LUMA[:, None] * self.luts * scale).astype(np.int32)
+        self._own_tables = np.rint(saturation * self.luts * scale).astype(np.int32)
+        self._lut_tables = self.luts.astype(np.int32)
+        self._pair_tables: Dict[Tuple[Optional[int], ...], Tuple[np.ndarray, np.ndarray]] = {}
+        
+    def apply(self, pixels: np.ndarray, work: np.ndarray, luma: np.ndarray) -> None:
+        """Grade an (h, w, 3) pixel view in place; work and luma are int32 (h, w) scratch"""
+        if self.saturation == 1:
+            for channel in range(3):
+                view = pixels[:, :, channel]
+                np.take(self._lut_tables[channel], view, out=work)
+                view[...] = work
+            return
+        np.take(self._luma_tables[0], pixels[:, :, 0], out=luma)
+        for channel in (1, 2):
+            np.take(self._luma_tables[channel], pixels[:, :, channel], out=work)
+            luma += work
+        luma += 1 << (COLOR_SHIFT - 1)
+        for channel in range(3):
+            view = pixels[:, :, channel]
+            np.take(self._own_tables[channel], view, out=work)
+            work += luma
+            work >>= COLOR_SHIFT
+            np.clip(work, 0, 255, out=work)
+            view[...] = work
+            
+    def apply_pairs(self, pairs: np.ndarray, channels: Tuple[Optional[int], ...],
+                    work: np.ndarray, luma: np.ndarray) -> None:
+        """Grade 32-bit pixels in place, viewed as (h, w, 2) native 16-bit halves
+
+        channels holds the channel (0-2) in each byte of a pixel, lowest
+        first, and None for the unused one; work and luma are int32 (h, w).
+        """
+        tables = self._pairs(channels)
+        if self.saturation == 1:
+            for half in (0, 1):
+                view = pairs[:, :, half]
+                np.take(tables[half], view, out=work)
+                view[...] = work
+            return
+        np.take(tables[0], pairs[:, :, 0], out=luma)
+        np.take(tables[1], pairs[:, :, 1], out=work)
+        luma += work
+        luma += 1 << (COLOR_SHIFT - 1)
+        pixel_bytes = pairs.view(np.uint8)
+        for byte, channel in enumerate(channels):
+            if channel is None:
+                continue
+            view = pixel_bytes[:, :, byte]
+            np.take(self._own_tables[channel], view, out=work)
+            work += luma
+            work >>= COLOR_SHIFT
+            np.clip(work, 0, 255, out=work)
+            view[...] = work
+            
+    def _pairs(self, channels: Tuple[Optional[int], ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """65536-entry tables for the low and high halves of a pixel: graded
+        bytes, or the summed luma terms when saturation is mixed in"""
+        tables = self._pair_tables.get(channels)
+        if tables is None:
+            if self.saturation == 1:
+                identity = np.arange(256, dtype=np.int32)
+                per_byte = [identity if channel is None else self._lut_tables[channel]
+                            for channel in channels]
+                shift = 8
+            else:
+                none = np.zeros(256, np.int32)
+                per_byte = [none if channel is None else self._luma_tables[channel]
+                            for channel in channels]
+                shift = 0
+            # Index is high byte * 256 + low byte
+            tables = self._pair_tables[channels] = tuple(
+                ((per_byte[2 * half + 1][:, None] << shift) + per_byte[2 * half][None, :]).reshape(-1)
+                for half in (0, 1))
+        return tables
+
+class CurvatureMap:
+    """
+    Source pixel for every screen pixel under barrel distortion
+    Built once per size and curvature. Each frame the picture is copied into
+    a buffer with a black border and gathered with one np.take per tap, so
+    every lookup, including the neighbours used for bilinear filtering,
+    lands inside the buffer; points that map off the picture come out black.
+    """
+    
+    def __init__(self, size: Tuple[int, int], curvature: float, bilinear: bool):
+        width, height = size
+        self.bilinear = bilinear
+        self.stride = stride = width + 2
+        # One border row and column around the picture, plus a spare border
+        # row so the blank index below has blank neighbours too
+        self.source = np.zeros((height + 3) * stride, np.uint32)
+        self._picture = self.source[stride:(height + 1) * stride].reshape(height, stride)[:, 1:-1]
+        blank = (height + 1) * stride
+        
+        # Each axis bends more the further out the other one is, which keeps
+        # the middle of every edge in place and rounds the corners
+        strength = curvature * CURVATURE_STRENGTH
+        u = (np.arange(width) + 0.5) / width * 2 - 1
+        v = (np.arange(height) + 0.5) / height * 2 - 1
+        x = u[None, :] * (1 + strength * v[:, None] ** 2)
+        y = v[:, None] * (1 + strength * u[None, :] ** 2)
+        x = (x + 1) * (width / 2) + 0.5
+        y = (y + 1) * (height / 2) + 0.5
+        outside = (x < 0) | (x >= width + 1) | (y < 0) | (y >= height + 1)
+        
+        if bilinear:
+            x0, y0 = np.floor(x), np.floor(y)
+            fx = np.rint((x - x0) * SUBPIXELS).astype(np.uint32)
+            fy = np.rint((y - y0) * SUBPIXELS).astype(np.uint32)
+            gx, gy = SUBPIXELS - fx, SUBPIXELS - fy
+            self.weights = (gx * gy, fx * gy, gx * fy, fx * fy)
+        else:
+            x0, y0 = np.rint(x), np.rint(y)
+        self.index = (y0 * stride + x0).astype(np.intp)
+        self.index[outside] = blank
+        
+        self._pixel = np.empty((height, width), np.uint32)
+        if bilinear:
+            self._channels = np.empty_like(self._pixel)
+            self._low = np.empty_like(self._pixel)
+            self._high = np.empty_like(self._pixel)
+            
+    def apply(self, pixels: np.ndarray) -> None:
+        """Distort a (height, width) uint32 pixel view in place"""
+        self._picture[...] = pixels
+        if not self.bilinear:
+            np.take(self.source, self.index, out=self._pixel, mode='clip')
+            pixels[...] = self._pixel
+            return
+            
+        # Weights sum to 256, so two channels at a time fit in 16-bit lanes
+        source, stride, pixel = self.source, self.stride, self._pixel
+        channels, low, high = self._channels, self._low, self._high
+        low.fill(0)
+        high.fill(0)
+        for tap, weight in zip((source, source[1:], source[stride:], source[stride + 1:]),
+                               self.weights):
+            np.take(tap, self.index, out=pixel, mode='clip')
+            np.right_shift(pixel, 8, out=channels)
+            channels &= CHANNEL_MASK
+            channels *= weight
+            high += channels
+            pixel &= CHANNEL_MASK
+            pixel *= weight
+            low += pixel
+        low >>= 8
+        low &= CHANNEL_MASK
+        high &= ~CHANNEL_MASK
+        low |= high
+        pixels[...] = low
+        
+class PhosphorTrail:
+    """
+    Afterglow of earlier frames plus a soft bloom
+    A byte buffer remembers how bright each phosphor is; every frame it
+    fades by the decay factor in 8-bit fixed point and is relit wherever
+    the new frame is brighter, so moving pictures leave trails. Fading
+    rounds down, so a trail is never longer than afterglow_frames says.
+    Glow is a [1, 2, 1] blur in each direction at reduced size, smoothed
+    back up to half size and doubled from there; it is smooth enough that
+    the last step needs no filtering. Both work on the raw bytes of the
+    surface rows, so every pass runs over contiguous memory (the unused
+    byte of 32-bit pixels comes along). Every buffer is made once, so
+    frames allocate nothing.
+    """
+    
+    def __init__(self, surface: pygame.Surface):
+        width, height = size = surface.get_size()
+        self.accum = np.zeros((height, surface.get_pitch()), np.uint8)
+        self._faded = np.empty(self.accum.shape, np.uint16)
+        small = (max(1, width // BLOOM_SCALE), max(1, height // BLOOM_SCALE))
+        self._small = pygame.Surface(small, 0, surface)
+        self._half = pygame.Surface((max(1, width // 2), max(1, height // 2)), 0, surface)
+        self._glow = pygame.Surface(size, 0, surface)
+        self._step = surface.get_bytesize()
+        self._blur = np.empty((small[1], small[0] * self._step), np.float32)
+        self._pass = np.empty_like(self._blur)
+        
+    @staticmethod
+    def _rows(surface: pygame.Surface) -> np.ndarray:
+        """Writable (height, pitch) view of the surface's bytes"""
+        return np.frombuffer(surface.get_buffer(), np.uint8).reshape(
+            surface.get_height(), surface.get_pitch())
+        
+    def apply(self, surface: pygame.Surface, decay: float) -> None:
+        """Blend the faded history into surface and add bloom, in place"""
+        if decay > 0:
+            # At most 256, so 255 * factor still fits in 16 bits
+            factor = min(1 << DECAY_SHIFT, int(decay * (1 << DECAY_SHIFT)))
+            rows = self._rows(surface)
+            np.multiply(self.accum, factor, out=self._faded, dtype=np.uint16)
+            np.right_shift(self._faded, DECAY_SHIFT, out=self.accum, casting='unsafe')
+            np.maximum(self.accum, rows, out=self.accum)
+            np.copyto(rows, self.accum)
+            del rows
+            
+        pygame.transform.smoothscale(surface, self._small.get_size(), self._small)
+        small = self._rows(self._small)[:, :self._blur.shape[1]]
+        np.copyto(self._blur, small)
+        self._smooth(self._blur, self._pass, 0, 1)
+        self._smooth(self._pass, self._blur, 1, self._step)
+        self._blur *= BLOOM_STRENGTH / 16
+        np.copyto(small, self._blur, casting='unsafe')
+        del small
+        pygame.transform.smoothscale(self._small, self._half.get_size(), self._half)
+        pygame.transform.scale(self._half, self._glow.get_size(), self._glow)
+        surface.blit(self._glow, (0, 0), special_flags=pygame.BLEND_ADD)
+        
+    @staticmethod
+    def _smooth(source: np.ndarray, out: np.ndarray, axis: int, step: int) -> None:
+        """Unnormalized [1, 2, 1] blur along axis, taps step apart, edges mirrored"""
+        if source.shape[axis] < 2 * step:
+            np.multiply(source, 4, out=out)
+            return
+        # Blur the flat buffers, which NumPy walks without temporaries, then
+        # redo the ends where the taps ran off the picture
+        offset = step if axis else step * source.shape[1]
+        flat = source.reshape(-1)
+        np.add(flat[:-2 * offset], flat[2 * offset:], out=out.reshape(-1)[offset:-offset])
+        ends, mirror = np.moveaxis(out, axis, 0), np.moveaxis(source, axis, 0)
+        np.multiply(mirror[step:2 * step], 2, out=ends[:step])
+        np.multiply(mirror[-2 * step:-step], 2, out=ends[-step:])
+        out += source
+        out += source
+        
+class DirtyTracker:
+    """
+    Parts of the game surface changed since the last frame
+    Game code calls mark() with each rect it redraws on the game surface,
+    or mark_all() when the whole view changes (a move or a turn), and sets
+    the tracker as Renderer.dirty. The renderer takes the marks once per
+    frame, merged, and redraws only those regions.
+    """
+    
+    def __init__(self):
+        self.rects: List[pygame.Rect] = []
+        self.everything = True
+        
+    def __bool__(self) -> bool:
+        return self.everything or bool(self.rects)
+        
+    def mark(self, *rects: RectLike) -> None:
+        """Note rects of the game surface as changed"""
+        self.rects.extend(pygame.Rect(rect) for rect in rects)
+        
+    def mark_all(self) -> None:
+        """Note the whole game surface as changed"""
+        self.everything = True
+        
+    def take(self, bounds: pygame.Rect) -> Optional[List[pygame.Rect]]:
+        """Disjoint changed rects within bounds, or None for all of it, and clear the marks"""
+        rects, everything = self.rects, self.everything
+        self.rects, self.everything = [], False
+        if everything:
+            return None
+            
+        merged: List[pygame.Rect] = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+            
+        area = sum(rect.width * rect.height for rect in merged)
+        if len(merged) > MAX_DIRTY_RECTS or area > bounds.width * bounds.height * DIRTY_FULL_FRACTION:
+            return None
+        return merged
+        
 class Renderer:
     """
     Handles game rendering with optional bezels and effects
@@ -24,6 +380,29 @@ class Renderer:
         self.game_rect = pygame.Rect(0, 0, 640, 480)  # Base game resolution
         self.bezel_rect = pygame.Rect(0, 0, config.window_width, config.window_height)
         
+        # Overlays and frame buffers by name, with the settings they were built for
+        self._layers: Dict[str, Tuple[Hashable, pygame.Surface]] = {}
+        
+        # Phosphor history for the current frame size and format
+        self._phosphor: Optional[Tuple[Hashable, PhosphorTrail]] = None
+        
+        # Remap table for the current curvature, with the settings it was built for
+        self._curvature: Optional[Tuple[Hashable, CurvatureMap]] = None
+        
+        # Compiled color settings and the scratch arrays they run in, sized
+        # for a whole surface so regions of it grade in slices of them
+        self._grade: Optional[Tuple[Hashable, ColorGrade]] = None
+        self._grade_scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        
+        # Set to a DirtyTracker to redraw only what the game marks as changed
+        self.dirty: Optional[DirtyTracker] = None
+        
+        # Layout and settings on screen now, frames of afterglow still to
+        # show, and which source column and row each game-area pixel shows
+        self._shown: Optional[Hashable] = None
+        self._settling = 0
+        self._scale_maps: Optional[Tuple[Hashable, Tuple[np.ndarray, np.ndarray]]] = None
+        
     def init_display(self):
         """Initialize pygame display"""
         pygame.init()
@@ -77,9 +456,17 @@ class Renderer:
                     self.bezel_rect.height - padding * 2
                 )
                 
+    def _layer(self, name: str, key: Hashable,
+               build: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """Surface cached under name, rebuilt only when key (size and settings) changes"""
+        cached = self._layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = self._layers[name] = (key, build())
+        return cached[1]
+        
     def apply_crt_effects(self, surface: pygame.Surface) -> pygame.Surface:
-        """Apply CRT effects to game surface"""
-        result = surface.copy()
+        """Apply CRT effects to game surface in place, returns the result"""
+        result = surface
         
         if self.config.scanlines:
             self.apply_scanlines(result)
@@ -95,79 +482,195 @@ class Renderer:
             
         return result
     
-    def apply_scanlines(self, surface: pygame.Surface):
-        """Apply scanline effect"""
-        # Create scanline overlay
-        overlay = pygame.Surface(surface.get_size())
-        overlay.fill((0, 0, 0))
+    def apply_scanlines(self, surface: pygame.Surface, area: Optional[pygame.Rect] = None):
+        """Apply scanline effect, to area only if given"""
+        size = surface.get_size()
+        intensity = self.config.scanline_intensity
+        overlay = self._layer("scanlines", (size, intensity),
+                              lambda: self._build_scanlines(size, intensity))
+        area = area or surface.get_rect()
+        surface.blit(overlay, area, area, special_flags=pygame.BLEND_SUB)
         
-        # Draw horizontal lines
-        for y in range(0, surface.get_height(), 3):
-            pygame.draw.line(overlay, (255, 255, 255), (0, y), (surface.get_width(), y))
-            
-        # Blend with original
-        overlay.set_alpha(int(255 * self.config.scanline_intensity))
-        surface.blit(overlay, (0, 0), special_flags=pygame.BLEND_SUB)
+    @staticmethod
+    def _build_scanlines(size: Tuple[int, int], intensity: float) -> pygame.Surface:
+        """Overlay subtracting intensity from every scanline row"""
+        overlay = pygame.Surface(size)
+        overlay.fill((0, 0, 0))
+        pixels = pygame.surfarray.pixels3d(overlay)
+        pixels[:, ::SCANLINE_SPACING] = int(255 * intensity)
+        del pixels
+        return overlay
         
     def apply_phosphor_glow(self, surface: pygame.Surface):
-        """Apply phosphor persistence effect"""
-        # Simple glow simulation - would need shader for better effect
-        glow = pygame.transform.smoothscale(
-            surface, 
-            (surface.get_width() // 4, surface.get_height() // 4)
-        )
-        glow = pygame.transform.smoothscale(
-            glow,
-            surface.get_size()
-        )
-        glow.set_alpha(64)
-        surface.blit(glow, (0, 0), special_flags=pygame.BLEND_ADD)
+        """Apply phosphor persistence and glow"""
+        key = (surface.get_size(), surface.get_bitsize(), surface.get_masks())
+        if self._phosphor is None or self._phosphor[0] != key:
+            self._phosphor = (key, PhosphorTrail(surface))
+        self._phosphor[1].apply(surface, self.config.phosphor_decay)
         
     def apply_curvature(self, surface: pygame.Surface) -> pygame.Surface:
-        """Apply CRT curvature distortion"""
-        # Simplified barrel distortion - proper implementation would use shader
-        # This is a placeholder for the concept
+        """Apply CRT curvature distortion, returns the curved surface"""
+        size = surface.get_size()
+        key = (size, self.config.crt_curvature, self.config.curvature_bilinear)
+        if self._curvature is None or self._curvature[0] != key:
+            self._curvature = (key, CurvatureMap(*key))
+            
+        # The remap works on whole 32-bit pixels
+        if surface.get_bytesize() != 4:
+            source = surface
+            surface = self._layer("curved", size, lambda: pygame.Surface(size, 0, 32))
+            surface.blit(source, (0, 0))
+        pixels = pygame.surfarray.pixels2d(surface)
+        self._curvature[1].apply(pixels.T)
+        del pixels
         return surface
         
-    def apply_vignette(self, surface: pygame.Surface):
-        """Apply vignette darkening at edges"""
-        overlay = pygame.Surface(surface.get_size())
-        overlay.fill((0, 0, 0))
+    def apply_vignette(self, surface: pygame.Surface, area: Optional[pygame.Rect] = None):
+        """Apply vignette darkening at edges, to area only if given"""
+        size = surface.get_size()
+        intensity = self.config.vignette_intensity
+        overlay = self._layer("vignette", (size, intensity),
+                              lambda: self._build_vignette(size, intensity))
+        area = area or surface.get_rect()
+        surface.blit(overlay, area, area, special_flags=pygame.BLEND_MULT)
         
-        # Create radial gradient (simplified)
-        center = (surface.get_width() // 2, surface.get_height() // 2)
-        max_radius = max(center)
+    @staticmethod
+    def _build_vignette(size: Tuple[int, int], intensity: float) -> pygame.Surface:
+        """Radial gradient to multiply by: white in the middle, darker toward the edges"""
+        width, height = size
+        radius = max(width, height) / 2
+        x = (np.arange(width) - (width - 1) / 2) / radius
+        y = (np.arange(height) - (height - 1) / 2) / radius
+        distance = np.sqrt(x[:, None] ** 2 + y[None, :] ** 2)
+        falloff = np.clip((distance - VIGNETTE_START) / (1 - VIGNETTE_START), 0, 1) ** 2
+        overlay = pygame.Surface(size)
+        pixels = pygame.surfarray.pixels3d(overlay)
+        pixels[...] = (255 * (1 - intensity * falloff)).astype(np.uint8)[:, :, None]
+        del pixels
+        return overlay
         
-        for radius in range(max_radius, max_radius // 2, -5):
-            alpha = int((radius / max_radius) * 255 * self.config.vignette_intensity)
-            pygame.draw.circle(overlay, (0, 0, 0, alpha), center, radius)
-            
-        surface.blit(overlay, (0, 0), special_flags=pygame.BLEND_SUB)
+    @property
+    def color_settings(self) -> Tuple[float, float, float, float]:
+        """Temperature, contrast, brightness and saturation from the config"""
+        config = self.config
+        return (config.color_temperature, config.contrast, config.brightness, config.saturation)
+        
+    @property
+    def colors_neutral(self) -> bool:
+        """True when the color settings leave every pixel unchanged"""
+        return self.color_settings == (NEUTRAL_TEMPERATURE, 1.0, 1.0, 1.0)
         
     def adjust_colors(self, surface: pygame.Surface):
-        """Apply color adjustments"""
-        # This would ideally use shaders or pixel arrays
-        # Placeholder for color temperature, contrast, etc.
-        pass
+        """Apply color temperature, contrast, brightness and saturation in place"""
+        settings = self.color_settings
+        if self._grade is None or self._grade[0] != settings:
+            self._grade = (settings, ColorGrade(*settings))
+        parent_width, parent_height = surface.get_abs_parent().get_size()
+        if self._grade_scratch is None or self._grade_scratch[0].shape != (parent_height, parent_width):
+            self._grade_scratch = (np.empty((parent_height, parent_width), np.int32),
+                                   np.empty((parent_height, parent_width), np.int32))
+        width, height = surface.get_size()
+        scratch = tuple(array[:height, :width] for array in self._grade_scratch)
+        # Grade row by row, the order the pixels sit in memory
+        if surface.get_bytesize() == 4 and sys.byteorder == 'little':
+            channels: List[Optional[int]] = [None] * 4
+            for channel, shift in enumerate(surface.get_shifts()[:3]):
+                channels[shift // 8] = channel
+            pixels = pygame.surfarray.pixels2d(surface)
+            pairs = pixels.T.view(np.uint16).reshape(height, width, 2)
+            self._grade[1].apply_pairs(pairs, tuple(channels), *scratch)
+            del pixels, pairs
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+            self._grade[1].apply(pixels.transpose(1, 0, 2), *scratch)
+            del pixels
+        
+    @property
+    def effects_local(self) -> bool:
+        """True when every enabled effect changes a pixel from that pixel alone"""
+        return not self.config.phosphor_glow and self.config.crt_curvature <= 0
+        
+    def afterglow_frames(self) -> int:
+        """Frames for a full-bright phosphor to fade out of sight"""
+        decay = self.config.phosphor_decay if self.config.phosphor_glow else 0
+        if decay <= 0:
+            return 0
+        if decay >= 1:
+            return sys.maxsize
+        return math.ceil(math.log(PHOSPHOR_FLOOR / 255) / math.log(decay))
         
-    def render_frame(self, game_content: pygame.Surface):
-        """Render a complete frame with all effects"""
-        # Scale game content to fit game area
-        scaled_game = pygame.transform.scale(game_content, self.game_rect.size)
+    def render_frame(self, game_content: pygame.Surface) -> List[pygame.Rect]:
+        """Render a frame with all effects, returns the screen rects updated"""
+        changed = None if self.dirty is None else self.dirty.take(game_content.get_rect())
+        layout = (game_content.get_size(), tuple(self.game_rect), self.bezel_surface,
+                  tuple(self.config.to_json().values()))
+        redraw = layout != self._shown
+        if redraw:
+            self._shown = layout
+            changed = None
+            
+        # Nothing new: keep going only while earlier frames are still fading
+        if changed == []:
+            if not self._settling:
+                return []
+            self._settling -= 1
+        else:
+            self._settling = self.afterglow_frames()
+            
+        if redraw:
+            self.screen.blit(self._backdrop(), (0, 0))
+            self._draw(game_content)
+            pygame.display.flip()
+            return [self.screen.get_rect()]
+        if changed is None or not self.effects_local:
+            self._draw(game_content)
+            pygame.display.update(self.game_rect)
+            return [self.game_rect.copy()]
+        return self._draw_regions(game_content, changed)
+        
+    def _backdrop(self) -> pygame.Surface:
+        """Black screen with the bezel drawn on it"""
+        size = self.screen.get_size()
+        
+        def build():
+            backdrop = pygame.Surface(size, 0, self.screen)
+            backdrop.fill((0, 0, 0))
+            if self.bezel_surface:
+                backdrop.blit(self.bezel_surface, (0, 0))
+            return backdrop
+        return self._layer("backdrop", (size, self.bezel_surface), build)
+        
+    def _graded(self, source: pygame.Surface) -> pygame.Surface:
+        """Buffer the size and format of source to grade it in"""
+        return self._layer("graded", (source.get_size(), source.get_bitsize(), source.get_masks()),
+                           lambda: pygame.Surface(source.get_size(), 0, source))
+        
+    def _frame(self, source: pygame.Surface) -> pygame.Surface:
+        """Game-area buffer in the format of source, kept between frames"""
+        size = self.game_rect.size
+        return self._layer("frame", (size, source.get_bitsize(), source.get_masks()),
+                           lambda: pygame.Surface(size, 0, source))
+        
+    def _draw(self, game_content: pygame.Surface):
+        """Redraw the whole game area on the screen"""
+        # Grade colors before scaling, on far fewer pixels; grading is per
+        # pixel, so the result is the same
+        if not self.colors_neutral:
+            source = game_content
+            game_content = self._graded(source)
+            game_content.blit(source, (0, 0))
+            self.adjust_colors(game_content)
+            
+        # Scale game content to fit game area, into a buffer kept between frames
+        scaled_game = pygame.transform.scale(game_content, self.game_rect.size,
+                                             self._frame(game_content))
         
         # Apply CRT effects if enabled
         if any([self.config.scanlines, self.config.phosphor_glow, 
                 self.config.crt_curvature, self.config.vignette]):
             scaled_game = self.apply_crt_effects(scaled_game)
             
-        # Clear screen
-        self.screen.fill((0, 0, 0))
-        
-        # Draw bezel if loaded
-        if self.bezel_surface:
-            self.screen.blit(self.bezel_surface, (0, 0))
-            
-        # Draw game content
+        # Draw game content over the bezel already on screen
         self.screen.blit(scaled_game, self.game_rect)
         
         # Apply screen-wide effects
@@ -178,8 +681,57 @@ class Renderer:
             )
             # Would apply flicker here
             
-        pygame.display.flip()
+    def _draw_regions(self, game_content: pygame.Surface,
+                      changed: Sequence[pygame.Rect]) -> List[pygame.Rect]:
+        """Redraw the game area under rects of game_content, returns the screen rects"""
+        columns, rows = self._scale_map(game_content.get_size())
+        frame = self._frame(game_content)
+        graded = None if self.colors_neutral else self._graded(game_content)
+        source = game_content if graded is None else graded
+        view = pygame.surfarray.pixels3d if frame.get_bytesize() == 3 else pygame.surfarray.pixels2d
+        
+        updated = []
+        for rect in changed:
+            if graded is not None:
+                graded.blit(game_content, rect, rect)
+                self.adjust_colors(graded.subsurface(rect))
+                
+            # The same pixels pygame.transform.scale would pick for this region
+            left, right = np.searchsorted(columns, (rect.left, rect.right))
+            top, bottom = np.searchsorted(rows, (rect.top, rect.bottom))
+            if left == right or top == bottom:
+                continue
+            target, picture = view(frame), view(source)
+            target[left:right, top:bottom] = picture[np.ix_(columns[left:right], rows[top:bottom])]
+            del target, picture
+            
+            region = pygame.Rect(left, top, right - left, bottom - top)
+            if self.config.scanlines:
+                self.apply_scanlines(frame, region)
+            if self.config.vignette:
+                self.apply_vignette(frame, region)
+            updated.append(self.screen.blit(frame, region.move(self.game_rect.topleft), region))
+            
+        pygame.display.update(updated)
+        return updated
+        
+    def _scale_map(self, source_size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Source column of each game-area column, and source row of each row"""
+        key = (source_size, self.game_rect.size)
+        if self._scale_maps is None or self._scale_maps[0] != key:
+            self._scale_maps = (key, tuple(self._probe_scale(length, scaled)
+                                           for length, scaled in zip(*key)))
+        return self._scale_maps[1]
         
+    @staticmethod
+    def _probe_scale(length: int, scaled: int) -> np.ndarray:
+        """Which of length pixels pygame.transform.scale puts at each of scaled"""
+        probe = pygame.Surface((length, 1), 0, 32)
+        pygame.surfarray.pixels2d(probe)[:, 0] = np.arange(length)
+        stretched = pygame.transform.scale(probe, (scaled, 1))
+        return pygame.surfarray.array2d(stretched)[:, 0] & 0xFFFFFF
+        
+
     def toggle_bezel(self):
         """Toggle through bezel styles"""
         styles = list(BezelStyle)
@@ -3,14 +3,46 @@ Python wrapper for Dungeons of Daggorath
 Provides high-level interface to the game engine
 """
 
+import asyncio
+import contextlib
 import ctypes
+import itertools
 import os
+import shutil
 import subprocess
+import sys
+import tempfile
 import time
 from enum import Enum
-from typing import Optional, List, Dict
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional, List, Dict, Set
 import json
 
+from infrastructure.game_transport import GameTransport, GameTransportError, DEFAULT_TIMEOUT
+
+if TYPE_CHECKING:
+    # Loads NumPy, so only imported where game state is mapped
+    from infrastructure.native_state import NativeState
+
+# Game status from the in-process engine (src/dodlib.h)
+DOD_ERROR = -1
+DOD_RUNNING = 0
+DOD_DEAD = 1
+DOD_WON = 2
+DOD_STOPPED = 3
+
+# Screen text areas for DaggorathGame.text
+TEXT_PRIMARY = 0
+TEXT_STATUS = 1
+TEXT_EXAMINE = 2
+
+# Built by "make lib" next to the dod executable
+if sys.platform == "win32":
+    LIBRARY_NAME = "dod.dll"
+elif sys.platform == "darwin":
+    LIBRARY_NAME = "libdod.dylib"
+else:
+    LIBRARY_NAME = "libdod.so"
+
 class Direction(Enum):
     """Movement and turning directions"""
     FORWARD = ""
@@ -50,26 +82,132 @@ class DaggorathGame:
         self.game_path = os.path.abspath(game_path)
         self.process: Optional[subprocess.Popen] = None
         self.lib: Optional[ctypes.CDLL] = None
+        self.transport: Optional[GameTransport] = None
+        self.status = DOD_STOPPED
+        self.state: Optional["NativeState"] = None
+        
+    def start_subprocess(self, state_path: Optional[str] = None):
+        """Start game as subprocess with pipe communication
         
-    def start_subprocess(self):
-        """Start game as subprocess with pipe communication"""
+        With state_path, the game also publishes its state to that file
+        (ideally on a RAM disk such as /dev/shm), mapped as self.state.
+        """
+        from infrastructure.native_state import NativeState, state_environment
         self.process = subprocess.Popen(
             [self.game_path],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            text=True,
+            env=state_environment(state_path) if state_path else None
         )
+        if state_path:
+            self.state = NativeState.open(state_path)
+        
+    async def start_async(self, state_path: Optional[str] = None) -> None:
+        """Start game as subprocess with non-blocking pipes"""
+        from infrastructure.native_state import NativeState, state_environment
+        self.transport = GameTransport(
+            [self.game_path], cwd=os.path.dirname(self.game_path),
+            env=state_environment(state_path) if state_path else None
+        )
+        await self.transport.start()
+        if state_path:
+            self.state = NativeState.open(state_path)
+        
+    async def send_commands(self, *commands: str,
+                            timeout: Optional[float] = DEFAULT_TIMEOUT) -> None:
+        """Pipeline command strings in one write, without waiting for output"""
+        await self.transport.send(*commands, timeout=timeout)
+        
+    async def stop_async(self) -> Optional[int]:
+        """Stop an async game, returns its exit code"""
+        if self.transport is None:
+            return None
+        code = await self.transport.close()
+        self.transport = None
+        if self.state is not None:
+            self.state.close()
+            self.state = None
+        return code
+        
+    def start_library(self, library_path: Optional[str] = None,
+                      asset_dir: Optional[str] = None) -> int:
+        """Load game as shared library and run it in-process, returns its status
         
-    def start_library(self):
-        """Load game as shared library for direct access"""
-        # This would require building game as .so/.dylib
-        # For now, we'll use the WebAssembly approach
-        pass
+        The game reads conf/, sound/ and saved/ under asset_dir; the
+        working directory is left alone. Game time only passes in
+        send_command and tick.
+        """
+        root = os.path.dirname(self.game_path)
+        library_path = library_path or os.path.join(root, LIBRARY_NAME)
+        asset_dir = os.path.abspath(asset_dir or os.path.join(root, "assets"))
+        if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+            # The renderer still needs a GL context; get one without a display
+            os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+        
+        from infrastructure.native_state import NativeState
+        lib = ctypes.CDLL(library_path)
+        lib.dod_init.argtypes = [ctypes.c_char_p]
+        lib.dod_step.argtypes = [ctypes.c_char_p]
+        lib.dod_tick.argtypes = [ctypes.c_uint]
+        lib.dod_time.restype = ctypes.c_uint
+        lib.dod_text.argtypes = [ctypes.c_int]
+        lib.dod_text.restype = ctypes.c_char_p
+        lib.dod_teardown.restype = None
+        lib.dod_share_state.argtypes = [ctypes.c_char_p]
+        
+        status = lib.dod_init(asset_dir.encode())
+        if status == DOD_ERROR:
+            raise RuntimeError(f"could not start {library_path} with assets in {asset_dir}")
+        self.lib = lib
+        self.status = status
+        self.state = NativeState.from_library(lib)
+        return status
+        
+    def stop_library(self):
+        """Shut down the in-process game"""
+        if self.lib is not None:
+            self.state = None
+            self.lib.dod_teardown()
+            self.status = DOD_STOPPED
+        
+    def share_state(self, path: str) -> "NativeState":
+        """Publish the in-process game's state to a file other processes can map"""
+        from infrastructure.native_state import NativeState
+        if self.lib.dod_share_state(os.path.abspath(path).encode()) == DOD_ERROR:
+            raise RuntimeError(f"could not share state in {path}")
+        self.state = NativeState.from_library(self.lib)
+        return self.state
+        
+    def tick(self, ms: int) -> int:
+        """Let game time pass in the in-process game, returns its status"""
+        self.status = self.lib.dod_tick(ms)
+        return self.status
+        
+    def restart(self) -> int:
+        """Begin a new in-process game, e.g. after death"""
+        self.status = self.lib.dod_restart()
+        return self.status
+        
+    @property
+    def game_time(self) -> int:
+        """Milliseconds on the in-process game's clock"""
+        return self.lib.dod_time()
+        
+    def text(self, area: int = TEXT_PRIMARY) -> str:
+        """Lines of text on screen in the in-process game"""
+        return self.lib.dod_text(area).decode("ascii", errors="replace")
         
     def send_command(self, command: str):
         """Send a command string to the game"""
-        if self.process:
+        if self.lib is not None:
+            # Runs the game until the command has been carried out
+            status = self.lib.dod_step(command.encode("ascii"))
+            if status == DOD_ERROR:
+                raise ValueError(f"Command too long: {command}")
+            self.status = status
+        elif self.process:
             self.process.stdin.write(command + "\n")
             self.process.stdin.flush()
             
@@ -113,6 +251,192 @@ class DaggorathGame:
         self.send_command(f"{Command.ZLOAD.value} {name}")
 
 
+
+# Seconds between looks at an idle game's state during a health check
+HEALTH_POLL = 0.01
+
+
+class GamePoolError(RuntimeError):
+    """A pooled game did not come up at the start of a new game"""
+
+
+class GamePool:
+    """
+    Fixed number of started DaggorathGame processes
+    lease() hands out an idle game and takes it back when the episode
+    ends. The native game takes no commands on stdin, so a returned game
+    is reset by closing it and starting a fresh process in the background;
+    every process publishes its state under state_dir, and a new one only
+    joins the pool once that state shows it at the start of the dungeon.
+    An idle game whose process has exited, or whose clock has stopped
+    moving, is replaced the same way.
+    """
+
+    def __init__(self, size: int, game_path: str = "../dod", state_dir: Optional[str] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 factory: Optional[Callable[[], DaggorathGame]] = None):
+        self.size = size
+        self.game_path = game_path
+        self.timeout = timeout
+        self.factory = factory or (lambda: DaggorathGame(self.game_path))
+        self.spawned = 0
+        self.recycled = 0
+        self.replaced = 0
+        # Shared memory where there is some, as for any DOD_STATE file
+        self._own_dir = state_dir is None
+        self.state_dir = state_dir or tempfile.mkdtemp(
+            prefix="dodpool-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._leased: Set[DaggorathGame] = set()
+        self._starting: Set[asyncio.Task] = set()
+        self._state_paths: Dict[DaggorathGame, str] = {}
+        self._serial = itertools.count()
+        self._closed = False
+
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
+
+    @property
+    def leased(self) -> int:
+        return len(self._leased)
+
+    async def start(self) -> None:
+        """Start every process and wait until they are all ready"""
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(self.size)), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.close()
+            raise errors[0]
+
+    async def _spawn(self) -> None:
+        game = self.factory()
+        path = os.path.join(self.state_dir, f"game{next(self._serial)}.state")
+        self._state_paths[game] = path
+        try:
+            await game.start_async(path)
+            state = game.state.snapshot()
+            if state["level"] != 0 or state["won"]:
+                raise GamePoolError(f"game in {path} did not start a new game")
+        except BaseException:
+            await self._stop(game)
+            raise
+        self.spawned += 1
+        if self._closed:
+            await self._stop(game)
+            return
+        self._idle.put_nowait(game)
+
+    async def _stop(self, game: DaggorathGame) -> None:
+        """Stop a game and remove the file its state was published to"""
+        await game.stop_async()
+        path = self._state_paths.pop(game, None)
+        if path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    def _replace(self, game: DaggorathGame) -> None:
+        """Close a game and start another in the background"""
+        task = asyncio.get_running_loop().create_task(self._respawn(game))
+        self._starting.add(task)
+        task.add_done_callback(self._starting.discard)
+
+    async def _respawn(self, game: DaggorathGame) -> None:
+        from infrastructure.native_state import NativeStateError
+        await self._stop(game)
+        while not self._closed:
+            try:
+                await self._spawn()
+                return
+            except (OSError, GameTransportError, GamePoolError, NativeStateError,
+                    asyncio.TimeoutError):
+                # Keep trying, but do not spin on a binary that will not start
+                await asyncio.sleep(1.0)
+
+    def _alive(self, game: DaggorathGame) -> bool:
+        return (game.transport is not None and game.transport.running
+                and game.state is not None)
+
+    async def _ticking(self, game: DaggorathGame) -> bool:
+        """True once the game publishes a new state; a running game does so every tick"""
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        if not self._alive(game):
+            return False
+        sequence = game.state.sequence
+        while game.state.sequence == sequence:
+            await asyncio.sleep(HEALTH_POLL)
+            if not self._alive(game) or (deadline is not None and loop.time() > deadline):
+                return False
+        return True
+
+    async def acquire(self) -> DaggorathGame:
+        """Wait for an idle game and lease it"""
+        while True:
+            game = await self._idle.get()
+            if self._alive(game):
+                self._leased.add(game)
+                return game
+            self.replaced += 1
+            self._replace(game)
+
+    async def release(self, game: DaggorathGame) -> None:
+        """Retire a leased game; a fresh one takes its place in the pool"""
+        self._leased.discard(game)
+        if self._closed:
+            await self._stop(game)
+            return
+        self.recycled += 1
+        self._replace(game)
+
+    @contextlib.asynccontextmanager
+    async def lease(self) -> AsyncIterator[DaggorathGame]:
+        """async with pool.lease() as game: one episode on a new game"""
+        game = await self.acquire()
+        try:
+            yield game
+        finally:
+            await self.release(game)
+
+    async def check_health(self) -> int:
+        """Watch every idle game's clock, replacing any that stopped; returns the number replaced"""
+        games: List[DaggorathGame] = []
+        while not self._idle.empty():
+            games.append(self._idle.get_nowait())
+        results = await asyncio.gather(*(self._ticking(game) for game in games))
+        replaced = 0
+        for game, healthy in zip(games, results):
+            if not healthy:
+                self.replaced += 1
+                self._replace(game)
+                replaced += 1
+                continue
+            self._idle.put_nowait(game)
+        return replaced
+
+    async def close(self) -> None:
+        """Stop every process, leased ones included"""
+        self._closed = True
+        for task in list(self._starting):
+            task.cancel()
+        await asyncio.gather(*self._starting, return_exceptions=True)
+        games = list(self._leased)
+        while not self._idle.empty():
+            games.append(self._idle.get_nowait())
+        self._leased.clear()
+        await asyncio.gather(*(self._stop(game) for game in games), return_exceptions=True)
+        if self._own_dir:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    async def __aenter__(self) -> 'GamePool':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
 # Example usage for testing
 if __name__ == "__main__":
     game = DaggorathGame()
@@ -0,0 +1,91 @@
+"""
+Combat service - Port of Player::ATTACK / Player::DAMAGE (player.cpp)
+Pure battle calculations shared by the player and creatures
+"""
+
+import random
+from typing import Optional
+
+# Attack/defense factors are 8-bit multipliers where 128 means "unity"
+UNITY = 128
+
+# Empty hand as defined by EMPHND in player.cpp
+EMPTY_HAND_MAGIC_OFFENSE = 0
+EMPTY_HAND_PHYS_OFFENSE = 5
+
+# Player shielding without a shield (shA/shB in creature.cpp)
+NO_SHIELD_FACTOR = 0x80
+
+
+def offense_factor(percentage: int) -> int:
+    """Convert a config offense percentage (0-199) to an 8-bit factor"""
+    return max(0, min(255, percentage * UNITY // 100))
+
+
+def defense_factor(percentage: int) -> int:
+    """Convert a config defense percentage (0-199) to an 8-bit factor
+
+    Higher defense means a lower damage multiplier: 0% takes 255/128 of
+    the damage, 100% takes roughly unity and 199% almost nothing.
+    """
+    return max(0, min(255, (200 - percentage) * 255 // 200))
+
+
+def hit_adjust(attack_power: int, defense_power: int, defense_damage: int) -> int:
+    """Hit roll adjustment used by ATTACK (-75..+120)"""
+    t0 = 15
+    dval = (defense_power - defense_damage) * 4
+
+    while True:
+        dval -= attack_power
+        if dval < 0:
+            break
+        t0 -= 1
+        if t0 <= 0:
+            break
+
+    pidx = t0 - 3
+    return pidx * 10 if pidx > 0 else pidx * 25
+
+
+def damage_dealt(attack_power: int, magic_offense: int, phys_offense: int,
+                 magic_defense: int, phys_defense: int) -> int:
+    """Damage added to the defender by a successful hit"""
+    magic = ((attack_power * magic_offense) >> 7) * magic_defense >> 7
+    physical = ((attack_power * phys_offense) >> 7) * phys_defense >> 7
+    return magic + physical
+
+
+def exertion(power: int, magic_offense: int, phys_offense: int) -> int:
+    """Damage the attacker takes from swinging a weapon (PATTK)"""
+    return (power * ((magic_offense + phys_offense) // 8)) >> 7
+
+
+class CombatService:
+    """
+    Battle calculations with the original 8-bit arithmetic
+    The random source mirrors rng.RANDOM() returning 0-255
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    def random_byte(self) -> int:
+        """Equivalent of rng.RANDOM()"""
+        return self.rng.getrandbits(8)
+
+    def attack(self, attack_power: int, defense_power: int, defense_damage: int) -> bool:
+        """Determine whether an attack strikes its target"""
+        adjust = hit_adjust(attack_power, defense_power, defense_damage)
+        return self.random_byte() + adjust - 127 >= 0
+
+    def damage(self, attack_power: int, magic_offense: int, phys_offense: int,
+               magic_defense: int, phys_defense: int, defense_damage: int) -> int:
+        """Return the defender's new accumulated damage after a hit"""
+        return defense_damage + damage_dealt(
+            attack_power, magic_offense, phys_offense, magic_defense, phys_defense
+        )
+
+    def unlit_miss(self) -> bool:
+        """Attacks in the dark miss three times out of four"""
+        return (self.random_byte() & 3) != 0
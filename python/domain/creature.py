@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 from uuid import UUID, uuid4
 
-from .value_objects import Position, Health
+from .value_objects import Position, Direction, Health
 
 
 @dataclass
@@ -42,6 +42,7 @@ class Creature:
     health: Health = field(default_factory=lambda: Health(10, 10))
     level: int = 0
     is_active: bool = True
+    direction: Direction = Direction.NORTH  # Heading of the last move (P_CCDIR)
     
     @property
     def name(self) -> str:
@@ -113,7 +113,13 @@ class Item:
     
     def activate(self) -> None:
         """Activate item (mainly for torches)."""
-        if self.item_type == ItemType.CONSUMABLE and "duration" in self.template.properties:
+        if self.item_type == ItemType.TORCH:
+            self.is_active = True
+            self.light_level = Light(
+                physical=self.template.properties.get("phys_light", 5),
+                magical=self.template.properties.get("magic_light", 0)
+            )
+        elif self.item_type == ItemType.CONSUMABLE and "duration" in self.template.properties:
             self.is_active = True
             # Set light level for torches
             if self.template.name.upper() == "TORCH":
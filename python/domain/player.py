@@ -3,12 +3,31 @@ Player domain entity - The adventurer exploring the dungeon
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Protocol
 from uuid import UUID, uuid4
 
 from .value_objects import Position, Direction, Health, Weight, Light
 from .item import Item, ItemType
 
+# Resting heart rate and the rate above which the player faints, beats per second
+BASE_HEART_RATE = 4.0
+FAINT_HEART_RATE = 8.0
+
+# Seconds a faint from exertion lasts
+FAINT_DURATION = 5.0
+
+# Exertion left below this counts as rest
+ACTIVITY_FLOOR = 0.05
+
+class TaskScheduler(Protocol):
+    """What Player needs to schedule its heart and recovery, e.g. application.scheduler.Scheduler"""
+    
+    def schedule(self, delay: int, callback: Callable[[int], Optional[int]]) -> Any:
+        """Run callback(now) delay milliseconds from now, returns a task handle"""
+        
+    def cancel(self, task: Any) -> None:
+        """Drop a task returned by schedule"""
+
 @dataclass
 class Player:
     """Player entity with domain logic"""
@@ -23,18 +42,30 @@ class Player:
     backpack: List[Item] = field(default_factory=list)
     
     # Heart system
-    heart_rate: float = 4.0  # Beats per second
-    heart_counter: float = 0.0
+    heart_rate: float = BASE_HEART_RATE  # Beats per second
+    activity: float = 0.0  # Extra beats per second from exertion, eased each beat
     
     # State flags
     is_fainting: bool = False
     faint_duration: float = 0.0
     
+    # Runs the heart while exerted and ends timed faints; without one,
+    # exertion stays and a faint lasts until recover() is called
+    scheduler: Optional[TaskScheduler] = field(default=None, repr=False, compare=False)
+    _recovery: Any = field(default=None, init=False, repr=False, compare=False)
+    _pulse: Any = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         """Calculate initial values"""
         self._update_weight()
         self._update_heart_rate()
     
+    def __getstate__(self):
+        # Tasks belong to the scheduler's owner, which resumes them on a copy
+        state = self.__dict__.copy()
+        state.update(scheduler=None, _recovery=None, _pulse=None)
+        return state
+    
     @property
     def total_weight(self) -> Weight:
         """Calculate total carried weight"""
@@ -215,29 +246,81 @@ class Player:
         else:
             return f"Cannot use {item.name}"
     
-    def update_heartbeat(self, delta_time: float) -> bool:
-        """Update heartbeat counter, returns True if heart beats"""
-        self.heart_counter += delta_time
+    @property
+    def heart_period(self) -> float:
+        """Seconds between heartbeats at the current rate"""
+        return 1.0 / self.heart_rate
+    
+    def exert(self, amount: float) -> None:
+        """Speed the heart up by amount beats per second, e.g. for a move or a blow
         
-        if self.heart_counter >= (1.0 / self.heart_rate):
-            self.heart_counter = 0.0
-            return True  # Heart beat occurred
-            
-        return False
+        Each beat then eases the exertion by half until the player is at rest.
+        """
+        self.activity += amount
+        self._update_heart_rate()
+        if self.scheduler is not None and self._pulse is None and self.activity > 0:
+            self._pulse = self.scheduler.schedule(self._beat_delay(), self._beat)
     
     def check_fainting(self) -> None:
         """Check if player should faint from exhaustion"""
         # Original game: faint if heart rate too high for too long
-        if self.heart_rate > 8.0:  # Threshold
-            self.is_fainting = True
-            self.faint_duration = 5.0  # 5 seconds
+        if self.heart_rate > FAINT_HEART_RATE:
+            self.faint(FAINT_DURATION)
     
-    def update_faint(self, delta_time: float) -> None:
-        """Update fainting state"""
-        if self.is_fainting:
-            self.faint_duration -= delta_time
-            if self.faint_duration <= 0:
-                self.is_fainting = False
+    def faint(self, duration: Optional[float] = None) -> None:
+        """Faint; with a duration (seconds) and a scheduler, recover() follows on its own"""
+        self._cancel_recovery()
+        self.is_fainting = True
+        self.faint_duration = duration or 0.0
+        if duration is not None and self.scheduler is not None:
+            self._recovery = self.scheduler.schedule(round(duration * 1000), self._recover_due)
+    
+    def recover(self) -> None:
+        """End a faint - due faint_duration seconds after a timed one began"""
+        self._cancel_recovery()
+        self.is_fainting = False
+        self.faint_duration = 0.0
+    
+    def attach(self, scheduler: Optional[TaskScheduler]) -> None:
+        """Use scheduler from now on; pending tasks are left for the owner to move (see resume)"""
+        self.scheduler = scheduler
+        self._recovery = None
+        self._pulse = None
+    
+    def scheduled_tasks(self) -> Dict[str, Any]:
+        """Pending task handles by name, for an owner that saves or moves them"""
+        tasks = {"recover": self._recovery, "pulse": self._pulse}
+        return {name: task for name, task in tasks.items() if task is not None}
+    
+    def resume(self, name: str, delay: int) -> None:
+        """Reschedule a task named by scheduled_tasks delay milliseconds from now"""
+        if name == "recover":
+            self._recovery = self.scheduler.schedule(delay, self._recover_due)
+        elif name == "pulse":
+            self._pulse = self.scheduler.schedule(delay, self._beat)
+        else:
+            raise ValueError(f"Unknown player task: {name}")
+        
+    def _beat(self, now: int) -> Optional[int]:
+        """A heartbeat while exerted - ease off, and stop beating once at rest"""
+        self.activity = self.activity / 2 if self.activity > ACTIVITY_FLOOR * 2 else 0.0
+        self._update_heart_rate()
+        if self.activity == 0.0:
+            self._pulse = None
+            return None
+        return self._beat_delay()
+    
+    def _beat_delay(self) -> int:
+        return max(1, round(self.heart_period * 1000))
+        
+    def _recover_due(self, now: int) -> None:
+        self._recovery = None
+        self.recover()
+        
+    def _cancel_recovery(self) -> None:
+        if self._recovery is not None:
+            self.scheduler.cancel(self._recovery)
+            self._recovery = None
     
     def _update_weight(self) -> None:
         """Recalculate weight-based values"""
@@ -246,14 +329,10 @@ class Player:
     
     def _update_heart_rate(self) -> None:
         """Recalculate heart rate based on activity and weight"""
-        base_rate = 4.0
-        
         # Weight penalty
         weight_penalty = self.total_weight.burden_penalty() * 0.5
         
-        # Activity penalty would be added by movement/combat services
-        
-        self.heart_rate = base_rate + weight_penalty
+        self.heart_rate = BASE_HEART_RATE + weight_penalty + self.activity
         
         # Check for fainting
         self.check_fainting()
@@ -0,0 +1,47 @@
+"""
+Infrastructure layer - Persistence and native game process I/O
+Reads and writes files and pipes on behalf of the application layer
+
+Submodules load on first use, so importing one of them does not pull in
+the others (and NumPy, SQLite and the game engine with them).
+"""
+
+import importlib
+from typing import Any
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'EventLogWriter': 'event_log', 'EventLogReader': 'event_log',
+    'DEFAULT_SNAPSHOT_INTERVAL': 'event_log',
+    'GameTransport': 'game_transport', 'GameTransportError': 'game_transport',
+    'NativeState': 'native_state', 'NativeStateError': 'native_state',
+    'STATE_DTYPE': 'native_state', 'STATE_ENV': 'native_state',
+    'OutputParser': 'output_parser',
+    'SaveFileError': 'save_file', 'SAVE_DTYPE': 'save_file', 'PACKED_DTYPE': 'save_file',
+    'load_save': 'save_file', 'load_saves': 'save_file', 'write_save': 'save_file',
+    'to_binary': 'save_file', 'from_binary': 'save_file', 'load_binary': 'save_file',
+    'convert': 'save_file',
+    'CheckpointStore': 'checkpoint_store', 'DEFAULT_REBASE_INTERVAL': 'checkpoint_store',
+    'SaveCatalog': 'save_catalog', 'OBJECT_NAMES': 'save_catalog', 'CREATURE_NAMES': 'save_catalog',
+    'Autosaver': 'autosave', 'AutosaveError': 'autosave', 'load_autosave': 'autosave',
+    'write_atomic': 'autosave',
+    'World': 'domain_codec', 'DomainCodecError': 'domain_codec', 'encode_world': 'domain_codec',
+    'decode_world': 'domain_codec', 'save_world': 'domain_codec', 'load_world': 'domain_codec',
+    'read_blocks': 'domain_codec', 'map_blocks': 'domain_codec',
+    'encode_engine': 'engine_codec', 'decode_engine': 'engine_codec',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,149 @@
+"""
+Autosave - Background saving of a running GameEngine
+The game loop only forks the engine; encoding, compression and the
+atomic file replace happen on a worker thread
+"""
+
+import os
+import tempfile
+import threading
+import zlib
+from typing import Optional
+
+from application.game_engine import GameEngine
+from .engine_codec import decode_engine, encode_engine
+
+# Game milliseconds between saves made by maybe_save
+DEFAULT_INTERVAL_MS = 30_000
+
+# zlib level for saves; higher costs the worker more time, not the game
+DEFAULT_COMPRESSION = 6
+
+
+class AutosaveError(RuntimeError):
+    """The worker could not write a save"""
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Replace path with data so readers see the old file or the new one, never a mix"""
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp = tempfile.mkstemp(prefix=".autosave-", dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except FileNotFoundError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def load_autosave(path: str) -> GameEngine:
+    """Restore the engine from a file written by Autosaver"""
+    with open(path, "rb") as f:
+        return decode_engine(zlib.decompress(f.read()))
+
+
+class Autosaver:
+    """
+    Saves a GameEngine to one file without stalling the game loop
+    Call save() or maybe_save() between steps. The engine is forked, which
+    costs about as much as the creatures on the current level, and the fork
+    is handed to a worker thread. Only the newest pending fork is kept: if
+    saves come in faster than storage can take them, the ones in between
+    are skipped rather than queued. A failed write is raised from the next
+    call on the game thread.
+    """
+
+    def __init__(self, path: str, interval_ms: int = DEFAULT_INTERVAL_MS,
+                 compression: int = DEFAULT_COMPRESSION):
+        self.path = path
+        self.interval_ms = interval_ms
+        self.compression = compression
+        self.saves = 0
+        self.skipped = 0
+        self._last_time: Optional[int] = None
+        self._pending: Optional[GameEngine] = None
+        self._writing = False
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> 'Autosaver':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def save(self, engine: GameEngine) -> None:
+        """Queue the engine's current state to be written"""
+        self._raise_error()
+        snapshot = engine.fork()
+        with self._condition:
+            if self._closed:
+                raise AutosaveError("autosaver is closed")
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = snapshot
+            self._condition.notify()
+        self._last_time = engine.now
+
+    def maybe_save(self, engine: GameEngine) -> bool:
+        """save() once interval_ms of game time has passed since the last one"""
+        if self._last_time is not None and engine.now - self._last_time < self.interval_ms:
+            return False
+        self.save(engine)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued is on disk; False on timeout"""
+        with self._condition:
+            done = self._condition.wait_for(
+                lambda: self._pending is None and not self._writing, timeout)
+        self._raise_error()
+        return done
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write any pending save, then stop the worker"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout)
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise AutosaveError(f"could not write {self.path}: {error}") from error
+
+    def _run(self) -> None:
+        condition = self._condition
+        while True:
+            with condition:
+                condition.wait_for(lambda: self._pending is not None or self._closed)
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    return
+                self._writing = True
+            try:
+                write_atomic(self.path, zlib.compress(encode_engine(snapshot), self.compression))
+                self.saves += 1
+            except Exception as error:
+                self._error = error
+            finally:
+                with condition:
+                    self._writing = False
+                    condition.notify_all()
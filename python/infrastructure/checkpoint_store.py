@@ -0,0 +1,174 @@
+"""
+Checkpoint store - Delta-compressed chain of native game saves
+Each checkpoint is stored as the XOR of its packed record with the one
+before, compressed; a full base is written every rebase_interval entries
+"""
+
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import BinaryIO, List, Optional
+
+import numpy as np
+
+from .save_file import (
+    PathLike, load_save, pack, unpack, write_save
+)
+
+MAGIC = b"DODCKPT\x01"
+
+# Every record is a kind byte and payload length, then the index and zlib data
+RECORD_HEADER = struct.Struct("<BI")
+CHECKPOINT_RECORD = struct.Struct("<I")
+
+KIND_BASE = ord("B")
+KIND_DELTA = ord("D")
+
+# Checkpoints per base; bounds the deltas applied to rebuild any one
+DEFAULT_REBASE_INTERVAL = 64
+
+# A delta this large (against the compressed base) means the game moved on,
+# e.g. to a new level; start a fresh base instead
+REBASE_RATIO = 0.5
+
+
+class CheckpointStore:
+    """
+    Append-only file of checkpoints of one game
+    Consecutive saves differ in a few fields, so their XOR is almost all
+    zero bytes and compresses to a few dozen bytes. Loading a checkpoint
+    reads its base and applies at most rebase_interval - 1 deltas. A torn
+    final record, from a crash mid-write, is dropped when the store is
+    reopened.
+    """
+
+    def __init__(self, path: PathLike, rebase_interval: int = DEFAULT_REBASE_INTERVAL):
+        if rebase_interval < 1:
+            raise ValueError("rebase_interval must be at least 1")
+        self.path = path
+        self.rebase_interval = rebase_interval
+        self.bases: List[int] = []
+        self._kinds = array('B')
+        self._offsets = array('q')
+        self._base_size = 0
+        self._last: Optional[bytes] = None
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file: Optional[BinaryIO] = open(path, "r+b" if exists else "w+b")
+        if exists:
+            self._scan()
+        else:
+            self._file.write(MAGIC)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def __enter__(self) -> 'CheckpointStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _scan(self) -> None:
+        """Index every complete record and cut off a torn one"""
+        data = self._file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not a checkpoint store")
+
+        offset = len(MAGIC)
+        header_size = RECORD_HEADER.size
+        while offset + header_size <= len(data):
+            kind, length = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            if start + length > len(data):
+                break
+            index, = CHECKPOINT_RECORD.unpack_from(data, start)
+            if index != len(self._kinds):
+                raise ValueError(f"{self.path}: checkpoint {index} out of sequence")
+            if kind == KIND_BASE:
+                self.bases.append(index)
+                self._base_size = length
+            elif kind != KIND_DELTA or not self.bases:
+                raise ValueError(f"{self.path}: bad record for checkpoint {index}")
+            self._kinds.append(kind)
+            self._offsets.append(offset)
+            offset = start + length
+
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        if self._kinds:
+            self._last = self._packed(len(self._kinds) - 1)
+
+    def append(self, record: np.void) -> int:
+        """Add a SAVE_DTYPE record as the next checkpoint, returns its index"""
+        index = len(self._kinds)
+        packed = pack(record)
+        kind = KIND_BASE
+        data = zlib.compress(packed)
+        if self._last is not None and index - self.bases[-1] < self.rebase_interval:
+            changed = np.bitwise_xor(np.frombuffer(packed, dtype=np.uint8),
+                                     np.frombuffer(self._last, dtype=np.uint8))
+            delta = zlib.compress(changed.tobytes())
+            if len(delta) < self._base_size * REBASE_RATIO:
+                kind, data = KIND_DELTA, delta
+
+        payload = CHECKPOINT_RECORD.pack(index) + data
+        self._offsets.append(self._file.tell())
+        self._file.write(RECORD_HEADER.pack(kind, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self._kinds.append(kind)
+        if kind == KIND_BASE:
+            self.bases.append(index)
+            self._base_size = len(payload)
+        self._last = packed
+        return index
+
+    def add_save(self, path: PathLike) -> int:
+        """Add a .dod file written by ZSAVE, returns its index"""
+        return self.append(load_save(path))
+
+    def load(self, index: int) -> np.void:
+        """The SAVE_DTYPE record of a checkpoint"""
+        return unpack(self._packed(index))[0]
+
+    def export(self, index: int, path: PathLike, newline: str = "\n") -> None:
+        """Write a checkpoint as a .dod file the game can ZLOAD"""
+        write_save(self.load(index), path, newline)
+
+    def _packed(self, index: int) -> bytes:
+        if index < 0:
+            index += len(self._kinds)
+        if not 0 <= index < len(self._kinds):
+            raise IndexError(f"checkpoint {index} outside store of {len(self._kinds)}")
+        if index == len(self._kinds) - 1 and self._last is not None:
+            return self._last
+
+        # Read the base and its deltas up to index in one go
+        base = self.bases[bisect_right(self.bases, index) - 1]
+        start = self._offsets[base]
+        end = self._offsets[index + 1] if index + 1 < len(self._offsets) else None
+        position = self._file.tell()
+        self._file.seek(start)
+        data = self._file.read(-1 if end is None else end - start)
+        self._file.seek(position)
+
+        offset = 0
+        header_size = RECORD_HEADER.size + CHECKPOINT_RECORD.size
+        record = None
+        for _ in range(base, index + 1):
+            kind, length = RECORD_HEADER.unpack_from(data, offset)
+            chunk = zlib.decompress(data[offset + header_size:offset + RECORD_HEADER.size + length])
+            if kind == KIND_BASE:
+                record = np.frombuffer(chunk, dtype=np.uint8).copy()
+            else:
+                record ^= np.frombuffer(chunk, dtype=np.uint8)
+            offset += RECORD_HEADER.size + length
+        return record.tobytes()
+
+    def close(self) -> None:
+        """Flush and close the store file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,532 @@
+"""
+Domain codec - Versioned binary files for the whole domain model
+Level grids and entity stores are raw, aligned array blocks that load as
+zero-copy views; the rest of the graph is a small tagged encoding
+"""
+
+import gc
+import mmap
+import struct
+from itertools import chain, compress
+from operator import attrgetter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from domain.creature import Creature, CreatureType
+from domain.dungeon import Cell, CellType, Dungeon, Level, Room
+from domain.item import Item, ItemTemplate, ItemType
+from domain.player import Player
+from domain.value_objects import Direction, Health, Light, Position
+
+MAGIC = b"DODW"
+VERSION = 1
+
+# Magic, version, reserved, offset of the tagged metadata
+HEADER = struct.Struct("<4sHHQ")
+
+# Array blocks start on this boundary so every view is aligned
+ALIGNMENT = 16
+
+# Level grids: CellType code per cell, MISSING where the level has none
+MISSING = 0x7F
+REVEALED = 0x80
+
+NO_REF = -1
+
+CREATURE_DTYPE = np.dtype([
+    ("id", "V16"), ("group", "<i4"), ("type", "<i4"),
+    ("row", "<i4"), ("col", "<i4"), ("depth", "<i4"),
+    ("health", "<i4"), ("max_health", "<i4"), ("level", "<i4"),
+    ("active", "u1"), ("direction", "u1"),
+])
+
+ITEM_DTYPE = np.dtype([
+    ("id", "V16"), ("template", "<i4"), ("placed", "u1"),
+    ("equipped", "u1"), ("active", "u1"),
+    ("row", "<i4"), ("col", "<i4"), ("depth", "<i4"),
+    ("condition", "<f8"), ("light", "<i4"), ("magic_light", "<i4"),
+])
+
+# Room cells and floor item slots: row, col, depth (and item index)
+POSITION_DTYPE = np.dtype("<i4")
+
+_CELL_TYPES = list(CellType)
+_CELL_CODES_BY_ID = {id(cell_type): code for code, cell_type in enumerate(_CELL_TYPES)}
+_cell_type = attrgetter("cell_type")
+_is_revealed = attrgetter("is_revealed")
+_properties = attrgetter("properties")
+
+
+class World(NamedTuple):
+    """Everything the codec stores: the map and what lives in it"""
+    dungeon: Dungeon
+    player: Optional[Player] = None
+    creatures: Optional[Dict[int, List[Creature]]] = None
+    floor_items: Optional[Dict[Position, List[Item]]] = None
+
+
+class DomainCodecError(ValueError):
+    """Data is not a domain file, is from another version, or is damaged"""
+
+
+# What reading a truncated or garbled file raises before it is reported
+_CORRUPT = (IndexError, KeyError, OverflowError, TypeError, ValueError, UnicodeDecodeError,
+            struct.error)
+
+
+# ----------------------------------------------------------------------
+# Tagged values
+# ----------------------------------------------------------------------
+
+def _varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _pack(out: bytearray, value: Any) -> None:
+    """Append value with a one-byte type tag"""
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"i"
+        _varint(out, value << 1 if value >= 0 else (~value << 1) | 1)
+    elif isinstance(value, float):
+        out += b"d"
+        out += struct.pack("<d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s"
+        _varint(out, len(data))
+        out += data
+    elif isinstance(value, bytes):
+        out += b"b"
+        _varint(out, len(value))
+        out += value
+    elif isinstance(value, UUID):
+        out += b"u"
+        out += value.bytes
+    elif isinstance(value, Position):
+        out += b"p"
+        for number in (value.row, value.col, value.level):
+            _varint(out, number << 1 if number >= 0 else (~number << 1) | 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        out += b"l" if isinstance(value, list) else b"t" if isinstance(value, tuple) else b"S"
+        _varint(out, len(value))
+        for element in value:
+            _pack(out, element)
+    elif isinstance(value, dict):
+        out += b"m"
+        _varint(out, len(value))
+        for key, element in value.items():
+            _pack(out, key)
+            _pack(out, element)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__} in a domain file")
+
+
+class _Reader:
+    """Decodes _pack output from a buffer"""
+
+    def __init__(self, data, offset: int):
+        self.data = data
+        self.offset = offset
+
+    def varint(self) -> int:
+        data = self.data
+        offset = self.offset
+        result = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.offset = offset
+                return result
+            shift += 7
+
+    def signed(self) -> int:
+        value = self.varint()
+        return ~(value >> 1) if value & 1 else value >> 1
+
+    def value(self) -> Any:
+        tag = self.data[self.offset]
+        self.offset += 1
+        if tag == 0x69:  # i
+            return self.signed()
+        if tag == 0x73 or tag == 0x62:  # s, b
+            size = self.varint()
+            start = self.offset
+            self.offset += size
+            raw = bytes(self.data[start:self.offset])
+            return raw.decode("utf-8") if tag == 0x73 else raw
+        if tag == 0x6C or tag == 0x74 or tag == 0x53:  # l, t, S
+            items = [self.value() for _ in range(self.varint())]
+            return items if tag == 0x6C else tuple(items) if tag == 0x74 else set(items)
+        if tag == 0x6D:  # m
+            result = {}
+            for _ in range(self.varint()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == 0x4E:  # N
+            return None
+        if tag == 0x54:  # T
+            return True
+        if tag == 0x46:  # F
+            return False
+        if tag == 0x64:  # d
+            value, = struct.unpack_from("<d", self.data, self.offset)
+            self.offset += 8
+            return value
+        if tag == 0x75:  # u
+            start = self.offset
+            self.offset += 16
+            return UUID(bytes=bytes(self.data[start:self.offset]))
+        if tag == 0x70:  # p
+            return Position(self.signed(), self.signed(), self.signed())
+        raise DomainCodecError(f"unknown tag {tag:#x} at offset {self.offset - 1}")
+
+
+def pack_value(value: Any) -> bytes:
+    """value in the tagged encoding of domain file metadata"""
+    out = bytearray()
+    _pack(out, value)
+    return bytes(out)
+
+
+def unpack_value(data, offset: int = 0) -> Any:
+    """Decode a pack_value() encoding starting at offset in data"""
+    try:
+        return _Reader(memoryview(data), offset).value()
+    except DomainCodecError:
+        raise
+    except _CORRUPT as error:
+        raise DomainCodecError(f"tagged value is corrupt: {error!r}") from error
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+class _Encoder:
+    """Collects array blocks and interns shared objects by identity"""
+
+    def __init__(self):
+        self.blocks: List[Tuple[str, np.ndarray]] = []
+        self.creature_types: Dict[int, int] = {}
+        self.creature_type_list: List[CreatureType] = []
+        self.templates: Dict[int, int] = {}
+        self.template_list: List[ItemTemplate] = []
+        self.items: Dict[int, int] = {}
+        self.item_list: List[Item] = []
+
+    def block(self, name: str, array: np.ndarray) -> str:
+        self.blocks.append((name, np.ascontiguousarray(array)))
+        return name
+
+    def creature_type(self, kind: CreatureType) -> int:
+        index = self.creature_types.get(id(kind))
+        if index is None:
+            index = self.creature_types[id(kind)] = len(self.creature_type_list)
+            self.creature_type_list.append(kind)
+        return index
+
+    def template(self, template: Optional[ItemTemplate]) -> int:
+        if template is None:
+            return NO_REF
+        index = self.templates.get(id(template))
+        if index is None:
+            index = self.templates[id(template)] = len(self.template_list)
+            self.template_list.append(template)
+        return index
+
+    def item(self, item: Optional[Item]) -> int:
+        if item is None:
+            return NO_REF
+        index = self.items.get(id(item))
+        if index is None:
+            index = self.items[id(item)] = len(self.item_list)
+            self.item_list.append(item)
+        return index
+
+    def level(self, level: Level) -> Dict[str, Any]:
+        grid = np.full((level.width, level.height), MISSING, dtype=np.uint8)
+        cells = level.cells
+        count = len(cells)
+        values = cells.values()
+        if count:
+            # Enum hashing is slow; look cell types up by identity instead
+            keys = np.fromiter(chain.from_iterable(cells), dtype=np.intp, count=2 * count)
+            code = np.fromiter(map(_CELL_CODES_BY_ID.__getitem__, map(id, map(_cell_type, values))),
+                               dtype=np.uint8, count=count)
+            code[np.fromiter(map(_is_revealed, values), dtype=bool, count=count)] |= REVEALED
+            grid[keys[0::2], keys[1::2]] = code
+        cell_properties = [(x, y, cell.properties) for (x, y), cell
+                           in compress(cells.items(), map(_properties, values))]
+
+        rooms = []
+        positions = []
+        for room in level.rooms:
+            start = len(positions)
+            positions.extend((p.row, p.col, p.level) for p in room.positions)
+            rooms.append((room.id, room.name, room.description, room.properties,
+                          start, len(positions)))
+        depth = level.depth
+        return {
+            "depth": depth, "width": level.width, "height": level.height,
+            "grid": self.block(f"level{depth}.grid", grid),
+            "rooms": rooms,
+            "room_cells": self.block(f"level{depth}.rooms",
+                                     np.array(positions, dtype=POSITION_DTYPE).reshape(-1, 3)),
+            "cell_properties": cell_properties,
+        }
+
+    def creatures(self, groups: Dict[int, List[Creature]]) -> str:
+        rows = []
+        for group, creatures in groups.items():
+            for c in creatures:
+                p = c.position
+                rows.append((c.id.bytes, group, self.creature_type(c.creature_type),
+                             p.row, p.col, p.level, c.health.current, c.health.maximum,
+                             c.level, c.is_active, int(c.direction)))
+        return self.block("creatures", np.array(rows, dtype=CREATURE_DTYPE))
+
+    def item_block(self) -> Tuple[str, list]:
+        rows = []
+        properties = []
+        for index, item in enumerate(self.item_list):
+            p = item.position
+            light = item.light_level
+            rows.append((item.id.bytes, self.template(item.template), p is not None,
+                         item.is_equipped, item.is_active,
+                         p.row if p else 0, p.col if p else 0, p.level if p else 0,
+                         item.condition, light.physical, light.magical))
+            if item.properties:
+                properties.append((index, item.properties))
+        return self.block("items", np.array(rows, dtype=ITEM_DTYPE)), properties
+
+
+def encode_world(world: World) -> bytes:
+    """The world as a domain file"""
+    encoder = _Encoder()
+    dungeon = world.dungeon
+    levels = [encoder.level(level) for level in dungeon.levels.values()]
+
+    player = None
+    if world.player is not None:
+        p = world.player
+        player = {
+            "id": p.id, "position": p.position, "direction": int(p.direction),
+            "health": (p.health.current, p.health.maximum),
+            "left_hand": encoder.item(p.left_hand), "right_hand": encoder.item(p.right_hand),
+            "backpack": [encoder.item(item) for item in p.backpack],
+            "heart_rate": p.heart_rate, "activity": p.activity,
+            "is_fainting": p.is_fainting, "faint_duration": p.faint_duration,
+        }
+
+    floor = []
+    for position, items in (world.floor_items or {}).items():
+        floor.extend((position.row, position.col, position.level, encoder.item(item))
+                     for item in items)
+    floor_block = encoder.block("floor", np.array(floor, dtype=POSITION_DTYPE).reshape(-1, 4))
+    creature_block = encoder.creatures(world.creatures or {})
+    item_block, item_properties = encoder.item_block()
+
+    meta = {
+        "cell_types": [cell_type.value for cell_type in _CELL_TYPES],
+        "creature_types": [
+            (k.name, k.base_health, k.damage, k.defense, k.speed, k.description, k.sound)
+            for k in encoder.creature_type_list
+        ],
+        "templates": [
+            (t.name, t.item_type.value, t.value, t.weight, t.description, t.properties)
+            for t in encoder.template_list
+        ],
+        "dungeon": {
+            "id": dungeon.id, "name": dungeon.name, "entrance": dungeon.entrance,
+            "properties": dungeon.properties, "levels": levels,
+        },
+        "player": player,
+        "creatures": creature_block,
+        "creature_groups": list(world.creatures or {}),
+        "items": item_block,
+        "item_properties": item_properties,
+        "floor": floor_block,
+    }
+
+    out = bytearray(HEADER.size)
+    directory = []
+    for name, array in encoder.blocks:
+        out += bytes(-len(out) % ALIGNMENT)
+        dtype = array.dtype
+        directory.append((name, dtype.descr if dtype.names else dtype.str, array.shape, len(out)))
+        out += array.tobytes()
+    meta["blocks"] = directory
+    meta_offset = len(out)
+    _pack(out, meta)
+    HEADER.pack_into(out, 0, MAGIC, VERSION, 0, meta_offset)
+    return bytes(out)
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+
+def _dtype(descr) -> np.dtype:
+    return np.dtype([tuple(field) for field in descr]) if isinstance(descr, list) else np.dtype(descr)
+
+
+def read_meta(data) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Tagged metadata and the array blocks as views sharing memory with data"""
+    if len(data) < HEADER.size:
+        raise DomainCodecError("domain file is truncated")
+    magic, version, _, meta_offset = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise DomainCodecError("not a domain file")
+    if version != VERSION:
+        raise DomainCodecError(f"domain file version {version} is not supported")
+    try:
+        meta = _Reader(memoryview(data), meta_offset).value()
+        blocks = {}
+        for name, descr, shape, offset in meta["blocks"]:
+            dtype = _dtype(descr)
+            count = int(np.prod(shape, dtype=np.int64))
+            blocks[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+    except DomainCodecError:
+        raise
+    except _CORRUPT as error:
+        raise DomainCodecError(f"domain file is corrupt: {error!r}") from error
+    return meta, blocks
+
+
+def read_blocks(data) -> Dict[str, np.ndarray]:
+    """Just the array blocks (level grids, creatures, items, ...) of a domain file"""
+    return read_meta(data)[1]
+
+
+def decode_world(data) -> World:
+    """Rebuild the world from a domain file"""
+    meta, blocks = read_meta(data)
+    # Thousands of cells are allocated and none form cycles; collections
+    # triggered along the way would more than double the decode time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _decode(meta, blocks)
+    except DomainCodecError:
+        raise
+    except _CORRUPT as error:
+        raise DomainCodecError(f"domain file is corrupt: {error!r}") from error
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _decode(meta: Dict[str, Any], blocks: Dict[str, np.ndarray]) -> World:
+    cell_types = [CellType(value) for value in meta["cell_types"]]
+    creature_types = [CreatureType(*fields) for fields in meta["creature_types"]]
+    templates = [
+        ItemTemplate(name, ItemType(kind), value, weight, description, properties)
+        for name, kind, value, weight, description, properties in meta["templates"]
+    ]
+
+    items = []
+    properties = dict(meta["item_properties"])
+    for index, (raw_id, template, placed, equipped, active, row, col, depth,
+                condition, light, magic_light) in enumerate(blocks[meta["items"]].tolist()):
+        items.append(Item(
+            id=UUID(bytes=raw_id), template=templates[template] if template != NO_REF else None,
+            position=Position(row, col, depth) if placed else None,
+            is_equipped=bool(equipped), is_active=bool(active), condition=condition,
+            properties=properties.get(index, {}), light_level=Light(light, magic_light),
+        ))
+
+    info = meta["dungeon"]
+    dungeon = Dungeon(id=info["id"], name=info["name"], entrance=info["entrance"],
+                      properties=info["properties"])
+    for entry in info["levels"]:
+        dungeon.add_level(_decode_level(entry, blocks, cell_types))
+
+    creatures: Dict[int, List[Creature]] = {group: [] for group in meta["creature_groups"]}
+    directions = list(Direction)
+    for (raw_id, group, kind, row, col, depth, health, max_health, level,
+         active, direction) in blocks[meta["creatures"]].tolist():
+        creatures[group].append(Creature(
+            id=UUID(bytes=raw_id), creature_type=creature_types[kind],
+            position=Position(row, col, depth), health=Health(health, max_health),
+            level=level, is_active=bool(active), direction=directions[direction],
+        ))
+
+    floor_items: Dict[Position, List[Item]] = {}
+    for row, col, depth, item in blocks[meta["floor"]].tolist():
+        floor_items.setdefault(Position(row, col, depth), []).append(items[item])
+
+    player = None
+    info = meta["player"]
+    if info is not None:
+        current, maximum = info["health"]
+        player = Player(
+            id=info["id"], position=info["position"], direction=Direction(info["direction"]),
+            health=Health(current, maximum),
+            left_hand=items[info["left_hand"]] if info["left_hand"] != NO_REF else None,
+            right_hand=items[info["right_hand"]] if info["right_hand"] != NO_REF else None,
+            backpack=[items[index] for index in info["backpack"]],
+        )
+        # Stored values win over what __post_init__ worked out
+        player.heart_rate = info["heart_rate"]
+        # Files written before players had exertion hold none
+        player.activity = info.get("activity", 0.0)
+        player.is_fainting = info["is_fainting"]
+        player.faint_duration = info["faint_duration"]
+
+    return World(dungeon, player, creatures, floor_items)
+
+
+def _decode_level(entry: Dict[str, Any], blocks: Dict[str, np.ndarray],
+                  cell_types: List[CellType]) -> Level:
+    level = Level(depth=entry["depth"], width=entry["width"], height=entry["height"])
+    grid = blocks[entry["grid"]]
+    xs, ys = np.nonzero(grid != MISSING)
+    codes = grid[xs, ys]
+    # Cell types and flags come out of NumPy as ready-made Python objects
+    kinds = np.array(cell_types, dtype=object)[codes & (REVEALED - 1)].tolist()
+    revealed = (codes >= REVEALED).tolist()
+    cells = level.cells
+    cells.update(zip(zip(xs.tolist(), ys.tolist()), map(Cell, kinds, revealed)))
+    for x, y, properties in entry["cell_properties"]:
+        cells[(x, y)].properties = properties
+
+    room_cells = blocks[entry["room_cells"]].tolist()
+    for room_id, name, description, properties, start, end in entry["rooms"]:
+        positions = {Position(row, col, depth) for row, col, depth in room_cells[start:end]}
+        level.rooms.append(Room(id=room_id, name=name, positions=positions,
+                                description=description, properties=properties))
+    return level
+
+
+def save_world(world: World, path: str) -> None:
+    """Write the world to path"""
+    with open(path, "wb") as f:
+        f.write(encode_world(world))
+
+
+def load_world(path: str) -> World:
+    """Read a world written by save_world()"""
+    with open(path, "rb") as f:
+        return decode_world(f.read())
+
+
+def map_blocks(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Metadata and array blocks of a domain file, mapped rather than read;
+    the views stay valid for as long as they are referenced"""
+    with open(path, "rb") as f:
+        region = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return read_meta(region)
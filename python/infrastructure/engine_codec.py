@@ -0,0 +1,125 @@
+"""
+Engine codec - Versioned binary snapshots of a running GameEngine
+The world goes through the domain codec; the rest of the engine (clock,
+pending tasks, random state, config) is an explicit tagged record, so
+loading a snapshot never runs code from the file
+"""
+
+import random
+import struct
+from collections import Counter
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from application.events import EventBus
+from application.game_engine import GameEngine, GameStats
+from application.scheduler import Scheduler
+from config.game_config import GameConfig
+from domain.item import Item, ItemTemplate, ItemType
+from domain.value_objects import Light
+from .domain_codec import (
+    DomainCodecError, World, decode_world, encode_world, pack_value, unpack_value
+)
+
+MAGIC = b"DODE"
+VERSION = 1
+
+# Magic, version, reserved, size of the embedded domain file
+HEADER = struct.Struct("<4sHHQ")
+
+
+def _encode_item(item: Optional[Item]) -> Any:
+    if item is None:
+        return None
+    t = item.template
+    light = item.light_level
+    return (item.id, (t.name, t.item_type.value, t.value, t.weight, t.description, t.properties),
+            item.position, item.is_equipped, item.is_active, item.condition,
+            item.properties, (light.physical, light.magical))
+
+
+def _decode_item(fields: Any) -> Optional[Item]:
+    if fields is None:
+        return None
+    (item_id, (name, kind, value, weight, description, template_properties), position,
+     equipped, active, condition, properties, (physical, magical)) = fields
+    return Item(
+        id=item_id,
+        template=ItemTemplate(name, ItemType(kind), value, weight, description, template_properties),
+        position=position, is_equipped=equipped, is_active=active, condition=condition,
+        properties=properties, light_level=Light(physical, magical),
+    )
+
+
+def encode_engine(engine: GameEngine) -> bytes:
+    """The engine's complete state as an engine file"""
+    state = engine.snapshot()
+    world = encode_world(World(state["dungeon"], state["player"],
+                               state["creatures"], state["floor_items"]))
+    record: Dict[str, Any] = {
+        "config": state["config"].to_dict(),
+        "seed": state["seed"],
+        "num_levels": state["num_levels"],
+        "level_size": state["level_size"],
+        "rng": state["rng"].getstate(),
+        "stats": asdict(state["stats"]),
+        "won": state["won"],
+        "dead": state["dead"],
+        "busy_until": state["busy_until"],
+        "torch": _encode_item(state["torch"]),
+        "reveal_count": state["reveal_count"],
+        "occupied": list(state["_occupied"].items()),
+        "heart_idle": state["_heart_idle"],
+        "time": state["_saved_time"],
+        "sound": state["_saved_sound"],
+        "tasks": state["_saved_tasks"],
+    }
+    return HEADER.pack(MAGIC, VERSION, 0, len(world)) + world + pack_value(record)
+
+
+def decode_engine(data, scheduler: Optional[Scheduler] = None,
+                  event_bus: Optional[EventBus] = None) -> GameEngine:
+    """Rebuild an engine from an engine file, optionally on a shared scheduler"""
+    if len(data) < HEADER.size:
+        raise DomainCodecError("engine file is truncated")
+    magic, version, _, world_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise DomainCodecError("not an engine file")
+    if version != VERSION:
+        raise DomainCodecError(f"engine file version {version} is not supported")
+    end = HEADER.size + world_size
+    if end > len(data):
+        raise DomainCodecError("engine file is truncated")
+    world = decode_world(memoryview(data)[HEADER.size:end])
+    record = unpack_value(data, end)
+
+    rng = random.Random()
+    try:
+        rng.setstate(record["rng"])
+        state = {
+            "config": GameConfig.from_dict(record["config"]),
+            "seed": record["seed"],
+            "num_levels": record["num_levels"],
+            "level_size": record["level_size"],
+            "rng": rng,
+            "stats": GameStats(**record["stats"]),
+            "won": record["won"],
+            "dead": record["dead"],
+            "busy_until": record["busy_until"],
+            "dungeon": world.dungeon,
+            "player": world.player,
+            "creatures": world.creatures,
+            "floor_items": world.floor_items,
+            "torch": _decode_item(record["torch"]),
+            "reveal_count": record["reveal_count"],
+            "_occupied": Counter(dict(record["occupied"])),
+            "_heart_idle": record["heart_idle"],
+            "_saved_time": record["time"],
+            "_saved_sound": record["sound"],
+            "_saved_tasks": record["tasks"],
+        }
+        return GameEngine.restore(state, scheduler, event_bus)
+    except DomainCodecError:
+        raise
+    except (AttributeError, IndexError, KeyError, OverflowError, TypeError, ValueError) as error:
+        raise DomainCodecError(f"engine file is corrupt: {error!r}") from error
@@ -0,0 +1,164 @@
+"""
+Event log - Append-only binary record of a game session
+Stores every player action plus periodic full snapshots, so any step can
+be reached by loading the nearest snapshot and replaying the tail
+"""
+
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Iterator, List, Optional
+
+from application.game_engine import Action, GameEngine
+from .engine_codec import decode_engine, encode_engine
+
+# Format name, then version; version 1 snapshots were pickles
+MAGIC = b"DODLOG\x02\x00"
+
+# Every record is a kind byte and payload length, then the payload
+RECORD_HEADER = struct.Struct("<BI")
+ACTION_RECORD = struct.Struct("<IqB")     # step, game time (ms), action
+SNAPSHOT_RECORD = struct.Struct("<Iq")    # step, game time (ms), then zlib engine file
+
+KIND_ACTION = ord("A")
+KIND_SNAPSHOT = ord("S")
+
+# Actions between snapshots; bounds the replay needed for any seek
+DEFAULT_SNAPSHOT_INTERVAL = 500
+
+
+class EventLogWriter:
+    """
+    Records a session as it is played
+    The engine is deterministic given its snapshot and the actions that
+    follow, so actions are the only events stored; domain events are
+    regenerated on the bus during replay.
+    """
+
+    def __init__(self, path: str, engine: GameEngine,
+                 snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL):
+        self.path = path
+        self.engine = engine
+        self.snapshot_interval = snapshot_interval
+        self.steps = 0
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._file.write(MAGIC)
+        self.write_snapshot()
+
+    def __enter__(self) -> 'EventLogWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def step(self, action: Action) -> None:
+        """Play an action on the engine and append it to the log"""
+        time = self.engine.now
+        self.engine.step(action)
+        self._write(KIND_ACTION, ACTION_RECORD.pack(self.steps, time, action))
+        self.steps += 1
+        if self.steps % self.snapshot_interval == 0:
+            self.write_snapshot()
+
+    def write_snapshot(self) -> None:
+        """Append the full engine state at the current step"""
+        data = zlib.compress(encode_engine(self.engine))
+        self._write(KIND_SNAPSHOT, SNAPSHOT_RECORD.pack(self.steps, self.engine.now) + data)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the log file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, kind: int, payload: bytes) -> None:
+        self._file.write(RECORD_HEADER.pack(kind, len(payload)))
+        self._file.write(payload)
+
+
+class EventLogReader:
+    """
+    Random access over a recorded session
+    Opening the log scans it once; actions are kept in compact arrays and
+    snapshots are indexed by step, so a seek reads one snapshot and
+    replays at most snapshot_interval actions.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.actions = array('B')
+        self.times = array('q')
+        self.snapshot_steps: List[int] = []
+        self._snapshot_offsets: List[int] = []
+        self._scan()
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def _scan(self) -> None:
+        """Index every complete record; a torn final record is ignored"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            if data.startswith(MAGIC[:6]):
+                raise ValueError(f"{self.path} is from an unsupported event log version")
+            raise ValueError(f"{self.path} is not a game event log")
+
+        offset = len(MAGIC)
+        header_size = RECORD_HEADER.size
+        while offset + header_size <= len(data):
+            kind, length = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            if start + length > len(data):
+                break
+
+            if kind == KIND_ACTION:
+                step, time, action = ACTION_RECORD.unpack_from(data, start)
+                if step != len(self.actions):
+                    raise ValueError(f"{self.path}: action {step} out of sequence")
+                self.actions.append(action)
+                self.times.append(time)
+            elif kind == KIND_SNAPSHOT:
+                step, _ = SNAPSHOT_RECORD.unpack_from(data, start)
+                self.snapshot_steps.append(step)
+                self._snapshot_offsets.append(start)
+            offset = start + length
+
+        if not self.snapshot_steps:
+            raise ValueError(f"{self.path} has no snapshot to start from")
+
+    def load_snapshot(self, index: int) -> GameEngine:
+        """Restore the engine stored in the index-th snapshot"""
+        with open(self.path, "rb") as f:
+            f.seek(self._snapshot_offsets[index] - RECORD_HEADER.size)
+            _, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            payload = f.read(length)
+        return decode_engine(zlib.decompress(payload[SNAPSHOT_RECORD.size:]))
+
+    def seek(self, step: int) -> GameEngine:
+        """Engine state after the first step actions"""
+        if not 0 <= step <= len(self.actions):
+            raise IndexError(f"step {step} outside log of {len(self.actions)} actions")
+
+        index = bisect_right(self.snapshot_steps, step) - 1
+        engine = self.load_snapshot(index)
+        for action in self.actions[self.snapshot_steps[index]:step]:
+            engine.step(action)
+        return engine
+
+    def seek_time(self, milliseconds: int) -> GameEngine:
+        """Engine state before the first action taken at or after milliseconds"""
+        return self.seek(bisect_left(self.times, milliseconds))
+
+    def replay(self, start: int = 0, stop: Optional[int] = None) -> Iterator[GameEngine]:
+        """Yield the engine after each step from start to stop
+
+        The same engine object is advanced and yielded every time.
+        """
+        stop = len(self.actions) if stop is None else min(stop, len(self.actions))
+        engine = self.seek(start)
+        for action in self.actions[start:stop]:
+            engine.step(action)
+            yield engine
@@ -0,0 +1,142 @@
+"""
+Game transport - Non-blocking pipe I/O with the native game process
+Both output pipes are drained continuously into bounded buffers, so the
+process can never stall on a full pipe; commands go out in single writes
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Sequence
+
+# Seconds to wait for the process to take a write, or to exit
+DEFAULT_TIMEOUT = 5.0
+
+# Bytes read from a pipe at a time
+READ_CHUNK = 64 * 1024
+
+# Tail of stdout and of stderr kept for callers and error reports
+MAX_OUTPUT = 64 * 1024
+
+# Seconds to wait, once stdout closes, for the exit code and last stderr
+EXIT_GRACE = 1.0
+
+
+class GameTransportError(RuntimeError):
+    """The game process went away or stopped reading commands"""
+
+
+class GameTransport:
+    """
+    Asynchronous command channel to a game subprocess
+    send() writes any number of commands in one go and waits only until
+    the pipe has taken them. The native game prints no per-command reply
+    to frame, so nothing waits for output: reader tasks keep the tail of
+    stdout and stderr instead, and the process exiting fails later sends
+    with its exit code and last stderr lines.
+    """
+
+    def __init__(self, argv: Sequence[str], cwd: Optional[str] = None,
+                 encoding: str = "latin-1", env: Optional[Dict[str, str]] = None):
+        self.argv = list(argv)
+        self.cwd = cwd
+        self.env = env
+        self.encoding = encoding
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+        self._readers: List[asyncio.Task] = []
+        self._closed_error: Optional[GameTransportError] = None
+
+    @property
+    def stdout(self) -> str:
+        """The most recent stdout output"""
+        return self._stdout.decode(self.encoding)
+
+    @property
+    def stderr(self) -> str:
+        """The most recent stderr output"""
+        return self._stderr.decode(self.encoding)
+
+    @property
+    def running(self) -> bool:
+        """True while the process is up and its output is open"""
+        return (self.process is not None and self.process.returncode is None
+                and self._closed_error is None)
+
+    async def start(self) -> None:
+        """Launch the process and start draining its output"""
+        self.process = await asyncio.create_subprocess_exec(
+            *self.argv, cwd=self.cwd, env=self.env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        loop = asyncio.get_running_loop()
+        self._readers = [
+            loop.create_task(self._drain_stdout()),
+            loop.create_task(self._drain(self.process.stderr, self._stderr)),
+        ]
+
+    async def send(self, *commands: str, timeout: Optional[float] = DEFAULT_TIMEOUT) -> None:
+        """Write commands in a single write, returns once the pipe has taken them"""
+        if self._closed_error is not None:
+            raise self._closed_error
+        if self.process is None:
+            raise GameTransportError("transport not started")
+        stdin = self.process.stdin
+        stdin.write("".join(command + "\n" for command in commands).encode(self.encoding))
+        try:
+            await asyncio.wait_for(stdin.drain(), timeout)
+        except ConnectionError as error:
+            self._closed_error = GameTransportError(f"game stopped reading commands: {error}")
+            raise self._closed_error
+
+    async def _drain(self, stream: asyncio.StreamReader, kept: bytearray) -> None:
+        while True:
+            data = await stream.read(READ_CHUNK)
+            if not data:
+                break
+            kept += data
+            if len(kept) > MAX_OUTPUT:
+                del kept[:len(kept) - MAX_OUTPUT]
+
+    async def _drain_stdout(self) -> None:
+        await self._drain(self.process.stdout, self._stdout)
+        # Output closes before the process is reaped and stderr runs dry
+        exited = asyncio.ensure_future(self.process.wait())
+        await asyncio.wait([exited, self._readers[1]], timeout=EXIT_GRACE)
+        exited.cancel()
+        if self._closed_error is None:
+            self._closed_error = GameTransportError(self._exit_message())
+
+    def _exit_message(self) -> str:
+        tail = self.stderr.strip().splitlines()[-5:]
+        message = "game process closed its output"
+        if self.process.returncode is not None:
+            message += f" (exit code {self.process.returncode})"
+        if tail:
+            message += ": " + " | ".join(tail)
+        return message
+
+    async def close(self, timeout: float = DEFAULT_TIMEOUT) -> Optional[int]:
+        """Stop the process, returns its exit code"""
+        process = self.process
+        if process is None:
+            return None
+        # A stop we asked for is not reported as the game dying
+        if self._closed_error is None:
+            self._closed_error = GameTransportError("transport closed")
+        if process.returncode is None:
+            if not process.stdin.is_closing():
+                process.stdin.close()
+            # The game never reads stdin, so end of input alone will not stop it
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                pass
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        return process.returncode
@@ -0,0 +1,229 @@
+"""
+Native state - Zero-copy NumPy view of the native engine's state block
+Mirrors struct DodState in src/dodstate.h, mapped from the file the game
+publishes to (DOD_STATE) or straight out of the shared library
+"""
+
+import ctypes
+import mmap
+import os
+import struct
+import time
+from typing import Optional
+
+import numpy as np
+
+# From src/dodstate.h; the layout below must match DOD_STATE_VERSION
+STATE_MAGIC = 0x53444F44
+STATE_VERSION = 1
+
+# Environment variable naming the file the game publishes to
+STATE_ENV = "DOD_STATE"
+
+MAZE_SIZE = 32
+CREATURE_SLOTS = 32
+OBJECT_SLOTS = 72
+
+# MAZLND wall bits, two per side (Dungeon::N_WALL and friends)
+N_WALL = 0x03
+E_WALL = 0x0C
+S_WALL = 0x30
+W_WALL = 0xC0
+
+# Seconds spent retrying a snapshot that keeps racing the writer
+SNAPSHOT_TIMEOUT = 1.0
+
+# Seconds to wait for a starting game to publish its first state
+STARTUP_TIMEOUT = 5.0
+
+CREATURE_DTYPE = np.dtype([
+    ("tmv", "i4"), ("tat", "i4"), ("obj", "i4"),
+    ("pow", "u2"), ("dam", "u2"),
+    ("mgo", "u1"), ("mgd", "u1"), ("pho", "u1"), ("phd", "u1"),
+    ("use", "u1"), ("id", "u1"), ("dir", "u1"), ("row", "u1"), ("col", "u1"),
+    ("pad", "u1", 3),
+])
+
+OBJECT_DTYPE = np.dtype([
+    ("ptr", "i4"),
+    ("xx0", "u2"), ("xx1", "u2"), ("xx2", "u2"),
+    ("row", "u1"), ("col", "u1"), ("lvl", "u1"), ("own", "u1"),
+    ("id", "u1"), ("type", "u1"), ("reveal", "u1"), ("mgo", "u1"), ("pho", "u1"),
+    ("pad", "u1"),
+])
+
+PLAYER_DTYPE = np.dtype([
+    ("lhand", "i4"), ("rhand", "i4"), ("torch", "i4"), ("bagptr", "i4"),
+    ("pow", "u2"), ("dam", "u2"), ("objwt", "u2"),
+    ("mgo", "u1"), ("mgd", "u1"), ("pho", "u1"), ("phd", "u1"),
+    ("row", "u1"), ("col", "u1"), ("dir", "u1"),
+    ("rlite", "u1"), ("mlite", "u1"), ("faint", "u1"),
+    ("heartf", "u1"), ("heartc", "u1"), ("heartr", "u1"), ("hearts", "u1"),
+])
+
+STATE_DTYPE = np.dtype([
+    ("magic", "u4"), ("version", "u4"), ("size", "u4"), ("seq", "u4"),
+    ("time", "u4"),
+    ("level", "u1"), ("won", "u1"), ("frozen", "u1"), ("pad", "u1"),
+    ("seed", "u1", 3), ("carry", "u1"),
+    ("player", PLAYER_DTYPE),
+    ("maze", "u1", (MAZE_SIZE, MAZE_SIZE)),
+    ("creatures", CREATURE_DTYPE, CREATURE_SLOTS),
+    ("objects", OBJECT_DTYPE, OBJECT_SLOTS),
+])
+
+STATE_SIZE = STATE_DTYPE.itemsize
+
+# magic, version and size as they start the block, read without a view
+_HEADER = struct.Struct("=III")
+
+
+class NativeStateError(RuntimeError):
+    """The state block is missing, from another version, or never settles"""
+
+
+def _check_header(magic: int, version: int, size: int) -> None:
+    if magic != STATE_MAGIC:
+        raise NativeStateError("no game state published yet")
+    if version != STATE_VERSION or size != STATE_SIZE:
+        raise NativeStateError(
+            f"state layout v{version} ({size} bytes) does not match "
+            f"v{STATE_VERSION} ({STATE_SIZE} bytes)"
+        )
+
+
+class NativeState:
+    """
+    Live view of a DodState block
+    The arrays returned by state, player, maze, creatures and objects share
+    memory with the game, so reading them costs nothing and they change as
+    the game runs. They can be caught halfway through an update; use
+    snapshot() when the fields must agree with each other.
+    """
+
+    def __init__(self, buffer, owner=None):
+        if len(memoryview(buffer).cast("B")) < STATE_SIZE:
+            raise NativeStateError(f"state block is smaller than {STATE_SIZE} bytes")
+        self._buffer = buffer
+        self._owner = owner
+        self.state = np.frombuffer(buffer, dtype=STATE_DTYPE, count=1)[0]
+        self._raw = np.frombuffer(buffer, dtype=np.uint8, count=STATE_SIZE)
+        self._seq = self._raw[12:16].view("u4")
+        self._check()
+
+    @classmethod
+    def open(cls, path: str, timeout: float = STARTUP_TIMEOUT) -> 'NativeState':
+        """Map the file a game started with DOD_STATE=path publishes to,
+        waiting for a just-launched game to write its first state"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with open(path, "rb") as handle:
+                    region = mmap.mmap(handle.fileno(), STATE_SIZE, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # Not created, or not yet sized, by the game
+                if time.monotonic() > deadline:
+                    raise NativeStateError(f"no game state in {path}")
+            else:
+                magic, version, size = _HEADER.unpack_from(region)
+                if magic == STATE_MAGIC:
+                    # Checked before any array views the region, so it can be closed
+                    try:
+                        _check_header(magic, version, size)
+                    except NativeStateError:
+                        region.close()
+                        raise
+                    return cls(region, region)
+                region.close()
+                if time.monotonic() > deadline:
+                    raise NativeStateError(f"no game state published to {path}")
+            time.sleep(0.01)
+
+    @classmethod
+    def from_library(cls, lib: ctypes.CDLL) -> 'NativeState':
+        """View the state block inside a loaded libdod (see dod_state)"""
+        lib.dod_state.restype = ctypes.c_void_p
+        address = lib.dod_state()
+        if not address:
+            raise NativeStateError("library returned no state block")
+        return cls((ctypes.c_ubyte * STATE_SIZE).from_address(address), lib)
+
+    def _check(self) -> None:
+        state = self.state
+        _check_header(state["magic"], state["version"], state["size"])
+
+    @property
+    def sequence(self) -> int:
+        """Bumped twice per update; changes whenever the state does"""
+        return int(self._seq[0])
+
+    @property
+    def player(self) -> np.void:
+        return self.state["player"]
+
+    @property
+    def maze(self) -> np.ndarray:
+        """MAZLND as 32x32 cells of wall bits, 0xFF for solid rock"""
+        return self.state["maze"]
+
+    @property
+    def creatures(self) -> np.ndarray:
+        return self.state["creatures"]
+
+    @property
+    def objects(self) -> np.ndarray:
+        return self.state["objects"]
+
+    def live_creatures(self) -> np.ndarray:
+        """Copy of the creature slots currently in use"""
+        creatures = self.creatures
+        return creatures[creatures["use"] != 0]
+
+    def snapshot(self, timeout: float = SNAPSHOT_TIMEOUT) -> np.void:
+        """Consistent copy of the whole state, taken between two updates"""
+        deadline = time.monotonic() + timeout
+        seq = self._seq
+        raw = self._raw
+        while True:
+            before = int(seq[0])
+            if not before & 1:
+                # A flat byte copy is far cheaper than copying the record
+                copy = raw.copy()
+                if int(seq[0]) == before:
+                    return copy.view(STATE_DTYPE)[0]
+            if time.monotonic() > deadline:
+                raise NativeStateError("state kept changing while it was read")
+            time.sleep(0)
+
+    def wait_for_update(self, sequence: int, timeout: Optional[float] = None,
+                        poll: float = 0.001) -> int:
+        """Block until the sequence moves past sequence, returns the new one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.sequence
+            if current != sequence and not current & 1:
+                return current
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("no state update")
+            time.sleep(poll)
+
+    def close(self) -> None:
+        """Release the mapping; arrays taken from it must not be used after"""
+        self.state = None
+        self._raw = None
+        self._seq = None
+        if isinstance(self._owner, mmap.mmap):
+            try:
+                self._owner.close()
+            except BufferError:
+                # Something still holds a view; the mapping goes with it
+                pass
+        self._owner = None
+        self._buffer = None
+
+
+def state_environment(path: str) -> dict:
+    """os.environ plus the variable that makes the game publish to path"""
+    env = dict(os.environ)
+    env[STATE_ENV] = os.path.abspath(path)
+    return env
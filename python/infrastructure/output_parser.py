@@ -0,0 +1,262 @@
+"""
+Output parser - Typed reading of the native game's screen text
+Takes the rows DaggorathGame.text() returns and turns the ones not seen
+on the previous screen into events with a single precompiled regex
+"""
+
+import re
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+# Screen rows are 32 characters; the status row is split 15 / 2 / 15
+LINE_WIDTH = 32
+HEART_COLUMN = 15
+
+# Heart glyphs on the status row, between beats and on a beat
+HEART_SMALL = "<>"
+HEART_LARGE = "{}"
+
+# How much faster than the last measured rate the heart must beat to
+# count as damage; beats are only seen when the text is read
+DAMAGE_MARGIN = 0.05
+
+
+class Prompt(NamedTuple):
+    """The game is waiting for a command (the bottom row is the prompt)"""
+
+
+class CommandEcho(NamedTuple):
+    """A command line as typed; rejected when the game answered ???"""
+    command: str
+    rejected: bool
+
+
+class Status(NamedTuple):
+    """The status row: what each hand holds and the heart glyph"""
+    left: str
+    heart: str
+    right: str
+
+
+class HeartBeat(NamedTuple):
+    strong: bool
+
+
+class HeartRate(NamedTuple):
+    """Beats per minute, measured between strong beats; rises with damage"""
+    bpm: float
+
+
+class Damaged(NamedTuple):
+    """The heart sped up, so the player was hurt since the last strong beat"""
+    bpm: float
+    previous: float
+
+
+class CreatureHere(NamedTuple):
+    """EXAMINE found a creature in the player's cell"""
+
+
+class Inventory(NamedTuple):
+    """A complete EXAMINE listing"""
+    floor: Tuple[str, ...]
+    backpack: Tuple[str, ...]
+    creature: bool
+
+
+class LevelStarted(NamedTuple):
+    """PREPARE! - a new game or a new level is starting"""
+
+
+class GameStarted(NamedTuple):
+    """The welcome message"""
+
+
+class WizardTaunt(NamedTuple):
+    """ENOUGH! I TIRE OF THIS PLAY... - the wizard's level"""
+
+
+class PlayerDied(NamedTuple):
+    pass
+
+
+class PlayerWon(NamedTuple):
+    pass
+
+
+# One alternative per kind of line; all of them are tried in a single
+# regex match. Order matters where two could match the same line.
+_MATCHERS = (
+    ("prompt", r"\._?"),
+    ("echo", r"\.(?P<command>[A-Z][A-Z ]*?)(?P<rejected> \?\?\?)?"),
+    ("room", r" *IN THIS ROOM"),
+    ("creature", r" *!CREATURE!"),
+    ("rule", r"!{%d}" % LINE_WIDTH),
+    ("backpack", r" *BACKPACK"),
+    ("prepare", r" *PREPARE!"),
+    ("welcome", r" *I DARE YE ENTER\.*|\.* *THE DUNGEONS OF DAGGORATH!*"),
+    ("taunt", r" *ENOUGH! I TIRE OF THIS PLAY\.*"),
+    ("death", r" *YET ANOTHER DOES NOT RETURN\.*"),
+    ("victory", r" *BEHOLD! DESTINY AWAITS THE HAND"),
+    ("status", r"(?P<left>[A-Z ]{%d})(?P<heart>[<{][>}]|  )(?P<right>[A-Z ]{%d})"
+     % (HEART_COLUMN, LINE_WIDTH - HEART_COLUMN - 2)),
+    ("blank", r" *"),
+)
+_LINE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in _MATCHERS))
+
+# Listing sections
+_NONE, _FLOOR, _BACKPACK = range(3)
+
+# Rows that can sit between a listing's header and its end
+_LISTING = (None, "creature", "backpack", "rule")
+
+# Object names in a listing start on 16-column boundaries
+_ITEM_SPLIT = re.compile(r" {2,}")
+
+
+class OutputParser:
+    """
+    Parser for the native game's screen text
+    Every row is classified by one precompiled regex; an EXAMINE listing
+    is gathered item by item and reported when it ends, or with the end
+    of the text. Rows still on screen from the previous call, scrolled up
+    or not, are skipped, so each line is reported once; feed each text
+    area to its own parser. The status row and heart rate are remembered
+    too, so they are only reported when they change.
+    """
+
+    def __init__(self):
+        self.status: Optional[Status] = None
+        self.heart_rate: Optional[float] = None
+        self._section = _NONE
+        self._floor: List[str] = []
+        self._backpack: List[str] = []
+        self._creature = False
+        self._last_beat: Optional[float] = None
+        self._screen: List[str] = []
+
+    def feed_text(self, text: str, now: Optional[float] = None) -> List[tuple]:
+        """Parse screen text such as DaggorathGame.text(), returns its events
+
+        now is when the text was read, in seconds, for heart rate; it
+        defaults to the monotonic clock. With the in-process game, pass
+        DaggorathGame.game_time / 1000.
+        """
+        events: List[tuple] = []
+        lines = text.splitlines()
+        matches = [_LINE.fullmatch(line) for line in lines]
+        kinds = [match.lastgroup if match is not None else None for match in matches]
+        # The status row is tracked by value, so only the other rows scroll
+        screen = [i for i, kind in enumerate(kinds) if kind != "status"]
+        rows = [lines[i] for i in screen]
+        first = self._first_new(rows, [kinds[i] for i in screen])
+        fresh = set(screen[first:])
+        self._screen = rows
+
+        for i, (line, match, kind) in enumerate(zip(lines, matches, kinds)):
+            if kind == "status":
+                self._status(match, now, events)
+            elif i in fresh:
+                self._line(line, match, kind, events)
+        self._end_listing(events)
+        return events
+
+    def _first_new(self, rows: List[str], kinds: List[Optional[str]]) -> int:
+        """Index of the first row that was not on the previous screen"""
+        previous = self._screen
+        if not previous:
+            return 0
+        # The previous bottom row may have been typed on since, so it is
+        # matched separately; try the smallest scroll first
+        last = len(previous) - 1
+        for shift in range(last + 1):
+            kept = last - shift
+            if previous[shift:last] == rows[:kept]:
+                break
+        first = kept
+        if first < len(rows) and rows[first] == previous[last]:
+            first += 1
+        if first < len(rows):
+            # A listing that changed is read again from its header
+            start = first
+            while start > 0 and kinds[start - 1] in _LISTING:
+                start -= 1
+            if start > 0 and kinds[start - 1] == "room":
+                first = start - 1
+        return first
+
+    def _line(self, line: str, match: Optional[re.Match], kind: Optional[str],
+              events: List[tuple]) -> None:
+        if kind is None:
+            # Object names, or text this parser has no use for
+            if self._section != _NONE:
+                self._items(line)
+        elif kind == "blank":
+            self._end_listing(events)
+        elif kind == "room":
+            self._end_listing(events)
+            self._section = _FLOOR
+        elif kind == "creature":
+            self._creature = True
+            events.append(CreatureHere())
+        elif kind == "backpack":
+            self._section = _BACKPACK
+        elif kind == "rule":
+            pass
+        else:
+            self._end_listing(events)
+            if kind == "prompt":
+                events.append(Prompt())
+            elif kind == "echo":
+                rejected = match.group("rejected") is not None
+                events.append(CommandEcho(match.group("command"), rejected))
+            elif kind == "prepare":
+                events.append(LevelStarted())
+            elif kind == "welcome":
+                events.append(GameStarted())
+            elif kind == "taunt":
+                events.append(WizardTaunt())
+            elif kind == "death":
+                events.append(PlayerDied())
+            elif kind == "victory":
+                events.append(PlayerWon())
+
+    def _items(self, line: str) -> None:
+        names = [name for name in _ITEM_SPLIT.split(line.strip()) if name]
+        (self._floor if self._section == _FLOOR else self._backpack).extend(names)
+
+    def _end_listing(self, events: List[tuple]) -> None:
+        if self._section == _NONE:
+            return
+        events.append(Inventory(tuple(self._floor), tuple(self._backpack), self._creature))
+        self._section = _NONE
+        self._floor = []
+        self._backpack = []
+        self._creature = False
+
+    def _status(self, match: re.Match, now: Optional[float], events: List[tuple]) -> None:
+        status = Status(match.group("left").strip(), match.group("heart").strip(),
+                        match.group("right").strip())
+        previous = self.status
+        self.status = status
+        if previous == status:
+            return
+        events.append(status)
+        if status.heart and (previous is None or previous.heart != status.heart):
+            strong = status.heart == HEART_LARGE
+            events.append(HeartBeat(strong))
+            if strong:
+                self._beat(time.monotonic() if now is None else now, events)
+
+    def _beat(self, now: float, events: List[tuple]) -> None:
+        last = self._last_beat
+        self._last_beat = now
+        if last is None or now <= last:
+            return
+        bpm = round(60.0 / (now - last), 1)
+        previous = self.heart_rate
+        if bpm != previous:
+            self.heart_rate = bpm
+            events.append(HeartRate(bpm))
+            if previous is not None and bpm > previous * (1 + DAMAGE_MARGIN):
+                events.append(Damaged(bpm, previous))
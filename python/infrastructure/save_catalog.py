@@ -0,0 +1,276 @@
+"""
+Save catalog - SQLite index of summary fields from many .dod saves
+Saves are parsed in batches with parse_valid_saves and only re-read when
+their modification time or size changes
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .save_file import PathLike, parse_valid_saves
+
+# Object ids (Object::OBJ_* in src/object.h) as the game prints them
+OBJECT_NAMES: Dict[int, str] = {
+    0: "SUPREME RING", 1: "JOULE RING", 2: "ELVISH SWORD", 3: "MITHRIL SHIELD",
+    4: "SEER SCROLL", 5: "THEWS FLASK", 6: "RIME RING", 7: "VISION SCROLL",
+    8: "ABYE FLASK", 9: "HALE FLASK", 10: "SOLAR TORCH", 11: "BRONZE SHIELD",
+    12: "VULCAN RING", 13: "IRON SWORD", 14: "LUNAR TORCH", 15: "PINE TORCH",
+    16: "LEATHER SHIELD", 17: "WOODEN SWORD", 18: "FINAL RING", 19: "ENERGY RING",
+    20: "ICE RING", 21: "FIRE RING", 22: "GOLD RING", 23: "EMPTY FLASK",
+    24: "DEAD TORCH",
+}
+
+# Creature ids (Creature::CRT_* in src/creature.h)
+CREATURE_NAMES: Dict[int, str] = {
+    0: "SPIDER", 1: "VIPER", 2: "GIANT", 3: "BLOB", 4: "KNIGHT", 5: "GIANT",
+    6: "SCORPION", 7: "KNIGHT", 8: "WRAITH", 9: "GALDROG", 10: "WIZARD'S IMAGE",
+    11: "WIZARD",
+}
+CREATURE_KINDS = len(CREATURE_NAMES)
+
+# Files parsed per load_saves call; bounds memory on huge directories
+BATCH_SIZE = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    power INTEGER NOT NULL,
+    damage INTEGER NOT NULL,
+    left_hand INTEGER,
+    right_hand INTEGER,
+    creatures INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS saves_level_power ON saves (level, power);
+CREATE INDEX IF NOT EXISTS saves_left_hand ON saves (left_hand);
+CREATE INDEX IF NOT EXISTS saves_right_hand ON saves (right_hand);
+CREATE TABLE IF NOT EXISTS save_creatures (
+    save_id INTEGER NOT NULL REFERENCES saves (id) ON DELETE CASCADE,
+    creature INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (save_id, creature)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS save_creatures_creature ON save_creatures (creature, count);
+CREATE TABLE IF NOT EXISTS invalid_files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+ItemRef = Union[int, str]
+
+
+def summarize(records: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Level, power, damage, hand object ids (-1 empty) and live creatures
+    per kind, for a batch of SAVE_DTYPE records"""
+    rows = np.arange(len(records))
+    player = records["player"]
+    object_ids = records["objects"]["id"]
+
+    def held(hand):
+        slots = player[hand]
+        return np.where(slots >= 0, object_ids[rows, np.maximum(slots, 0)], -1)
+
+    creatures = records["creatures"]
+    live = creatures["use"] != 0
+    counts = np.zeros((len(records), CREATURE_KINDS), dtype=np.int64)
+    save, slot = np.nonzero(live)
+    kinds = creatures["id"][save, slot]
+    known = kinds < CREATURE_KINDS
+    np.add.at(counts, (save[known], kinds[known]), 1)
+    return (records["level"], player["pow"], player["dam"],
+            held("lhand"), held("rhand"), counts)
+
+
+class SaveCatalog:
+    """
+    Queryable index of saved games
+    Each save contributes one row of summary fields plus its live creature
+    counts. update() rescans directories and parses only files that are
+    new or changed, all in one pass; add() records a save as it is written.
+    Files that turn out not to be saves are remembered by modification
+    time and size too, so they are not parsed again until they change.
+    """
+
+    def __init__(self, path: PathLike = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'SaveCatalog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+
+    def add(self, *paths: PathLike) -> int:
+        """Index saves just written or imported, returns how many"""
+        files = []
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            files.append((path, stat.st_mtime_ns, stat.st_size))
+        return self._index(files)
+
+    def update(self, *directories: PathLike, pattern: str = ".dod") -> Tuple[int, int]:
+        """Bring the catalog in line with the saves in directories,
+        returns how many were (re)indexed and how many removed"""
+        known: Dict[str, Tuple[int, int]] = {}
+        invalid: Dict[str, Tuple[int, int]] = {}
+        found: List[Tuple[str, int, int]] = []
+        for directory in directories:
+            directory = os.path.abspath(directory)
+            prefix = os.path.join(directory, "")
+            for table, stamps in (("saves", known), ("invalid_files", invalid)):
+                for path, mtime, size in self.connection.execute(
+                        f"SELECT path, mtime_ns, size FROM {table} WHERE path >= ? AND path < ?",
+                        (prefix, prefix + "\uffff")):
+                    if os.path.dirname(path) == directory:
+                        stamps[path] = (mtime, size)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(pattern) and entry.is_file():
+                        stat = entry.stat()
+                        found.append((entry.path, stat.st_mtime_ns, stat.st_size))
+
+        changed = []
+        for path, mtime, size in found:
+            stamp = (mtime, size)
+            saved, rejected = known.pop(path, None), invalid.pop(path, None)
+            if stamp != saved and stamp != rejected:
+                changed.append((path, mtime, size))
+        indexed = self._index(changed)
+        with self.connection:
+            self.connection.executemany("DELETE FROM saves WHERE path = ?",
+                                        ((path,) for path in known))
+            self.connection.executemany("DELETE FROM invalid_files WHERE path = ?",
+                                        ((path,) for path in invalid))
+        return indexed, len(known)
+
+    def _index(self, files: Sequence[Tuple[str, int, int]]) -> int:
+        indexed = 0
+        for start in range(0, len(files), BATCH_SIZE):
+            batch, contents, gone = self._read(files[start:start + BATCH_SIZE])
+            records, bad = parse_valid_saves(contents)
+            rejected = set(bad.tolist())
+            invalid = [entry for i, entry in enumerate(batch) if i in rejected]
+            batch = [entry for i, entry in enumerate(batch) if i not in rejected]
+            with self.connection:
+                if batch:
+                    level, power, damage, left, right, counts = summarize(records)
+                    self._store(batch, level.tolist(), power.tolist(), damage.tolist(),
+                                left.tolist(), right.tolist(), counts)
+                # Neither unreadable nor invalid files keep a stale summary
+                self.connection.executemany(
+                    "DELETE FROM saves WHERE path = ?",
+                    [(path,) for path in gone] + [(path,) for path, _, _ in invalid])
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO invalid_files VALUES (?, ?, ?)", invalid)
+            indexed += len(batch)
+        return indexed
+
+    @staticmethod
+    def _read(files: Sequence[Tuple[str, int, int]]
+              ) -> Tuple[List[Tuple[str, int, int]], List[bytes], List[str]]:
+        """Files that could still be read with their contents, and paths of
+        those that went away or became unreadable since they were listed"""
+        batch, contents, gone = [], [], []
+        for entry in files:
+            try:
+                with open(entry[0], "rb") as handle:
+                    contents.append(handle.read())
+            except OSError:
+                gone.append(entry[0])
+                continue
+            batch.append(entry)
+        return batch, contents, gone
+
+    def _store(self, batch, level, power, damage, left, right, counts) -> None:
+        cursor = self.connection.cursor()
+        cursor.executemany("DELETE FROM saves WHERE path = ?", ((p,) for p, _, _ in batch))
+        cursor.executemany("DELETE FROM invalid_files WHERE path = ?", ((p,) for p, _, _ in batch))
+        creature_rows = []
+        for i, (path, mtime, size) in enumerate(batch):
+            cursor.execute(
+                "INSERT INTO saves (path, mtime_ns, size, level, power, damage, "
+                "left_hand, right_hand, creatures) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, mtime, size, level[i], power[i], damage[i],
+                 left[i] if left[i] >= 0 else None, right[i] if right[i] >= 0 else None,
+                 int(counts[i].sum())))
+            save_id = cursor.lastrowid
+            creature_rows.extend((save_id, kind, int(count))
+                                 for kind, count in enumerate(counts[i]) if count)
+        cursor.executemany("INSERT INTO save_creatures VALUES (?, ?, ?)", creature_rows)
+
+    def find(self, level: Optional[int] = None, min_power: Optional[int] = None,
+             max_power: Optional[int] = None, holding: Optional[ItemRef] = None,
+             creature: Optional[ItemRef] = None, min_creatures: int = 1,
+             limit: Optional[int] = None) -> List[str]:
+        """Paths of saves matching every criterion given
+
+        level is the save's LEVEL (0 for the first); holding is an object
+        id or name held in either hand; creature is a creature id or name
+        with at least min_creatures of them alive.
+        """
+        clauses, params = [], []
+        if level is not None:
+            clauses.append("level = ?")
+            params.append(level)
+        if min_power is not None:
+            clauses.append("power >= ?")
+            params.append(min_power)
+        if max_power is not None:
+            clauses.append("power <= ?")
+            params.append(max_power)
+        if holding is not None:
+            ids = _ids(holding, OBJECT_NAMES)
+            marks = ", ".join("?" * len(ids))
+            clauses.append(f"(left_hand IN ({marks}) OR right_hand IN ({marks}))")
+            params.extend(ids + ids)
+        if creature is not None:
+            ids = _ids(creature, CREATURE_NAMES)
+            clauses.append(
+                f"id IN (SELECT save_id FROM save_creatures WHERE creature IN "
+                f"({', '.join('?' * len(ids))}) GROUP BY save_id HAVING SUM(count) >= ?)")
+            params.extend(ids + [min_creatures])
+
+        sql = "SELECT path FROM saves"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [path for path, in self.connection.execute(sql, params)]
+
+    def query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        """Run any read-only SQL against the saves and save_creatures tables"""
+        return self.connection.execute(sql, tuple(params)).fetchall()
+
+    def close(self) -> None:
+        """Close the database"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def _ids(ref: ItemRef, names: Dict[int, str]) -> List[int]:
+    """Ids with a given name (some names cover two ids), or the id itself"""
+    if isinstance(ref, int):
+        return [ref]
+    wanted = ref.upper().replace("_", " ")
+    ids = [key for key, name in names.items() if name == wanted]
+    if not ids:
+        raise KeyError(f"unknown name {ref!r}")
+    return ids
@@ -0,0 +1,282 @@
+"""
+Save files - Vectorized reading of native .dod saves and a compact binary form
+Scheduler::SAVE writes one decimal number per line; every number in a batch
+of files is parsed in one NumPy pass and viewed as structured records
+"""
+
+import os
+import struct
+from typing import Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Numbers in a save: original releases stop after the viewer block, later
+# ones append the level seeds, vertical features and game options
+ORIGINAL_FIELDS = 2506
+FIELDS = 2561
+
+# Scheduler::LOAD fills these in for original saves (VFTTAB -1 is 255)
+ORIGINAL_LEVTAB = (0x73, 0xC7, 0x5D, 0x97, 0xF3, 0x13, 0x87)
+ORIGINAL_VFTTAB = (
+    255, 1, 0, 23, 0, 15, 4, 0, 20, 17, 1, 28, 30, 255,
+    1, 2, 3, 0, 3, 31, 0, 19, 20, 0, 31, 0, 255, 255,
+    0, 0, 31, 0, 5, 0, 0, 22, 28, 0, 31, 16, 255, 255,
+)
+
+# Field names and packed types, in file order; names follow native_state
+PLAYER_FIELDS = (
+    ("row", "u1"), ("col", "u1"), ("objwt", "<u2"), ("pow", "<u2"),
+    ("lhand", "<i2"), ("rhand", "<i2"), ("dam", "<u2"), ("dir", "u1"),
+    ("torch", "<i2"), ("rlite", "u1"), ("mlite", "u1"), ("faint", "u1"),
+    ("bagptr", "<i2"), ("heartf", "u1"), ("heartc", "u1"), ("heartr", "u1"),
+    ("hearts", "u1"), ("hbeatf", "u1"),
+)
+CREATURE_FIELDS = (
+    ("pow", "<u2"), ("mgo", "u1"), ("mgd", "u1"), ("pho", "u1"), ("phd", "u1"),
+    ("tmv", "<i4"), ("tat", "<i4"), ("obj", "<i2"), ("dam", "<u2"), ("use", "u1"),
+    ("id", "u1"), ("dir", "u1"), ("row", "u1"), ("col", "u1"),
+)
+OBJECT_FIELDS = (
+    ("ptr", "<i2"), ("row", "u1"), ("col", "u1"), ("lvl", "u1"), ("own", "u1"),
+    ("xx0", "<u2"), ("xx1", "<u2"), ("xx2", "<u2"), ("id", "u1"), ("type", "u1"),
+    ("reveal", "u1"), ("mgo", "u1"), ("pho", "u1"),
+)
+VIEWER_FIELDS = (
+    ("rlight", "u1"), ("mlight", "u1"), ("olight", "u1"), ("vxscal", "u1"),
+    ("vyscal", "u1"), ("txbflg", "u1"), ("tcaret", "<i4"), ("tlen", "<i4"),
+    ("newlin", "u1"),
+)
+OPTION_FIELDS = (
+    ("random_maze", "u1"), ("shield_fix", "u1"), ("vision_scroll", "u1"),
+    ("creatures_ignore_objects", "u1"), ("creatures_insta_regen", "u1"),
+    ("mark_doors_on_scroll_maps", "u1"),
+)
+
+
+def _layout(wide: bool) -> np.dtype:
+    """The save layout with every number as int32 (wide) or packed native types"""
+    def field(kind):
+        return "<i4" if wide else kind
+
+    def block(fields):
+        return [(name, field(kind)) for name, kind in fields]
+
+    return np.dtype([
+        ("level", field("u1")), ("vftptr", field("<i2")),
+        ("maze", field("u1"), (32, 32)),
+        ("player", block(PLAYER_FIELDS)),
+        ("seed", field("u1"), 3), ("carry", field("u1")),
+        ("frzflg", field("u1")), ("cmxptr", field("<i2")), ("cmxlnd", field("u1"), 60),
+        ("creatures", block(CREATURE_FIELDS), 32),
+        ("ofindf", field("<i2")), ("ocbptr", field("<i2")), ("ofindp", field("<i2")),
+        ("objects", block(OBJECT_FIELDS), 72),
+        ("viewer", block(VIEWER_FIELDS)),
+        ("levtab", field("u1"), 7), ("vfttab", field("u1"), 42),
+        ("options", block(OPTION_FIELDS)),
+    ])
+
+
+# One int32 per number in file order, so parsed numbers view straight onto it
+SAVE_DTYPE = _layout(wide=True)
+
+# Same fields at the engine's own widths, for the binary form
+PACKED_DTYPE = _layout(wide=False)
+
+# Binary form: header, then count PACKED_DTYPE records
+BINARY_MAGIC = b"DODB"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+
+assert SAVE_DTYPE.itemsize == FIELDS * 4
+
+# Longest text of an int32, "-2147483648"; anything longer is out of range
+MAX_DIGITS = 11
+
+# What Scheduler::LOAD assumes for the fields original saves lack
+_ORIGINAL_TAIL = np.array(ORIGINAL_LEVTAB + ORIGINAL_VFTTAB + (0,) * len(OPTION_FIELDS),
+                          dtype=np.int32)
+
+
+class SaveFileError(ValueError):
+    """A file is not a .dod save or a binary save batch, or a record will not pack"""
+
+    def __init__(self, message: str, index: Optional[int] = None):
+        super().__init__(message)
+        # Position of the offending save in a batch, when known
+        self.index = index
+
+
+def _scan(data: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Value and start offset of every decimal integer in data, and
+    whether it fits an int32 at all"""
+    empty = np.zeros(0, dtype=np.int64)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if not len(buf):
+        return empty, empty.astype(np.intp), empty.astype(bool)
+    in_number = (buf >= 0x30) & (buf <= 0x39)
+    in_number |= buf == 0x2D
+    flags = in_number.view(np.int8)
+    edges = np.empty(len(flags) + 1, dtype=np.int8)
+    edges[0] = flags[0]
+    edges[-1] = -flags[-1]
+    np.subtract(flags[1:], flags[:-1], out=edges[1:-1])
+    bounds = np.flatnonzero(edges)
+    starts, ends = bounds[0::2], bounds[1::2]
+    if not len(starts):
+        return empty, starts, empty.astype(bool)
+    lengths = ends - starts
+
+    # Add up digits column by column from the right; separators and the
+    # sign come out negative and are clamped to zero
+    digits = buf.astype(np.int64)
+    digits -= 0x30
+    values = np.maximum(digits[ends - 1], 0)
+    scale = 10
+    for column in range(2, min(int(lengths.max()), MAX_DIGITS) + 1):
+        digit = digits[ends - column]
+        np.maximum(digit, 0, out=digit)
+        digit[lengths < column] = 0
+        digit *= scale
+        values += digit
+        scale *= 10
+    np.negative(values, out=values, where=buf[starts] == 0x2D)
+    fits = (lengths <= MAX_DIGITS) & (values >= -2**31) & (values < 2**31)
+    return values, starts, fits
+
+
+def parse_numbers(data: bytes) -> np.ndarray:
+    """Every decimal integer in data, in one vectorized pass; raises
+    SaveFileError for one that does not fit an int32"""
+    values, _, fits = _scan(data)
+    if not fits.all():
+        raise SaveFileError(f"number {int(np.argmin(fits))} does not fit an int32")
+    return values.astype(np.int32)
+
+
+def parse_saves(contents: Sequence[bytes]) -> np.ndarray:
+    """Records for the text of several saves, parsed together"""
+    records, bad = parse_valid_saves(contents)
+    if len(bad):
+        index = int(bad[0])
+        count = len(_scan(contents[index])[0])
+        if count in (ORIGINAL_FIELDS, FIELDS):
+            raise SaveFileError(f"save {index} has a number that does not fit an int32", index)
+        raise SaveFileError(f"save {index} has {count} numbers, "
+                            f"expected {ORIGINAL_FIELDS} or {FIELDS}", index)
+    return records
+
+
+def parse_valid_saves(contents: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Records for the texts that are saves, in order, and the indices of
+    those that are not, from one parse of the whole batch"""
+    if not contents:
+        return np.zeros(0, dtype=SAVE_DTYPE), np.zeros(0, dtype=np.intp)
+    # Join with separators so numbers never run across files, and note
+    # where each file starts to share the numbers out again
+    joined = b"\n".join(contents)
+    offsets = np.cumsum([0] + [len(text) + 1 for text in contents[:-1]])
+    numbers, starts, fits = _scan(joined)
+    owner = np.searchsorted(offsets, starts, side="right") - 1
+    counts = np.bincount(owner, minlength=len(contents))
+    overflows = np.bincount(owner[~fits], minlength=len(contents))
+
+    full = (counts == FIELDS) & (overflows == 0)
+    original = (counts == ORIGINAL_FIELDS) & (overflows == 0)
+    bad = np.flatnonzero(~(full | original))
+
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    good = len(contents) - len(bad)
+    table = np.empty((good, FIELDS), dtype=np.int32)
+    table[:, ORIGINAL_FIELDS:] = _ORIGINAL_TAIL
+    keep = np.cumsum(full | original) - 1
+    table[keep[full]] = numbers[first[full, None] + np.arange(FIELDS)]
+    table[keep[original], :ORIGINAL_FIELDS] = numbers[first[original, None] + np.arange(ORIGINAL_FIELDS)]
+    return table.view(SAVE_DTYPE).reshape(good), bad
+
+
+def load_saves(paths: Iterable[PathLike]) -> np.ndarray:
+    """Records for many .dod files, parsed in a single pass"""
+    contents = []
+    for path in paths:
+        with open(path, "rb") as handle:
+            contents.append(handle.read())
+    return parse_saves(contents)
+
+
+def load_save(path: PathLike) -> np.void:
+    """The record for one .dod file"""
+    return load_saves([path])[0]
+
+
+def format_save(record: np.void, newline: str = "\n") -> str:
+    """A record as Scheduler::SAVE would write it"""
+    numbers = np.asarray(record).reshape(1).view(np.int32)
+    return "".join(f"{number}{newline}" for number in numbers.tolist())
+
+
+def write_save(record: np.void, path: PathLike, newline: str = "\n") -> None:
+    """Write a record as a .dod file the game can ZLOAD"""
+    with open(path, "w", newline="") as handle:
+        handle.write(format_save(record, newline))
+
+
+def pack(records: np.ndarray) -> bytes:
+    """Records at the engine's own field widths, with no header; raises
+    SaveFileError for a number that does not fit its field"""
+    records = np.ascontiguousarray(records, dtype=SAVE_DTYPE).reshape(-1)
+    packed = records.astype(PACKED_DTYPE)
+    # astype wraps out-of-range numbers silently, so widen again and compare
+    numbers = records.view(np.int32).reshape(len(records), FIELDS)
+    wrapped = packed.astype(SAVE_DTYPE).view(np.int32).reshape(len(records), FIELDS) != numbers
+    if wrapped.any():
+        save, number = (int(i) for i in np.argwhere(wrapped)[0])
+        raise SaveFileError(f"save {save}: {numbers[save, number]} on line {number + 1} "
+                            f"does not fit its field", save)
+    return packed.tobytes()
+
+
+def unpack(data: bytes) -> np.ndarray:
+    """Records from pack(), widened back to SAVE_DTYPE"""
+    return np.frombuffer(data, dtype=PACKED_DTYPE).astype(SAVE_DTYPE)
+
+
+def to_binary(records: np.ndarray) -> bytes:
+    """Records packed at the engine's own field widths, about a third of the text"""
+    records = np.asarray(records, dtype=SAVE_DTYPE).reshape(-1)
+    header = _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(records))
+    return header + pack(records)
+
+
+def view_binary(data) -> np.ndarray:
+    """Packed records of a binary batch, sharing memory with data (bytes or mmap)"""
+    if len(data) < _HEADER.size:
+        raise SaveFileError("binary save batch is truncated")
+    magic, version, _, count = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC:
+        raise SaveFileError("not a binary save batch")
+    if version != BINARY_VERSION:
+        raise SaveFileError(f"binary save version {version} is not supported")
+    if len(data) < _HEADER.size + count * PACKED_DTYPE.itemsize:
+        raise SaveFileError("binary save batch is truncated")
+    return np.frombuffer(data, dtype=PACKED_DTYPE, count=count, offset=_HEADER.size)
+
+
+def from_binary(data) -> np.ndarray:
+    """Records of a binary batch, widened back to SAVE_DTYPE"""
+    return view_binary(data).astype(SAVE_DTYPE)
+
+
+def convert(paths: Iterable[PathLike], destination: PathLike) -> int:
+    """Pack .dod files into one binary batch file, returns how many"""
+    records = load_saves(paths)
+    with open(destination, "wb") as handle:
+        handle.write(to_binary(records))
+    return len(records)
+
+
+def load_binary(path: PathLike) -> np.ndarray:
+    """Records of a binary batch file"""
+    with open(path, "rb") as handle:
+        return from_binary(handle.read())
@@ -0,0 +1,7 @@
+"""
+Presentation layer - Front ends that drive the application layer
+"""
+
+from .game_server import GameServer, Session
+
+__all__ = ['GameServer', 'Session']
@@ -0,0 +1,300 @@
+"""
+Game server - Hosts many headless game sessions in one asyncio process
+Clients send action names, one per line; each tick the server answers with
+one JSON line per session holding its state and the events since last tick
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from config.game_config import GameConfig, DEFAULT_CONFIG
+from domain.value_objects import Position
+from application.events import Event, EventBatch, EventBus
+from application.game_engine import Action, GameEngine
+from application.scheduler import Scheduler, Task
+
+# Game time advanced per server tick, in milliseconds
+DEFAULT_TICK_MS = 50
+
+# Commands a client may queue before the server stops reading its socket
+MAX_QUEUED_COMMANDS = 8
+
+# Undelivered events kept per session; older ones are dropped and counted
+MAX_OUTBOX_EVENTS = 256
+
+# Bytes buffered for a client before updates are held back and coalesced
+WRITE_HIGH_WATER = 64 * 1024
+
+
+def _json_value(value):
+    """Event field as something json can encode"""
+    if isinstance(value, Position):
+        return [value.row, value.col, value.level]
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+
+class Session:
+    """One player's game plus its connection state"""
+
+    def __init__(self, server: 'GameServer', session_id: int, engine: GameEngine,
+                 writer: Optional[asyncio.StreamWriter] = None):
+        self.server = server
+        self.id = session_id
+        self.engine = engine
+        self.writer = writer
+        self.commands: Deque[Action] = deque()
+        self.command_space = asyncio.Event()
+        self.command_space.set()
+        self.outbox: Deque[dict] = deque(maxlen=MAX_OUTBOX_EVENTS)
+        self.dropped = 0
+        self.closed = False
+        self._command_task: Optional[Task] = None
+        engine.events.subscribe(Event, self._collect)
+
+    def enqueue(self, action: Action) -> None:
+        """Queue an action to run as soon as the player is no longer busy"""
+        self.commands.append(action)
+        if len(self.commands) >= MAX_QUEUED_COMMANDS:
+            self.command_space.clear()
+        if self._command_task is None:
+            engine = self.engine
+            self._command_task = self.server.scheduler.schedule(
+                max(0, engine.busy_until - engine.now), self._run_command
+            )
+
+    def _run_command(self, now: int) -> Optional[int]:
+        """Scheduler task - perform the next queued action"""
+        self.engine.perform(self.commands.popleft())
+        self.command_space.set()
+        self.server.dirty.add(self)
+        if self.commands and not self.engine.is_over:
+            return self.engine.busy_until - now
+        self._command_task = None
+        return None
+
+    def _collect(self, batch: EventBatch) -> None:
+        """Copy events out of the bus; records are reused after this returns"""
+        outbox = self.outbox
+        for event in batch:
+            if len(outbox) == outbox.maxlen:
+                self.dropped += 1
+            record = {name: _json_value(getattr(event, name)) for name in event.field_names()}
+            record["type"] = type(event).__name__
+            outbox.append(record)
+        self.server.dirty.add(self)
+
+    def state(self) -> dict:
+        """Summary of what the player can see"""
+        engine = self.engine
+        player = engine.player
+        return {
+            "position": _json_value(player.position),
+            "direction": player.direction.name,
+            "power": engine.power,
+            "damage": engine.damage,
+            "heart_rate": engine.heart_rate,
+            "fainted": player.is_fainting,
+            "light": engine.light,
+            "over": engine.is_over,
+            "won": engine.won,
+        }
+
+    def send_update(self, now: int) -> bool:
+        """Write one batched update; False when held back by backpressure"""
+        writer = self.writer
+        if writer is None or writer.is_closing():
+            return True
+        if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+            return False
+
+        message = {"time": now, "state": self.state(), "events": list(self.outbox)}
+        if self.dropped:
+            message["dropped"] = self.dropped
+        self.outbox.clear()
+        self.dropped = 0
+        writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        return True
+
+    def close(self) -> None:
+        """Stop the session's game and release its connection"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._command_task is not None:
+            self.server.scheduler.cancel(self._command_task)
+            self._command_task = None
+        # The shared scheduler forgets the game; its state is left as it was
+        self.engine.detach()
+        self.command_space.set()
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.close()
+
+
+class GameServer:
+    """
+    Multi-session host sharing one scheduler
+    Every engine runs its creatures, torches and heart on the same
+    scheduler, and queued commands are scheduler tasks that fire when the
+    player stops being busy, so a tick costs only what actually happens
+    in it. Event buses report when they have something to flush, which
+    keeps idle sessions out of the per-tick loop entirely.
+    """
+
+    def __init__(self, config: GameConfig = DEFAULT_CONFIG, tick_ms: int = DEFAULT_TICK_MS,
+                 first_seed: int = 0):
+        self.config = config
+        self.tick_ms = tick_ms
+        self.first_seed = first_seed
+        self.scheduler = Scheduler()
+        self.sessions: Dict[int, Session] = {}
+        self.dirty: Set[Session] = set()
+        self._busy_buses: List[EventBus] = []
+        self._held: Set[Session] = set()
+        self._next_id = 0
+
+    @property
+    def now(self) -> int:
+        return self.scheduler.cur_time
+
+    def _new_seed(self, seed: Optional[int]) -> Tuple[int, int]:
+        session_id = self._next_id
+        self._next_id += 1
+        return session_id, self.first_seed + session_id if seed is None else seed
+
+    def open_session(self, writer: Optional[asyncio.StreamWriter] = None,
+                     seed: Optional[int] = None) -> Session:
+        """Start a new game on the shared scheduler"""
+        session_id, seed = self._new_seed(seed)
+        return self._add_session(session_id, GameEngine(self.config, seed), writer)
+
+    async def open_session_async(self, writer: Optional[asyncio.StreamWriter] = None,
+                                 seed: Optional[int] = None) -> Session:
+        """open_session with the dungeon generated off the event loop"""
+        session_id, seed = self._new_seed(seed)
+        loop = asyncio.get_running_loop()
+        engine = await loop.run_in_executor(None, GameEngine, self.config, seed)
+        return self._add_session(session_id, engine, writer)
+
+    def _add_session(self, session_id: int, engine: GameEngine,
+                     writer: Optional[asyncio.StreamWriter]) -> Session:
+        # Engines are built on a private scheduler, then moved onto the
+        # shared one here, on the loop thread
+        bus = EventBus()
+        bus.on_pending = lambda: self._busy_buses.append(bus)
+        engine.attach(self.scheduler, bus)
+        session = Session(self, session_id, engine, writer)
+        self.sessions[session_id] = session
+        self.dirty.add(session)
+        return session
+
+    def close_session(self, session: Session) -> None:
+        session.close()
+        self.sessions.pop(session.id, None)
+        self.dirty.discard(session)
+        self._held.discard(session)
+
+    def tick(self, now: int) -> int:
+        """Run the world up to now and send batched updates, returns updates sent"""
+        self.scheduler.run_until(now)
+
+        buses, self._busy_buses = self._busy_buses, []
+        for bus in buses:
+            bus.flush()
+
+        # Sessions held back by backpressure retry every tick until they drain
+        pending = self.dirty | self._held
+        self.dirty = set()
+        self._held = set()
+        sent = 0
+        for session in pending:
+            if session.closed:
+                continue
+            if not session.send_update(now):
+                self._held.add(session)
+                continue
+            sent += 1
+            if session.engine.is_over:
+                self.close_session(session)
+        return sent
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Read action names from one client until it disconnects"""
+        session = await self.open_session_async(writer)
+        try:
+            while not session.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip().upper()
+                if not command:
+                    continue
+                if command == "QUIT":
+                    break
+                try:
+                    action = Action[command]
+                except KeyError:
+                    session.outbox.append({"type": "Error", "message": f"unknown command {command}"})
+                    self.dirty.add(session)
+                    continue
+
+                session.enqueue(action)
+                # Stop reading while the queue is full; TCP pushes back on the client
+                await session.command_space.wait()
+        except ConnectionError:
+            pass
+        finally:
+            self.close_session(session)
+
+    async def run(self) -> None:
+        """Tick forever, keeping game time in step with the wall clock"""
+        start = time.monotonic()
+        ticks = 0
+        while True:
+            ticks += 1
+            self.tick(ticks * self.tick_ms)
+            delay = start + ticks * self.tick_ms / 1000 - time.monotonic()
+            await asyncio.sleep(max(0.0, delay))
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 7777,
+                    unix_path: Optional[str] = None) -> None:
+        """Listen on TCP (or a Unix socket) and run the tick loop"""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await self.run()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Host headless Dungeons of Daggorath games")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--config", help="GameConfig JSON file")
+    parser.add_argument("--tick-ms", type=int, default=DEFAULT_TICK_MS)
+    parser.add_argument("--first-seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = GameConfig.load_from_json(args.config) if args.config else DEFAULT_CONFIG
+    server = GameServer(config, args.tick_ms, args.first_seed)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Simulation tools - Bulk headless play for balance and research
+Run modules directly, e.g. python -m simulation.batch_runner
+"""
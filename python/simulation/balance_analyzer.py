@@ -0,0 +1,312 @@
+"""
+Balance analyzer - Monte Carlo fights for every creature/weapon/shield matchup
+Thousands of duels run side by side as NumPy lanes using the original
+ATTACK, DAMAGE, HUPDAT and HSLOW arithmetic from player.cpp
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.game_config import GameConfig, DEFAULT_CONFIG
+from domain.combat import (
+    offense_factor, defense_factor, EMPTY_HAND_MAGIC_OFFENSE,
+    EMPTY_HAND_PHYS_OFFENSE, NO_SHIELD_FACTOR
+)
+from application.game_engine import ACTION_TIME, Action
+from application.heartbeat import JIFFY_MS
+from generation.game_schema import GameDefinition
+
+# Fights still running after this much game time count as draws
+DEFAULT_MAX_FIGHT_MS = 5 * 60 * 1000
+
+# Compact the lane arrays once fewer than this fraction are still fighting
+COMPACT_RATIO = 0.5
+
+
+@dataclass
+class Combatant:
+    """Fight-relevant numbers for one creature, weapon or shield"""
+    name: str
+    power: int = 0
+    attack_speed: int = 0
+    # 8-bit factors as used by Player::DAMAGE (128 = unity)
+    magic_offense: int = 0
+    phys_offense: int = 0
+    magic_defense: int = NO_SHIELD_FACTOR
+    phys_defense: int = NO_SHIELD_FACTOR
+
+
+@dataclass
+class BalanceReport:
+    """Outcome matrices indexed [creature, weapon, shield]"""
+    creatures: List[str]
+    weapons: List[str]
+    shields: List[str]
+    trials: int
+    win_probability: np.ndarray
+    loss_probability: np.ndarray
+    expected_damage: np.ndarray
+    mean_duration_ms: np.ndarray
+
+    def best_win_probability(self) -> Dict[str, float]:
+        """Each creature's win chance against the player's best gear"""
+        best = self.win_probability.max(axis=(1, 2))
+        return dict(zip(self.creatures, best.tolist()))
+
+    def unwinnable(self, threshold: float = 0.05) -> List[str]:
+        """Creatures the player beats less than threshold even with the best gear"""
+        return [name for name, p in self.best_win_probability().items() if p < threshold]
+
+    def format_table(self) -> str:
+        """Render the matrix as text, one row per matchup"""
+        header = f"{'creature':<18} {'weapon':<18} {'shield':<18} {'win%':>6} {'loss%':>6} {'dmg':>7} {'secs':>6}"
+        lines = [header, "-" * len(header)]
+        for c, creature in enumerate(self.creatures):
+            for w, weapon in enumerate(self.weapons):
+                for s, shield in enumerate(self.shields):
+                    lines.append(
+                        f"{creature:<18} {weapon:<18} {shield:<18} "
+                        f"{self.win_probability[c, w, s] * 100:>6.1f} "
+                        f"{self.loss_probability[c, w, s] * 100:>6.1f} "
+                        f"{self.expected_damage[c, w, s]:>7.1f} "
+                        f"{self.mean_duration_ms[c, w, s] / 1000:>6.1f}"
+                    )
+        return "\n".join(lines)
+
+
+def combatants_from_config(config: GameConfig) -> Tuple[List[Combatant], List[Combatant], List[Combatant]]:
+    """Creatures, weapons and shields (including none) from a GameConfig"""
+    creatures = [
+        Combatant(s.name, s.power, s.attack_speed,
+                  offense_factor(s.magic_offense), offense_factor(s.phys_offense),
+                  defense_factor(s.magic_defense), defense_factor(s.phys_defense))
+        for s in sorted(config.creatures.values(), key=lambda s: s.power)
+    ]
+
+    weapons = [Combatant("Empty Hand", magic_offense=EMPTY_HAND_MAGIC_OFFENSE,
+                         phys_offense=EMPTY_HAND_PHYS_OFFENSE)]
+    shields = [Combatant("No Shield")]
+    for obj in sorted(config.objects.values(), key=lambda o: o.value):
+        if obj.obj_type == "SWORD":
+            weapons.append(_weapon(obj.name, obj.magic_offense, obj.phys_offense))
+        elif obj.obj_type == "SHIELD":
+            shields.append(_shield(obj.name, obj.magic_defense, obj.phys_defense))
+    return creatures, weapons, shields
+
+
+def combatants_from_definition(game_def: GameDefinition) -> Tuple[List[Combatant], List[Combatant], List[Combatant]]:
+    """Creatures, weapons and shields (including none) from a GameDefinition"""
+    creatures = [
+        Combatant(c.name, c.power, c.attack_speed,
+                  offense_factor(c.magic_offense), offense_factor(c.phys_offense),
+                  defense_factor(c.magic_defense), defense_factor(c.phys_defense))
+        for c in sorted(game_def.creatures, key=lambda c: c.power)
+    ]
+
+    weapons = [Combatant("Empty Hand", magic_offense=EMPTY_HAND_MAGIC_OFFENSE,
+                         phys_offense=EMPTY_HAND_PHYS_OFFENSE)]
+    shields = [Combatant("No Shield")]
+    for item in sorted(game_def.items, key=lambda i: i.value):
+        if item.item_type == "weapon":
+            weapons.append(_weapon(item.name, item.magic_bonus, item.physical_bonus))
+        elif item.item_type == "shield":
+            shields.append(_shield(item.name, item.magic_bonus, item.physical_bonus))
+    return creatures, weapons, shields
+
+
+def _weapon(name: str, magic: int, physical: int) -> Combatant:
+    return Combatant(name, magic_offense=offense_factor(magic), phys_offense=offense_factor(physical))
+
+
+def _shield(name: str, magic: int, physical: int) -> Combatant:
+    """A shield only ever improves on bare skin (shA/shB in creature.cpp)"""
+    return Combatant(name,
+                     magic_defense=min(NO_SHIELD_FACTOR, defense_factor(magic)),
+                     phys_defense=min(NO_SHIELD_FACTOR, defense_factor(physical)))
+
+
+def _hit(rolls: np.ndarray, attack_power: np.ndarray, defense_power: np.ndarray,
+         defense_damage: np.ndarray) -> np.ndarray:
+    """Vectorised Player::ATTACK"""
+    dval = (defense_power - defense_damage) * 4
+    steps = np.where(dval >= 0, dval // np.maximum(attack_power, 1), 0)
+    t0 = 15 - np.minimum(steps, 15)
+    pidx = t0 - 3
+    adjust = np.where(pidx > 0, pidx * 10, pidx * 25)
+    return rolls + adjust - 127 >= 0
+
+
+def _damage(attack_power: np.ndarray, magic_offense: np.ndarray, phys_offense: np.ndarray,
+            magic_defense: np.ndarray, phys_defense: np.ndarray) -> np.ndarray:
+    """Vectorised Player::DAMAGE increment"""
+    magic = (((attack_power * magic_offense) >> 7) * magic_defense) >> 7
+    physical = (((attack_power * phys_offense) >> 7) * phys_defense) >> 7
+    return magic + physical
+
+
+class BalanceAnalyzer:
+    """
+    Simulates full duels for a creature x weapon x shield matrix
+    Every trial of every matchup is one lane in a set of flat arrays; each
+    iteration advances every lane to its next event (player swing,
+    creature swing or heartbeat recovery), so cost scales with the number
+    of events in the longest fight rather than with the number of fights.
+    """
+
+    def __init__(self, trials: int = 1000, player_power: Optional[int] = None,
+                 lit: bool = True, max_fight_ms: int = DEFAULT_MAX_FIGHT_MS,
+                 seed: int = 0):
+        self.trials = trials
+        self.player_power = player_power
+        self.lit = lit
+        self.max_fight_ms = max_fight_ms
+        self.seed = seed
+
+    def analyze_config(self, config: GameConfig = DEFAULT_CONFIG) -> BalanceReport:
+        """Analyze every matchup in a GameConfig"""
+        power = self.player_power or config.player.starting_power
+        return self.analyze(*combatants_from_config(config), player_power=power)
+
+    def analyze_definition(self, game_def: GameDefinition) -> BalanceReport:
+        """Analyze every matchup in a generated GameDefinition"""
+        power = self.player_power or DEFAULT_CONFIG.player.starting_power
+        return self.analyze(*combatants_from_definition(game_def), player_power=power)
+
+    def analyze(self, creatures: List[Combatant], weapons: List[Combatant],
+                shields: List[Combatant], player_power: int) -> BalanceReport:
+        """Run the Monte Carlo matrix"""
+        shape = (len(creatures), len(weapons), len(shields))
+        combos = int(np.prod(shape))
+        lanes = combos * self.trials
+
+        # Per-combo parameters broadcast to lanes (trials vary fastest)
+        c_idx, w_idx, s_idx = (a.ravel() for a in np.indices(shape))
+        combo = np.repeat(np.arange(combos), self.trials)
+
+        def per_lane(values: List[int], index: np.ndarray) -> np.ndarray:
+            return np.asarray(values, dtype=np.int64)[index][combo]
+
+        state = {
+            "lane": np.arange(lanes),
+            "c_pow": per_lane([c.power for c in creatures], c_idx),
+            "c_speed": per_lane([max(1, c.attack_speed) for c in creatures], c_idx),
+            "c_mgo": per_lane([c.magic_offense for c in creatures], c_idx),
+            "c_pho": per_lane([c.phys_offense for c in creatures], c_idx),
+            "c_mgd": per_lane([c.magic_defense for c in creatures], c_idx),
+            "c_phd": per_lane([c.phys_defense for c in creatures], c_idx),
+            "w_mgo": per_lane([w.magic_offense for w in weapons], w_idx),
+            "w_pho": per_lane([w.phys_offense for w in weapons], w_idx),
+            "s_mgd": per_lane([s.magic_defense for s in shields], s_idx),
+            "s_phd": per_lane([s.phys_defense for s in shields], s_idx),
+            "c_dam": np.zeros(lanes, dtype=np.int64),
+            "p_dam": np.zeros(lanes, dtype=np.int64),
+            "dealt": np.zeros(lanes, dtype=np.int64),
+            "fainted": np.zeros(lanes, dtype=bool),
+            "alive": np.ones(lanes, dtype=bool),
+            "next_p": np.zeros(lanes, dtype=np.int64),
+            "next_h": np.full(lanes, self._heart_delay(np.int64(player_power), np.int64(0))),
+        }
+        state["next_c"] = state["c_speed"].copy()
+
+        outcome = np.zeros(lanes, dtype=np.int8)  # 1 win, -1 loss, 0 draw
+        duration = np.full(lanes, self.max_fight_ms, dtype=np.int64)
+        damage_taken = np.zeros(lanes, dtype=np.int64)
+
+        rng = np.random.default_rng(self.seed)
+        swing_ms = ACTION_TIME[Action.ATTACK]
+        p_pow = np.int64(player_power)
+
+        while state["lane"].size:
+            s = state
+            now = np.minimum(np.minimum(s["next_p"], s["next_c"]), s["next_h"])
+            player_turn = s["next_p"] == now
+            creature_turn = ~player_turn & (s["next_c"] == now)
+            heal_turn = ~player_turn & ~creature_turn
+
+            # Player swing (skipped while fainted, but the time still passes)
+            swing = player_turn & ~s["fainted"]
+            s["p_dam"] += np.where(swing, (p_pow * ((s["w_mgo"] + s["w_pho"]) // 8)) >> 7, 0)
+            rolls = rng.integers(0, 256, size=now.size)
+            strikes = swing & _hit(rolls, p_pow, s["c_pow"], s["c_dam"])
+            if not self.lit:
+                strikes &= (rng.integers(0, 256, size=now.size) & 3) == 0
+            s["c_dam"] += np.where(strikes, _damage(p_pow, s["w_mgo"], s["w_pho"], s["c_mgd"], s["c_phd"]), 0)
+            s["next_p"] += np.where(player_turn, swing_ms, 0)
+
+            # Creature swing against the player's shield
+            rolls = rng.integers(0, 256, size=now.size)
+            bites = creature_turn & _hit(rolls, s["c_pow"], p_pow, s["p_dam"])
+            bite = np.where(bites, _damage(s["c_pow"], s["c_mgo"], s["c_pho"], s["s_mgd"], s["s_phd"]), 0)
+            s["p_dam"] += bite
+            s["dealt"] += bite
+            s["next_c"] += np.where(creature_turn, s["c_speed"], 0)
+
+            # HSLOW recovery
+            s["p_dam"] -= np.where(heal_turn, s["p_dam"] >> 6, 0)
+            s["next_h"] += np.where(heal_turn, self._heart_delay(p_pow, s["p_dam"]), 0)
+
+            # HUPDAT faint / recover
+            rate = (p_pow * 64) // (p_pow + s["p_dam"] * 2) - 18
+            s["fainted"] = np.where(s["fainted"], rate < 4, rate <= 3)
+
+            won = s["c_dam"] >= s["c_pow"]
+            lost = ~won & (s["p_dam"] >= p_pow)
+            finished = s["alive"] & (won | lost | (now >= self.max_fight_ms))
+            if finished.any():
+                ids = s["lane"][finished]
+                outcome[ids] = np.where(won[finished], 1, np.where(lost[finished], -1, 0))
+                duration[ids] = np.minimum(now[finished], self.max_fight_ms)
+                damage_taken[ids] = s["dealt"][finished]
+
+                # Finished lanes keep computing harmlessly until enough of
+                # them pile up to be worth compacting away
+                s["alive"] &= ~finished
+                live = np.count_nonzero(s["alive"])
+                if live < s["lane"].size * COMPACT_RATIO:
+                    keep = s["alive"]
+                    state = {key: value[keep] for key, value in s.items()}
+
+        outcome = outcome.reshape(shape + (self.trials,))
+        return BalanceReport(
+            creatures=[c.name for c in creatures],
+            weapons=[w.name for w in weapons],
+            shields=[s.name for s in shields],
+            trials=self.trials,
+            win_probability=(outcome == 1).mean(axis=-1),
+            loss_probability=(outcome == -1).mean(axis=-1),
+            expected_damage=damage_taken.reshape(outcome.shape).mean(axis=-1),
+            mean_duration_ms=duration.reshape(outcome.shape).mean(axis=-1),
+        )
+
+    @staticmethod
+    def _heart_delay(power, damage):
+        """Milliseconds until the next HSLOW"""
+        rate = (power * 64) // (power + damage * 2) - 18
+        return np.maximum(rate, 1) * JIFFY_MS
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Monte Carlo creature/weapon/shield balance matrix")
+    parser.add_argument("config", nargs="?", help="GameConfig JSON file (default config if omitted)")
+    parser.add_argument("--trials", type=int, default=1000, help="fights per matchup")
+    parser.add_argument("--power", type=int, default=None, help="player power (config default if omitted)")
+    parser.add_argument("--dark", action="store_true", help="fight without a lit torch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = GameConfig.load_from_json(args.config) if args.config else DEFAULT_CONFIG
+    analyzer = BalanceAnalyzer(args.trials, args.power, not args.dark, seed=args.seed)
+    report = analyzer.analyze_config(config)
+    print(report.format_table())
+
+    unwinnable = report.unwinnable()
+    if unwinnable:
+        print(f"\nUnwinnable with any gear: {', '.join(unwinnable)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Batch runner - Plays many seeded headless games across a process pool
+Aggregates win rate, time-to-death and item usage per config variant
+"""
+
+import argparse
+import os
+import statistics
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from config.game_config import GameConfig, DEFAULT_CONFIG
+from application.autoplay import ExplorerBot
+from application.game_engine import GameEngine
+
+# Two hours of game time, the longest run we care about
+DEFAULT_MAX_TIME_MS = 2 * 60 * 60 * 1000
+
+# Seeds handed to a worker per task; large enough to amortise IPC
+DEFAULT_SHARD_SIZE = 32
+
+
+class GameRecord(NamedTuple):
+    """Outcome of one seeded game"""
+    variant: str
+    seed: int
+    won: bool
+    dead: bool
+    time_ms: int
+    deepest_level: int
+    creatures_killed: int
+    torches_used: int
+    flasks_used: int
+    items_picked: int
+
+
+def play_game(config: GameConfig, seed: int, variant: str = "default",
+              max_time_ms: int = DEFAULT_MAX_TIME_MS,
+              policy: Optional[Callable[[GameEngine], int]] = None) -> GameRecord:
+    """Play one game to completion (or the time limit) and summarise it"""
+    policy = policy or ExplorerBot()
+    engine = GameEngine(config, seed)
+    while not engine.is_over and engine.now < max_time_ms:
+        engine.step(policy(engine))
+
+    stats = engine.stats
+    return GameRecord(
+        variant, seed, engine.won, engine.dead, engine.now, stats.deepest_level,
+        stats.creatures_killed, stats.torches_used, stats.flasks_used, stats.items_picked
+    )
+
+
+# Per-process state, filled in once by _init_worker so every shard a
+# worker runs reuses the same imports, configs and policy.
+_worker_configs: Dict[str, GameConfig] = {}
+_worker_max_time_ms = DEFAULT_MAX_TIME_MS
+_worker_policy: Optional[ExplorerBot] = None
+
+
+def _init_worker(configs: Dict[str, GameConfig], max_time_ms: int) -> None:
+    """Warm up a pool process"""
+    global _worker_max_time_ms, _worker_policy
+    _worker_configs.clear()
+    _worker_configs.update(configs)
+    _worker_max_time_ms = max_time_ms
+    _worker_policy = ExplorerBot()
+
+
+def _run_shard(variant: str, seeds: Tuple[int, ...]) -> List[tuple]:
+    """Play a shard of seeds, returning records as plain tuples"""
+    config = _worker_configs[variant]
+    return [
+        tuple(play_game(config, seed, variant, _worker_max_time_ms, _worker_policy))
+        for seed in seeds
+    ]
+
+
+@dataclass
+class VariantSummary:
+    """Aggregated statistics for one config variant"""
+    variant: str
+    games: int = 0
+    wins: int = 0
+    deaths: int = 0
+    total_time_ms: int = 0
+    total_levels: int = 0
+    total_kills: int = 0
+    total_torches: int = 0
+    total_flasks: int = 0
+    total_items: int = 0
+    death_times_ms: array = field(default_factory=lambda: array('q'))
+
+    def add(self, record: GameRecord) -> None:
+        """Fold one game into the running totals"""
+        self.games += 1
+        self.wins += record.won
+        self.total_time_ms += record.time_ms
+        self.total_levels += record.deepest_level
+        self.total_kills += record.creatures_killed
+        self.total_torches += record.torches_used
+        self.total_flasks += record.flasks_used
+        self.total_items += record.items_picked
+        if record.dead:
+            self.deaths += 1
+            self.death_times_ms.append(record.time_ms)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def death_rate(self) -> float:
+        return self.deaths / self.games if self.games else 0.0
+
+    @property
+    def median_time_to_death(self) -> float:
+        """Median seconds survived by players who died"""
+        if not self.death_times_ms:
+            return 0.0
+        return statistics.median(self.death_times_ms) / 1000
+
+    @property
+    def mean_time_to_death(self) -> float:
+        if not self.death_times_ms:
+            return 0.0
+        return sum(self.death_times_ms) / len(self.death_times_ms) / 1000
+
+    def mean(self, total: int) -> float:
+        return total / self.games if self.games else 0.0
+
+
+class BatchRunner:
+    """
+    Shards seeds across a process pool and streams results back
+    Each worker is initialised once with every variant config, then
+    handed shards of seeds; records return as compact tuples as soon as a
+    shard finishes, so aggregation overlaps with play.
+    """
+
+    def __init__(self, variants: Optional[Dict[str, GameConfig]] = None,
+                 workers: Optional[int] = None,
+                 max_time_ms: int = DEFAULT_MAX_TIME_MS,
+                 shard_size: int = DEFAULT_SHARD_SIZE):
+        self.variants = variants or {"default": DEFAULT_CONFIG}
+        self.workers = workers or os.cpu_count() or 1
+        self.max_time_ms = max_time_ms
+        self.shard_size = shard_size
+
+    def _shards(self, seeds: Iterable[int]) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+        seeds = list(seeds)
+        for start in range(0, len(seeds), self.shard_size):
+            shard = tuple(seeds[start:start + self.shard_size])
+            for variant in self.variants:
+                yield variant, shard
+
+    def iter_records(self, seeds: Iterable[int]) -> Iterator[GameRecord]:
+        """Yield records in completion order while games are still running"""
+        shards = self._shards(seeds)
+
+        if self.workers <= 1:
+            _init_worker(self.variants, self.max_time_ms)
+            for variant, shard in shards:
+                for record in _run_shard(variant, shard):
+                    yield GameRecord(*record)
+            return
+
+        # Keep a bounded number of shards in flight so memory stays flat
+        # no matter how many seeds are requested.
+        max_pending = self.workers * 4
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.variants, self.max_time_ms),
+        ) as pool:
+            pending: Set[Future] = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_pending:
+                    shard = next(shards, None)
+                    if shard is None:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_run_shard, *shard))
+
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for record in future.result():
+                        yield GameRecord(*record)
+
+    def run(self, seeds: Iterable[int]) -> Dict[str, VariantSummary]:
+        """Play every (variant, seed) pair and aggregate the results"""
+        summaries = {name: VariantSummary(name) for name in self.variants}
+        for record in self.iter_records(seeds):
+            summaries[record.variant].add(record)
+        return summaries
+
+
+def format_summary_table(summaries: Dict[str, VariantSummary]) -> str:
+    """Render summaries as a fixed-width text table"""
+    header = (f"{'variant':<20} {'games':>7} {'win%':>6} {'death%':>7} "
+              f"{'ttd med':>8} {'ttd avg':>8} {'depth':>6} {'kills':>6} "
+              f"{'torch':>6} {'flask':>6} {'items':>6}")
+    lines = [header, "-" * len(header)]
+    for s in summaries.values():
+        lines.append(
+            f"{s.variant:<20} {s.games:>7} {s.win_rate * 100:>6.1f} {s.death_rate * 100:>7.1f} "
+            f"{s.median_time_to_death:>8.1f} {s.mean_time_to_death:>8.1f} "
+            f"{s.mean(s.total_levels):>6.2f} {s.mean(s.total_kills):>6.2f} "
+            f"{s.mean(s.total_torches):>6.2f} {s.mean(s.total_flasks):>6.2f} "
+            f"{s.mean(s.total_items):>6.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run seeded headless games in bulk")
+    parser.add_argument("configs", nargs="*",
+                        help="GameConfig JSON files to compare (default config if omitted)")
+    parser.add_argument("--games", type=int, default=1000, help="seeds per variant")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-minutes", type=float, default=DEFAULT_MAX_TIME_MS / 60000)
+    args = parser.parse_args(argv)
+
+    variants = {"default": DEFAULT_CONFIG}
+    if args.configs:
+        variants = {
+            os.path.splitext(os.path.basename(path))[0]: GameConfig.load_from_json(path)
+            for path in args.configs
+        }
+
+    runner = BatchRunner(variants, args.workers, int(args.max_minutes * 60000))
+    summaries = runner.run(range(args.first_seed, args.first_seed + args.games))
+    print(format_summary_table(summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Observation encoder - Fixed-shape NumPy tensors of what the player knows
+Map planes from the revealed cells plus a vector of player facts, written in
+place into a caller-owned buffer
+"""
+
+import weakref
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from domain.dungeon import CellType, Level
+from domain.item import ItemType
+from application.game_engine import GameEngine
+
+# Map planes, in order
+PLANES = ("wall", "floor", "stairs", "player", "creature", "creature_health", "item")
+WALL, FLOOR, STAIRS, PLAYER, CREATURE, CREATURE_HEALTH, ITEM = range(len(PLANES))
+
+# Player facts appended after the planes, in order
+FEATURES = (
+    "power", "damage", "heart_rate", "light", "fainted", "depth",
+    "facing_north", "facing_east", "facing_south", "facing_west",
+    "right_weapon", "right_value", "left_armor", "left_value", "torch_remaining",
+    "pack_torches", "pack_flasks", "pack_weapons", "pack_armor",
+)
+
+# Creatures further than this (Chebyshev) from the player are not shown
+DEFAULT_CREATURE_RADIUS = 4
+
+# Levels whose static masks are kept; older dungeons are dropped first
+STATIC_CACHE_SIZE = 64
+
+_is_revealed = attrgetter("is_revealed")
+
+
+class _Known:
+    """What one engine's player has seen of its current level"""
+    __slots__ = ('depth', 'revealed', 'count', '__weakref__')
+
+    def __init__(self, depth: int, revealed: np.ndarray, count: int):
+        self.depth = depth
+        self.revealed = revealed
+        self.count = count
+
+    def cells_revealed(self, depth: int, cells: List[Tuple[int, int]]) -> None:
+        """GameEngine reveal observer - mark just the newly revealed cells"""
+        self.count += len(cells)
+        if depth == self.depth:
+            rows, cols = zip(*cells)
+            self.revealed[rows, cols] = True
+
+
+class ObservationEncoder:
+    """
+    Writes an observation tensor for a GameEngine
+    Layout is len(PLANES) map planes of window x window cells followed by
+    len(FEATURES) values; split() returns views of the two parts. With
+    crop set, the window is centred on the player (and turned so the
+    player faces up when rotate is set).
+
+    Cell types never change, so wall and stair masks are cached for the
+    most recent STATIC_CACHE_SIZE dungeon levels. The revealed mask is
+    read from Level.cells once per engine and level; after that the
+    engine tells the encoder which cells it uncovers as it goes.
+    """
+
+    def __init__(self, map_size: int = 32, crop: Optional[int] = None, rotate: bool = False,
+                 creature_radius: int = DEFAULT_CREATURE_RADIUS):
+        self.map_size = map_size
+        self.crop = crop
+        self.rotate = rotate
+        self.creature_radius = creature_radius
+        self.window = 2 * crop + 1 if crop else map_size
+        self.plane_size = len(PLANES) * self.window * self.window
+        self.shape = (self.plane_size + len(FEATURES),)
+
+        self._grid = np.zeros((len(PLANES), map_size, map_size), dtype=np.float32)
+        # Cropped window before it is turned, so rot90 reads a separate array
+        self._view = np.zeros((len(PLANES), self.window, self.window), dtype=np.float32)
+        self._static: Dict[Tuple[UUID, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._known: "weakref.WeakKeyDictionary[GameEngine, _Known]" = weakref.WeakKeyDictionary()
+
+    def allocate(self, count: Optional[int] = None) -> np.ndarray:
+        """A zeroed buffer for one observation, or a batch of count"""
+        shape = self.shape if count is None else (count,) + self.shape
+        return np.zeros(shape, dtype=np.float32)
+
+    def split(self, obs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the map planes and the feature vector of obs"""
+        lead = obs.shape[:-1]
+        planes = obs[..., :self.plane_size].reshape(lead + (len(PLANES), self.window, self.window))
+        return planes, obs[..., self.plane_size:]
+
+    # ------------------------------------------------------------------
+    # Map
+    # ------------------------------------------------------------------
+
+    def _static_masks(self, engine: GameEngine, depth: int, level: Level) -> Tuple[np.ndarray, np.ndarray]:
+        """Wall and stairs masks for a level, built once per dungeon"""
+        key = (engine.dungeon.id, depth)
+        masks = self._static.pop(key, None)
+        if masks is None:
+            size = self.map_size
+            walls = np.ones((size, size), dtype=bool)
+            stairs = np.zeros((size, size), dtype=bool)
+            for (row, col), cell in level.cells.items():
+                walls[row, col] = not cell.is_passable
+                stairs[row, col] = cell.cell_type == CellType.STAIRS_DOWN
+            masks = (walls, stairs)
+            if len(self._static) >= STATIC_CACHE_SIZE:
+                del self._static[next(iter(self._static))]
+        # Reinsert so the dict stays in least recently used order
+        self._static[key] = masks
+        return masks
+
+    def _revealed(self, engine: GameEngine, depth: int, level: Level) -> np.ndarray:
+        """Revealed mask for the engine's current level, kept up to date"""
+        known = self._known.get(engine)
+        if known is not None and known.depth == depth and known.count == engine.reveal_count:
+            return known.revealed
+
+        # A new engine or level, or cells revealed behind the observer's back
+        revealed = np.zeros((self.map_size, self.map_size), dtype=bool)
+        cells = level.cells
+        coords = np.fromiter(chain.from_iterable(cells), dtype=np.intp, count=2 * len(cells))
+        revealed[coords[0::2], coords[1::2]] = np.fromiter(
+            map(_is_revealed, cells.values()), dtype=bool, count=len(cells))
+        if known is None:
+            known = self._known[engine] = _Known(depth, revealed, engine.reveal_count)
+            engine.reveal_observers.add(known)
+        else:
+            known.depth, known.revealed, known.count = depth, revealed, engine.reveal_count
+        return revealed
+
+    def _fill_grid(self, engine: GameEngine) -> None:
+        grid = self._grid
+        level = engine.level
+        depth = engine.player.position.level
+        walls, stairs = self._static_masks(engine, depth, level)
+        revealed = self._revealed(engine, depth, level)
+
+        np.logical_and(revealed, walls, out=grid[WALL], casting="unsafe")
+        np.greater(revealed, walls, out=grid[FLOOR], casting="unsafe")
+        np.logical_and(revealed, stairs, out=grid[STAIRS], casting="unsafe")
+        grid[PLAYER:] = 0.0
+
+        here = engine.player.position
+        grid[PLAYER, here.row, here.col] = 1.0
+
+        radius = self.creature_radius
+        for creature in engine.creatures.get(depth, ()):
+            where = creature.position
+            if (creature.is_active and abs(where.row - here.row) <= radius
+                    and abs(where.col - here.col) <= radius):
+                grid[CREATURE, where.row, where.col] += 1.0
+                health = creature.health
+                grid[CREATURE_HEALTH, where.row, where.col] = max(
+                    grid[CREATURE_HEALTH, where.row, where.col],
+                    health.current / health.maximum if health.maximum else 0.0
+                )
+
+        for where, items in engine.floor_items.items():
+            if where.level == depth and revealed[where.row, where.col]:
+                grid[ITEM, where.row, where.col] = len(items)
+
+    def _write_planes(self, engine: GameEngine, planes: np.ndarray) -> None:
+        grid = self._grid
+        if not self.crop:
+            planes[...] = grid
+            return
+
+        crop, size = self.crop, self.map_size
+        here = engine.player.position
+        turn = int(engine.player.direction) if self.rotate else 0
+        view = self._view if turn else planes
+        view[...] = 0.0
+        top, left = here.row - crop, here.col - crop
+        r0, c0 = max(0, top), max(0, left)
+        r1, c1 = min(size, top + self.window), min(size, left + self.window)
+        view[:, r0 - top:r1 - top, c0 - left:c1 - left] = grid[:, r0:r1, c0:c1]
+        if turn:
+            # Direction counts clockwise from north; turn the view back
+            planes[...] = np.rot90(view, k=turn, axes=(1, 2))
+
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+
+    def _write_features(self, engine: GameEngine, features: np.ndarray) -> None:
+        player = engine.player
+        features[:] = 0.0
+        features[0] = engine.power
+        features[1] = engine.damage
+        features[2] = engine.heart_rate
+        features[3] = engine.light
+        features[4] = player.is_fainting
+        features[5] = player.position.level
+        features[6 + int(player.direction)] = 1.0
+
+        right, left = player.right_hand, player.left_hand
+        if right is not None and right.item_type == ItemType.WEAPON:
+            features[10] = 1.0
+            features[11] = right.value
+        if left is not None and left.item_type == ItemType.ARMOR:
+            features[12] = 1.0
+            features[13] = left.value
+        if engine.torch is not None and engine.torch.is_active:
+            features[14] = engine.torch.properties.get("remaining", 0)
+
+        for item in player.backpack:
+            item_type = item.item_type
+            if item_type == ItemType.TORCH:
+                features[15] += 1
+            elif "heal" in item.template.properties:
+                features[16] += 1
+            elif item_type == ItemType.WEAPON:
+                features[17] += 1
+            elif item_type == ItemType.ARMOR:
+                features[18] += 1
+
+    def encode(self, engine: GameEngine, out: np.ndarray) -> None:
+        """Write the observation for engine into out in place"""
+        planes, features = self.split(out)
+        self._fill_grid(engine)
+        self._write_planes(engine, planes)
+        self._write_features(engine, features)
@@ -0,0 +1,206 @@
+"""
+Vector environment - Gym-style lockstep stepping of many headless games
+One array of actions in; batched NumPy observations, rewards and done flags out
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.game_config import GameConfig, DEFAULT_CONFIG
+from domain.dungeon import CellType
+from application.game_engine import Action, GameEngine
+
+ACTION_COUNT = len(Action)
+
+# Episodes still running after this much game time are truncated
+DEFAULT_MAX_EPISODE_MS = 30 * 60 * 1000
+
+# Reward shaping
+KILL_REWARD = 1.0
+DESCEND_REWARD = 1.0
+WIN_REWARD = 10.0
+DEATH_REWARD = -10.0
+
+# Columns of the default observation, in order
+STATE_FEATURES = (
+    "row", "col", "level", "direction", "power", "damage", "heart_rate",
+    "light", "fainted", "creature_here", "items_here", "on_stairs",
+)
+
+
+class StateEncoder:
+    """Default observation - a short vector of player and cell facts"""
+
+    shape = (len(STATE_FEATURES),)
+
+    def encode(self, engine: GameEngine, out: np.ndarray) -> None:
+        """Write the observation for engine into out in place"""
+        player = engine.player
+        position = player.position
+        out[0] = position.row
+        out[1] = position.col
+        out[2] = position.level
+        out[3] = player.direction
+        out[4] = engine.power
+        out[5] = engine.damage
+        out[6] = engine.heart_rate
+        out[7] = engine.light
+        out[8] = player.is_fainting
+        out[9] = engine.creature_at(position) is not None
+        out[10] = len(engine.floor_items.get(position, ()))
+        out[11] = engine.dungeon.get_cell(position).cell_type == CellType.STAIRS_DOWN
+
+
+class VectorEnv:
+    """
+    N independent games stepped together
+    Observations, rewards and flags live in preallocated arrays that are
+    rewritten in place every step; copy them if they must outlive it.
+    Finished games reset on the spot and the step returns the first
+    observation of the new episode, with the last one of the old episode
+    kept in info["final_observation"].
+
+    Starting engines are cached per seed, and a reset forks the cached
+    one instead of generating the dungeon again. Give a finite seed_pool
+    to cycle through a fixed set of dungeons and make resets cheap.
+    """
+
+    def __init__(self, num_envs: int, config: GameConfig = DEFAULT_CONFIG,
+                 first_seed: int = 0, seed_pool: Optional[int] = None,
+                 max_episode_ms: int = DEFAULT_MAX_EPISODE_MS, encoder=None):
+        self.num_envs = num_envs
+        self.config = config
+        self.first_seed = first_seed
+        self.seed_pool = seed_pool
+        self.max_episode_ms = max_episode_ms
+        self.encoder = encoder or StateEncoder()
+
+        shape = (num_envs,) + tuple(self.encoder.shape)
+        self.observations = np.zeros(shape, dtype=np.float32)
+        self.final_observations = np.zeros(shape, dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.episode_returns = np.zeros(num_envs, dtype=np.float64)
+        self.episode_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.final_returns = np.zeros(num_envs, dtype=np.float64)
+        self.final_lengths = np.zeros(num_envs, dtype=np.int64)
+
+        # Per-env counters the reward is computed from
+        self._kills = np.zeros(num_envs, dtype=np.int64)
+        self._depth = np.zeros(num_envs, dtype=np.int64)
+        self._start_ms = np.zeros(num_envs, dtype=np.int64)
+        self._prev_kills = np.zeros(num_envs, dtype=np.int64)
+        self._prev_depth = np.zeros(num_envs, dtype=np.int64)
+        self._won = np.zeros(num_envs, dtype=bool)
+        self._dead = np.zeros(num_envs, dtype=bool)
+        self._now = np.zeros(num_envs, dtype=np.int64)
+
+        self.engines: List[GameEngine] = []
+        self.seeds = np.zeros(num_envs, dtype=np.int64)
+        self._starts: Dict[int, GameEngine] = {}
+        self._episodes = 0
+
+    # ------------------------------------------------------------------
+    # Episodes
+    # ------------------------------------------------------------------
+
+    def _next_seed(self) -> int:
+        episode = self._episodes
+        self._episodes += 1
+        if self.seed_pool:
+            episode %= self.seed_pool
+        return self.first_seed + episode
+
+    def _new_engine(self, seed: int) -> GameEngine:
+        start = self._starts.get(seed)
+        if start is None:
+            start = GameEngine(self.config, seed)
+            if not self.seed_pool:
+                # Fresh seeds never repeat, so there is nothing to cache
+                return start
+            self._starts[seed] = start
+        return start.fork()
+
+    def _reset_env(self, index: int) -> None:
+        seed = self._next_seed()
+        engine = self._new_engine(seed)
+        if index < len(self.engines):
+            self.engines[index] = engine
+        else:
+            self.engines.append(engine)
+        self.seeds[index] = seed
+        self._start_ms[index] = engine.now
+        self._prev_kills[index] = engine.stats.creatures_killed
+        self._prev_depth[index] = engine.stats.deepest_level
+        self.episode_returns[index] = 0.0
+        self.episode_lengths[index] = 0
+        self.encoder.encode(engine, self.observations[index])
+
+    def reset(self) -> np.ndarray:
+        """Start a fresh episode in every env, returns the observations"""
+        self._episodes = 0
+        for index in range(self.num_envs):
+            self._reset_env(index)
+        return self.observations
+
+    # ------------------------------------------------------------------
+    # Stepping
+    # ------------------------------------------------------------------
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Apply one action per env; returns observations, rewards, dones, info"""
+        if not self.engines:
+            self.reset()
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"expected {self.num_envs} actions, got shape {actions.shape}")
+        if actions.min() < 0 or actions.max() >= ACTION_COUNT:
+            raise ValueError(f"actions must be in [0, {ACTION_COUNT})")
+
+        kills, depth, won, dead, now = self._kills, self._depth, self._won, self._dead, self._now
+        encode = self.encoder.encode
+        observations = self.observations
+        for index, (engine, action) in enumerate(zip(self.engines, actions.tolist())):
+            engine.step(action)
+            stats = engine.stats
+            kills[index] = stats.creatures_killed
+            depth[index] = stats.deepest_level
+            won[index] = engine.won
+            dead[index] = engine.dead
+            now[index] = engine.now
+            encode(engine, observations[index])
+
+        rewards = self.rewards
+        rewards[:] = ((kills - self._prev_kills) * KILL_REWARD
+                      + (depth - self._prev_depth) * DESCEND_REWARD
+                      + won * WIN_REWARD + dead * DEATH_REWARD)
+        self._prev_kills[:] = kills
+        self._prev_depth[:] = depth
+
+        self.episode_returns += rewards
+        self.episode_lengths += 1
+        np.logical_or(won, dead, out=self.dones)
+        np.greater_equal(now - self._start_ms, self.max_episode_ms, out=self.truncated)
+        self.truncated &= ~self.dones
+        finished = self.dones | self.truncated
+
+        for index in np.flatnonzero(finished).tolist():
+            self.final_observations[index] = observations[index]
+            self.final_returns[index] = self.episode_returns[index]
+            self.final_lengths[index] = self.episode_lengths[index]
+            self._reset_env(index)
+
+        info = {
+            "truncated": self.truncated,
+            "finished": finished,
+            "final_observation": self.final_observations,
+            "episode_return": self.final_returns,
+            "episode_length": self.final_lengths,
+        }
+        return observations, rewards, finished, info
+
+    def sample_actions(self, rng: np.random.Generator) -> np.ndarray:
+        """Uniformly random actions, one per env"""
+        return rng.integers(0, ACTION_COUNT, size=self.num_envs)
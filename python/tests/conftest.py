@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The python/ directory is the import root, as it is for the scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
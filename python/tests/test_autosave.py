@@ -0,0 +1,50 @@
+import os
+import random
+
+import pytest
+
+from application.game_engine import Action, GameEngine
+from infrastructure.autosave import AutosaveError, Autosaver, load_autosave
+from infrastructure.engine_codec import encode_engine
+
+
+def test_saves_a_loadable_game_while_the_engine_keeps_stepping(tmp_path):
+    path = str(tmp_path / "game.sav")
+    engine = GameEngine(seed=8)
+    rng = random.Random(8)
+    queued, loads, last = [], 0, None
+    with Autosaver(path, interval_ms=2000) as saver:
+        for step in range(600):
+            engine.step(rng.choice(list(Action)))
+            if saver.maybe_save(engine):
+                queued.append(encode_engine(engine))
+                last = engine.fork()
+            elif step % 20 == 0 and os.path.exists(path):
+                # Whatever is on disk is a whole save of some queued state
+                assert encode_engine(load_autosave(path)) in queued
+                loads += 1
+        assert saver.flush(timeout=10)
+        assert saver.saves + saver.skipped == len(queued) > 10
+        assert encode_engine(load_autosave(path)) == queued[-1]
+
+    assert loads and os.listdir(tmp_path) == ["game.sav"]
+    # The saved game plays on like the one it was taken from
+    saved = load_autosave(path)
+    for _ in range(100):
+        action = rng.choice(list(Action))
+        saved.step(action)
+        last.step(action)
+    assert encode_engine(saved) == encode_engine(last)
+
+
+def test_write_errors_surface_on_the_game_thread(tmp_path):
+    saver = Autosaver(str(tmp_path / "missing" / "game.sav"))
+    engine = GameEngine(seed=1)
+    saver.save(engine)
+    with pytest.raises(AutosaveError):
+        saver.flush(timeout=10)
+    # Reported once; the saver keeps working
+    assert saver.flush(timeout=10)
+    saver.close()
+    with pytest.raises(AutosaveError):
+        saver.save(engine)
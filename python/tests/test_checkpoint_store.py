@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+from infrastructure.checkpoint_store import CheckpointStore
+from infrastructure.save_file import PACKED_DTYPE, SAVE_DTYPE, load_save
+
+
+def game(count, seed=0):
+    """A run of saves that change a little each time, with one level change"""
+    rng = np.random.default_rng(seed)
+    raw = rng.integers(0, 256, PACKED_DTYPE.itemsize, dtype=np.uint8)
+    record = np.frombuffer(raw.tobytes(), dtype=PACKED_DTYPE).astype(SAVE_DTYPE)[0]
+    records = []
+    for step in range(count):
+        record = record.copy()
+        record["player"]["row"] = rng.integers(0, 32)
+        record["player"]["dam"] = rng.integers(0, 1000)
+        if step == count // 2:
+            record["maze"] = rng.integers(0, 256, record["maze"].shape)
+        records.append(record)
+    return records
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "game.ckpt"
+    records = game(40)
+    with CheckpointStore(path, rebase_interval=16) as store:
+        for record in records:
+            store.append(record)
+        assert store.load(-1) == records[-1]
+
+    with CheckpointStore(path, rebase_interval=16) as store:
+        assert len(store) == len(records)
+        for index in (0, 5, 16, 39, 21, 20):
+            assert store.load(index) == records[index]
+        # Bases at least every interval, deltas in between
+        assert store.bases[0] == 0
+        assert all(b - a <= 16 for a, b in zip(store.bases, store.bases[1:] + [len(store)]))
+        assert len(store.bases) < len(records)
+
+
+def test_torn_final_record_is_dropped(tmp_path):
+    path = tmp_path / "game.ckpt"
+    records = game(10)
+    with CheckpointStore(path) as store:
+        for record in records:
+            store.append(record)
+
+    # A crash partway through writing the last checkpoint
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 3)
+
+    with CheckpointStore(path) as store:
+        assert len(store) == len(records) - 1
+        assert store.load(-1) == records[-2]
+        assert store.append(records[-1]) == len(records) - 1
+
+    with CheckpointStore(path) as store:
+        assert len(store) == len(records)
+        for index, record in enumerate(records):
+            assert store.load(index) == record
+
+
+def test_torn_base_record(tmp_path):
+    path = tmp_path / "game.ckpt"
+    with CheckpointStore(path) as store:
+        store.append(game(1)[0])
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+
+    with CheckpointStore(path) as store:
+        assert len(store) == 0
+        with pytest.raises(IndexError):
+            store.load(0)
+
+
+def test_export_writes_loadable_save(tmp_path):
+    records = game(3)
+    with CheckpointStore(tmp_path / "game.ckpt") as store:
+        for record in records:
+            store.append(record)
+        store.export(1, tmp_path / "one.dod")
+    assert load_save(tmp_path / "one.dod") == records[1]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.ckpt"
+    path.write_bytes(b"not a checkpoint store")
+    with pytest.raises(ValueError):
+        CheckpointStore(path)
+
+
+def test_rebase_interval_of_one_stores_only_bases(tmp_path):
+    with CheckpointStore(tmp_path / "game.ckpt", rebase_interval=1) as store:
+        for record in game(3):
+            store.append(record)
+        assert store.bases == [0, 1, 2]
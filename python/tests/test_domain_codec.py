@@ -0,0 +1,114 @@
+import random
+
+import numpy as np
+import pytest
+
+from application.game_engine import Action, GameEngine
+from domain.value_objects import Position
+from infrastructure.domain_codec import (
+    HEADER, DomainCodecError, World, decode_world, encode_world, load_world, map_blocks,
+    pack_value, read_blocks, save_world, unpack_value,
+)
+from infrastructure.engine_codec import decode_engine, encode_engine
+
+
+def played(seed=1, steps=60):
+    engine = GameEngine(seed=seed)
+    rng = random.Random(seed)
+    for _ in range(steps):
+        engine.step(rng.choice(list(Action)))
+    return engine
+
+
+def world_of(engine):
+    return World(engine.dungeon, engine.player, engine.creatures, engine.floor_items)
+
+
+def test_world_round_trip():
+    world = world_of(played())
+    decoded = decode_world(encode_world(world))
+    assert decoded.dungeon == world.dungeon
+    assert decoded.player == world.player
+    assert decoded.creatures == world.creatures
+    assert decoded.floor_items == world.floor_items
+
+
+def test_shared_items_stay_shared():
+    engine = played()
+    item = engine.player.backpack[0] if engine.player.backpack else engine.player.right_hand
+    spot = Position(1, 1, 0)
+    engine.floor_items[spot] = [item]
+    decoded = decode_world(encode_world(world_of(engine)))
+    assert decoded.floor_items[spot][0] is (
+        decoded.player.backpack[0] if engine.player.backpack else decoded.player.right_hand)
+
+
+def test_file_and_mapped_blocks(tmp_path):
+    world = world_of(played())
+    path = tmp_path / "world.dodw"
+    save_world(world, path)
+    assert load_world(path) == decode_world(encode_world(world))
+
+    meta, blocks = map_blocks(path)
+    expected = read_blocks(encode_world(world))
+    assert blocks.keys() == expected.keys()
+    for name, block in blocks.items():
+        assert np.array_equal(block, expected[name])
+    assert meta["dungeon"]["entrance"] == world.dungeon.entrance
+
+
+@pytest.mark.parametrize("fraction", [0.0, 0.1, 0.5, 0.9, 0.999])
+def test_truncated_file(fraction):
+    data = encode_world(world_of(played()))
+    with pytest.raises(DomainCodecError):
+        decode_world(data[:int(len(data) * fraction)])
+
+
+def test_corrupt_metadata():
+    data = bytearray(encode_world(world_of(played())))
+    _, _, _, meta_offset = HEADER.unpack_from(data)
+    rng = random.Random(0)
+    for _ in range(200):
+        damaged = bytearray(data)
+        damaged[rng.randrange(meta_offset, len(data))] = rng.randrange(256)
+        try:
+            decode_world(bytes(damaged))
+        except DomainCodecError:
+            pass
+
+
+def test_rejects_other_files():
+    data = bytearray(encode_world(world_of(played())))
+    with pytest.raises(DomainCodecError):
+        decode_world(b"JUNK" + bytes(data[4:]))
+    data[4] = 99
+    with pytest.raises(DomainCodecError):
+        decode_world(bytes(data))
+
+
+def test_tagged_values():
+    value = {"a": [1, -2, 3.5, None, True], (1, "b"): {Position(1, -2, 3), b"\x00"}, "": "é"}
+    assert unpack_value(pack_value(value)) == value
+    with pytest.raises(DomainCodecError):
+        unpack_value(pack_value(value)[:-3])
+
+
+def test_engine_round_trip_plays_on_identically():
+    engine = played(seed=3, steps=120)
+    restored = decode_engine(encode_engine(engine))
+    rng = random.Random(9)
+    for _ in range(200):
+        action = rng.choice(list(Action))
+        engine.step(action)
+        restored.step(action)
+        assert restored.now == engine.now
+        assert restored.player == engine.player
+    assert restored.stats == engine.stats
+    assert restored.creatures == engine.creatures
+
+
+def test_torn_engine_file():
+    data = encode_engine(played())
+    for end in (0, 10, len(data) // 2, len(data) - 1):
+        with pytest.raises(DomainCodecError):
+            decode_engine(data[:end])
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from application.game_engine import Action, GameEngine
+from infrastructure.event_log import EventLogReader, EventLogWriter
+
+
+def same_game(a, b):
+    return (a.now == b.now and a.player == b.player and a.creatures == b.creatures
+            and a.floor_items == b.floor_items and a.stats == b.stats
+            and a.rng.getstate() == b.rng.getstate() and a.is_over == b.is_over)
+
+
+def record(path, steps=100, interval=16, seed=6):
+    """Play a logged game, returning a live copy of the engine after every step"""
+    engine = GameEngine(seed=seed)
+    rng = random.Random(seed)
+    live = [engine.fork()]
+    with EventLogWriter(str(path), engine, snapshot_interval=interval) as log:
+        for _ in range(steps):
+            log.step(rng.choice(list(Action)))
+            live.append(engine.fork())
+    return live
+
+
+def test_seek_reproduces_the_live_engine(tmp_path):
+    path = tmp_path / "game.dodlog"
+    live = record(path)
+    reader = EventLogReader(str(path))
+    assert len(reader) == 100
+    assert reader.snapshot_steps == list(range(0, 101, 16))
+
+    for step in (0, 1, 15, 16, 17, 50, 99, 100):
+        assert same_game(reader.seek(step), live[step]), step
+
+    # A sought engine plays on exactly like the original
+    engine, original = reader.seek(40), live[40]
+    rng = random.Random(1)
+    for _ in range(50):
+        action = rng.choice(list(Action))
+        engine.step(action)
+        original.step(action)
+    assert same_game(engine, original)
+
+
+def test_seek_time_and_replay(tmp_path):
+    path = tmp_path / "game.dodlog"
+    live = record(path, steps=40)
+    reader = EventLogReader(str(path))
+
+    step = 25
+    assert same_game(reader.seek_time(reader.times[step]), live[step])
+    for offset, engine in enumerate(reader.replay(30, 35)):
+        assert same_game(engine, live[31 + offset])
+
+
+def test_torn_tail_and_foreign_files(tmp_path):
+    path = tmp_path / "game.dodlog"
+    live = record(path, steps=20, interval=8)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    reader = EventLogReader(str(path))
+    assert len(reader) == 19
+    assert same_game(reader.seek(19), live[19])
+
+    with pytest.raises(IndexError):
+        reader.seek(20)
+
+    path.write_bytes(b"DODLOG\x01\x00" + data[8:])
+    with pytest.raises(ValueError):
+        EventLogReader(str(path))
@@ -0,0 +1,89 @@
+from application.events import (
+    Event, EventBus, GameOverEvent, HeartbeatEvent, LevelChangedEvent, PlayerFaintedEvent,
+)
+
+
+def recorder(log, tag):
+    """Handler that copies out what it is given; records are reused afterwards"""
+    def handle(batch):
+        log.extend((tag, type(event).__name__, event.timestamp) for event in batch)
+    return handle
+
+
+def test_batches_follow_first_claim_and_records_claim_order():
+    bus = EventBus()
+    log = []
+    bus.subscribe(Event, recorder(log, "all"))
+    for time, kind in enumerate([LevelChangedEvent, HeartbeatEvent, LevelChangedEvent,
+                                 GameOverEvent, HeartbeatEvent]):
+        bus.claim(kind, time)
+    assert bus.flush() == 5
+    assert log == [
+        ("all", "LevelChangedEvent", 0), ("all", "LevelChangedEvent", 2),
+        ("all", "HeartbeatEvent", 1), ("all", "HeartbeatEvent", 4),
+        ("all", "GameOverEvent", 3),
+    ]
+    assert bus.flush() == 0
+
+
+def test_specific_handlers_run_before_base_ones_in_subscription_order():
+    bus = EventBus()
+    log = []
+    bus.subscribe(Event, recorder(log, "base"))
+    bus.subscribe(HeartbeatEvent, recorder(log, "first"))
+    bus.subscribe(HeartbeatEvent, recorder(log, "second"))
+    bus.claim(HeartbeatEvent, 7)
+    bus.flush()
+    assert [tag for tag, _, _ in log] == ["first", "second", "base"]
+
+
+def test_full_ring_is_delivered_early_in_order():
+    bus = EventBus(capacity=4)
+    seen = []
+    bus.subscribe(PlayerFaintedEvent, lambda batch: seen.append([e.timestamp for e in batch]))
+    for time in range(10):
+        bus.claim(PlayerFaintedEvent, time).fainted = True
+    assert seen == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    bus.flush()
+    assert seen[-1] == [8, 9]
+
+
+def test_records_are_pooled_and_fields_survive_until_dispatch():
+    bus = EventBus(capacity=2)
+    seen = []
+    bus.subscribe(LevelChangedEvent, lambda batch: seen.extend(
+        (e.from_level, e.to_level, id(e)) for e in batch))
+    for level in range(4):
+        event = bus.claim(LevelChangedEvent, level)
+        event.from_level, event.to_level = level, level + 1
+        bus.flush()
+    assert [(a, b) for a, b, _ in seen] == [(0, 1), (1, 2), (2, 3), (3, 4)]
+    # Two buffers of two records serve every claim
+    assert len({record for _, _, record in seen}) <= 4
+
+
+def test_events_published_by_handlers_land_in_the_same_flush():
+    bus = EventBus(capacity=2)
+    log = []
+    bus.subscribe(HeartbeatEvent, lambda batch: [
+        bus.claim(GameOverEvent, event.timestamp + 100) for event in batch])
+    bus.subscribe(Event, recorder(log, "all"))
+    bus.claim(HeartbeatEvent, 1)
+    bus.claim(HeartbeatEvent, 2)
+    assert bus.flush() == 4
+    assert log == [("all", "HeartbeatEvent", 1), ("all", "HeartbeatEvent", 2),
+                   ("all", "GameOverEvent", 101), ("all", "GameOverEvent", 102)]
+
+
+def test_on_pending_fires_once_per_flush_and_not_for_unheard_events():
+    calls = []
+    bus = EventBus(on_pending=lambda: calls.append(1))
+    bus.claim(HeartbeatEvent, 0)
+    assert calls == []
+    bus.subscribe(HeartbeatEvent, lambda batch: None)
+    bus.claim(HeartbeatEvent, 1)
+    bus.claim(HeartbeatEvent, 2)
+    assert calls == [1]
+    bus.flush()
+    bus.claim(HeartbeatEvent, 3)
+    assert calls == [1, 1]
@@ -0,0 +1,48 @@
+import random
+
+from application.game_engine import Action, GameEngine
+from domain.dungeon import CellType
+from domain.value_objects import Position
+from infrastructure.engine_codec import decode_engine, encode_engine
+
+
+def exercise(engine, seed, steps=300):
+    """Write to every copy-on-write structure: floor items, the torch, a
+    level's cells, another level's creatures, then play on at random"""
+    level = engine.player.position.level
+    engine.player.position = next(pos for pos in sorted(
+        engine.floor_items, key=lambda p: (p.row, p.col)) if pos.level == level)
+    engine.step(Action.GET)
+    engine.step(Action.USE_TORCH)
+    cells = engine.dungeon.levels[level].cells
+    row, col = min(rc for rc, cell in cells.items() if cell.cell_type is CellType.STAIRS_DOWN)
+    engine.player.position = Position(row, col, level)
+    engine.step(Action.CLIMB)
+    assert engine.player.position.level == level + 1
+
+    rng = random.Random(seed)
+    for _ in range(steps):
+        engine.step(rng.choice(list(Action)))
+
+
+def test_fork_and_parent_do_not_see_each_others_writes():
+    engine = GameEngine(seed=3)
+    rng = random.Random(3)
+    for _ in range(100):
+        engine.step(rng.choice([Action.WAIT, Action.TURN_LEFT, Action.MOVE]))
+
+    parent = encode_engine(engine)
+    fork = engine.fork()
+    exercise(fork, seed=1)
+    assert encode_engine(engine) == parent
+    # The fork played exactly as a wholly separate copy would have
+    twin = decode_engine(parent)
+    exercise(twin, seed=1)
+    assert encode_engine(fork) == encode_engine(twin)
+
+    child = encode_engine(fork)
+    exercise(engine, seed=2)
+    assert encode_engine(fork) == child
+    twin = decode_engine(parent)
+    exercise(twin, seed=2)
+    assert encode_engine(engine) == encode_engine(twin)
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+from daggorath import GamePool, GamePoolError
+
+# Stands in for the dod binary: publishes a DodState and never reads stdin
+FAKE_GAME = f"""#!{sys.executable}
+import os, sys, time
+sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})
+import numpy as np
+from infrastructure.native_state import STATE_DTYPE, STATE_MAGIC, STATE_SIZE, STATE_VERSION
+
+block = np.memmap(os.environ["DOD_STATE"], dtype=np.uint8, mode="w+", shape=STATE_SIZE)
+state = block.view(STATE_DTYPE)[0]
+state["magic"], state["version"], state["size"] = STATE_MAGIC, STATE_VERSION, STATE_SIZE
+state["level"] = int(os.environ.get("FAKE_LEVEL", "0"))
+while True:
+    state["seq"] += 2
+    state["time"] += 5
+    block.flush()
+    time.sleep(3600 if os.environ.get("FAKE_HANG") else 0.005)
+"""
+
+
+@pytest.fixture
+def game_path(tmp_path):
+    path = tmp_path / "dod"
+    path.write_text(FAKE_GAME)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+async def settle(pool):
+    while pool._starting:
+        await asyncio.gather(*pool._starting)
+
+
+def test_released_game_is_replaced_by_a_new_one(game_path, tmp_path):
+    async def run():
+        async with GamePool(2, game_path, state_dir=str(tmp_path), timeout=1.0) as pool:
+            async with pool.lease() as game:
+                assert pool.leased == 1
+                pid = game.transport.process.pid
+            await settle(pool)
+            assert (pool.idle, pool.spawned, pool.recycled) == (2, 3, 1)
+            assert game.transport is None
+            games = [await pool.acquire() for _ in range(2)]
+            assert pid not in [g.transport.process.pid for g in games]
+        assert os.listdir(tmp_path) == ["dod"]
+
+    asyncio.run(run())
+
+
+def test_health_check_replaces_stopped_and_exited_games(game_path, tmp_path, monkeypatch):
+    async def run():
+        pool = GamePool(2, game_path, state_dir=str(tmp_path), timeout=0.5)
+        monkeypatch.setenv("FAKE_HANG", "1")
+        await pool.start()
+        monkeypatch.delenv("FAKE_HANG")
+        try:
+            assert await pool.check_health() == 2
+            await settle(pool)
+            assert await pool.check_health() == 0
+
+            game = await pool.acquire()
+            await pool.release(game)
+            await settle(pool)
+            idle = pool._idle.get_nowait()
+            idle.transport.process.kill()
+            await idle.transport.process.wait()
+            pool._idle.put_nowait(idle)
+            assert await pool.check_health() == 1
+            assert pool.replaced == 3
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_game_not_at_the_start_is_refused(game_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_LEVEL", "3")
+
+    async def run():
+        pool = GamePool(1, game_path, state_dir=str(tmp_path), timeout=0.5)
+        with pytest.raises(GamePoolError):
+            await pool.start()
+        assert pool.spawned == 0
+
+    asyncio.run(run())
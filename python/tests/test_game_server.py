@@ -0,0 +1,25 @@
+import copy
+
+from application.game_engine import Action
+from presentation.game_server import GameServer
+
+
+def test_closed_session_leaves_no_tasks_and_no_fake_death():
+    server = GameServer()
+    first = server.open_session(seed=1)
+    first.enqueue(Action.MOVE)
+    first_tasks = server.scheduler.pending()
+    second = server.open_session(seed=2)
+
+    server.close_session(first)
+    pending = server.scheduler.pending()
+    assert first_tasks and not any(task in pending for task in first_tasks)
+    assert not first.engine.dead and not first.engine.is_over
+    assert first.id not in server.sessions
+
+    # The other game carries on alone; the closed one stays as it was
+    player, creatures = copy.deepcopy((first.engine.player, first.engine.creatures))
+    second.enqueue(Action.TURN_LEFT)
+    server.tick(5000)
+    assert (first.engine.player, first.engine.creatures) == (player, creatures)
+    assert second.engine.now == 5000 and not second.closed
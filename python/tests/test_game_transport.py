@@ -0,0 +1,56 @@
+import asyncio
+import sys
+
+import pytest
+
+from infrastructure.game_transport import MAX_OUTPUT, GameTransport, GameTransportError
+
+# Echoes commands back upper-cased after flooding stderr past the kept tail
+ECHO_GAME = f"""
+import sys
+sys.stderr.write("x" * {2 * MAX_OUTPUT} + "tail")
+sys.stderr.flush()
+for line in sys.stdin:
+    sys.stdout.write(line.upper())
+    sys.stdout.flush()
+"""
+
+
+async def wait_for(condition, timeout=10.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_commands_reach_the_game_and_output_tails_stay_bounded():
+    async def main():
+        transport = GameTransport([sys.executable, "-c", ECHO_GAME])
+        await transport.start()
+        await transport.send("look", "turn left")
+        await transport.send("attack")
+        await wait_for(lambda: transport.stdout.count("\n") == 3)
+        assert transport.stdout == "LOOK\nTURN LEFT\nATTACK\n"
+        await wait_for(lambda: transport.stderr.endswith("tail"))
+        assert len(transport.stderr) == MAX_OUTPUT
+        assert transport.running
+
+        assert await transport.close() is not None
+        assert not transport.running
+        with pytest.raises(GameTransportError, match="transport closed"):
+            await transport.send("look")
+    asyncio.run(main())
+
+
+def test_exit_fails_later_sends_with_code_and_stderr():
+    async def main():
+        transport = GameTransport([sys.executable, "-c",
+                                   "import sys; print('no dungeon', file=sys.stderr); sys.exit(3)"])
+        with pytest.raises(GameTransportError, match="not started"):
+            await transport.send("look")
+        await transport.start()
+        await wait_for(lambda: not transport.running)
+        with pytest.raises(GameTransportError, match=r"exit code 3\): no dungeon"):
+            await transport.send("look")
+        assert await transport.close() == 3
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import random
+
+import numpy as np
+
+from application.game_engine import Action, GameEngine
+from simulation.observation import ObservationEncoder
+
+
+def test_incremental_mask_matches_a_fresh_read():
+    encoder = ObservationEncoder(crop=5, rotate=True)
+    engine = GameEngine(seed=4)
+    obs, fresh = encoder.allocate(), encoder.allocate()
+    rng = random.Random(4)
+    fork = None
+    for step in range(300):
+        engine.step(rng.choice(list(Action)))
+        if step == 150:
+            fork = engine.fork()
+        for game in (engine, fork) if fork is not None else (engine,):
+            if game is fork:
+                game.step(rng.choice(list(Action)))
+            encoder.encode(game, obs)
+            ObservationEncoder(crop=5, rotate=True).encode(game, fresh)
+            assert np.array_equal(obs, fresh)
+    # Throwaway encoders do not stay subscribed
+    assert len(engine.reveal_observers) == 1 and len(fork.reveal_observers) == 1
+
+
+def test_rotated_window_faces_up():
+    engine = GameEngine(seed=5)
+    plain, turned = ObservationEncoder(crop=4), ObservationEncoder(crop=4, rotate=True)
+    for _ in range(4):
+        a, b = plain.allocate(), turned.allocate()
+        plain.encode(engine, a)
+        turned.encode(engine, b)
+        k = int(engine.player.direction)
+        assert np.array_equal(turned.split(b)[0], np.rot90(plain.split(a)[0], k=k, axes=(1, 2)))
+        engine.step(Action.TURN_RIGHT)
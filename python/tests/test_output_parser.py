@@ -0,0 +1,63 @@
+from infrastructure.output_parser import (
+    CommandEcho, CreatureHere, Damaged, HeartBeat, HeartRate, Inventory, LevelStarted,
+    OutputParser, Prompt, Status,
+)
+
+
+def screen(*rows):
+    return "\n".join(rows) + "\n"
+
+
+def status_row(left, heart, right):
+    return f"{left:<15}{heart or '  '}{right:>15}"
+
+
+def test_same_screen_twice_reports_nothing_new():
+    parser = OutputParser()
+    text = screen("", "PREPARE!", ".")
+    assert parser.feed_text(text) == [LevelStarted(), Prompt()]
+    assert parser.feed_text(text) == []
+
+
+def test_scrolled_screen_reports_only_new_rows():
+    parser = OutputParser()
+    parser.feed_text(screen("", "", "PREPARE!", "."))
+    assert parser.feed_text(screen("", "PREPARE!", ".MOVE", ".")) == [
+        CommandEcho("MOVE", False), Prompt()]
+    # The same command again, and one scrolled two rows at once
+    assert parser.feed_text(screen("PREPARE!", ".MOVE", ".MOVE", ".")) == [
+        CommandEcho("MOVE", False), Prompt()]
+    assert parser.feed_text(screen(".MOVE", ".", ".TURN ???", ".")) == [
+        CommandEcho("TURN", True), Prompt()]
+    # Typing edits the bottom row in place
+    assert parser.feed_text(screen(".MOVE", ".", ".TURN ???", ".AT")) == [
+        CommandEcho("AT", False)]
+
+
+def test_changed_listing_is_read_again_from_its_header():
+    parser = OutputParser()
+    listing = ("!" * 32, "IN THIS ROOM", "!CREATURE!", "TORCH           SHIELD")
+    first = Inventory(("TORCH", "SHIELD"), (), True)
+    assert parser.feed_text(screen(*listing, "")) == [CreatureHere(), first]
+    assert parser.feed_text(screen(*listing, "")) == []
+    assert parser.feed_text(screen(*listing, "BACKPACK", "RING", "")) == [
+        CreatureHere(), Inventory(("TORCH", "SHIELD"), ("RING",), True)]
+
+
+def test_status_row_is_tracked_apart_from_scrolling():
+    parser = OutputParser()
+    events = parser.feed_text(screen(".", status_row("TORCH", "<>", "EMPTY")), now=0.0)
+    assert events == [Prompt(), Status("TORCH", "<>", "EMPTY"), HeartBeat(False)]
+    events = parser.feed_text(screen(".", status_row("TORCH", "{}", "EMPTY")), now=1.0)
+    assert events == [Status("TORCH", "{}", "EMPTY"), HeartBeat(True)]
+
+
+def test_faster_heart_reports_damage():
+    parser = OutputParser()
+    beats = []
+    # Strong beats a second apart, then half a second, then a touch slower
+    for now in (0.0, 1.0, 2.0, 2.5, 3.0, 3.52):
+        for heart, at in (("{}", now), ("<>", now + 0.1)):
+            beats += parser.feed_text(screen(status_row("", heart, "")), now=at)
+    rates = [event for event in beats if isinstance(event, (HeartRate, Damaged))]
+    assert rates == [HeartRate(60.0), HeartRate(120.0), Damaged(120.0, 60.0), HeartRate(115.4)]
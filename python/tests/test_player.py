@@ -0,0 +1,73 @@
+from application.game_engine import GameEngine
+from application.scheduler import Scheduler
+from core.player import JIFFY_MS, Player as CorePlayer
+from domain.player import Player
+from domain.value_objects import Health
+from infrastructure.engine_codec import decode_engine, encode_engine
+
+
+def test_overexertion_faints_and_recovers_on_schedule():
+    scheduler = Scheduler()
+    player = Player(health=Health(100, 100), scheduler=scheduler)
+    player.exert(5.0)
+    assert player.is_fainting and player.heart_rate == 9.0
+
+    # Each beat eases the exertion, and the heart stops being scheduled at rest
+    scheduler.run_until(4999)
+    assert player.is_fainting
+    assert player.activity == 0.0 and player.heart_rate == 4.0
+    assert scheduler.pending() == [player.scheduled_tasks()["recover"]]
+    scheduler.run_until(5000)
+    assert not player.is_fainting
+    assert scheduler.pending() == [] and player.scheduled_tasks() == {}
+
+
+def test_early_recovery_cancels_the_scheduled_one():
+    scheduler = Scheduler()
+    player = Player(scheduler=scheduler)
+    player.faint(1.0)
+    player.recover()
+    player.faint()
+    scheduler.run_until(10000)
+    assert player.is_fainting
+
+
+def test_engine_carries_player_tasks_through_snapshots_and_forks():
+    engine = GameEngine(seed=2)
+    engine.player.faint(2.0)
+    engine.advance(500)
+    due = engine.player.scheduled_tasks()["recover"].next_time
+
+    for copy in (decode_engine(encode_engine(engine)), engine.fork()):
+        assert copy.player.scheduler is copy.scheduler
+        task = copy.player.scheduled_tasks()["recover"]
+        assert task in copy.scheduler.pending() and task.next_time == due
+    assert engine.player.scheduled_tasks()["recover"].active
+
+
+def test_core_player_beats_faster_when_loaded_and_active():
+    scheduler = Scheduler()
+    player = CorePlayer(scheduler)
+    beats = []
+    player.trigger_heartbeat = lambda: beats.append(scheduler.cur_time)
+
+    scheduler.run_until(4 * JIFFY_MS * 3)
+    assert beats == [4 * JIFFY_MS * n for n in (1, 2, 3)]
+
+    # Load and a move make the next beats come sooner: one beat of
+    # exertion on top of the weight, then the weight alone
+    player.state.weight = 10
+    player.move()
+    scheduler.run_until(1000)
+    assert beats[3:6] == [4 * JIFFY_MS * 4, 17 * JIFFY_MS, 20 * JIFFY_MS]
+
+    player.set_heartbeat(False)
+    count = len(beats)
+    scheduler.run_until(scheduler.cur_time + 1000)
+    assert len(beats) == count
+
+    player.faint(300)
+    scheduler.run_until(scheduler.cur_time + 299)
+    assert player.state.faint_counter == 300
+    scheduler.run_until(scheduler.cur_time + 1)
+    assert player.state.faint_counter == 0
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+from infrastructure import save_catalog
+from infrastructure.save_catalog import SaveCatalog
+from infrastructure.save_file import SAVE_DTYPE, write_save
+
+
+def write(directory, name, level=0, power=100, right_hand=-1, creatures=()):
+    record = np.zeros(1, dtype=SAVE_DTYPE)[0]
+    record["level"] = level
+    record["player"]["pow"] = power
+    record["player"]["lhand"] = -1
+    record["player"]["rhand"] = right_hand
+    if right_hand >= 0:
+        record["objects"][right_hand]["id"] = 13  # IRON SWORD
+    for slot, kind in enumerate(creatures):
+        record["creatures"][slot]["use"] = 1
+        record["creatures"][slot]["id"] = kind
+    path = os.path.join(directory, name)
+    write_save(record, path)
+    return path
+
+
+@pytest.fixture
+def saves(tmp_path):
+    write(tmp_path, "a.dod", level=1, power=120, creatures=(0, 0, 1))
+    write(tmp_path, "b.dod", level=2, power=300, right_hand=4)
+    write(tmp_path, "c.dod", level=2, power=90, creatures=(11,))
+    (tmp_path / "stray.dod").write_bytes(b"\r\n")
+    (tmp_path / "notes.txt").write_text("1 2 3")
+    return tmp_path
+
+
+def test_update_indexes_saves_and_records_invalid_files(saves):
+    with SaveCatalog() as catalog:
+        assert catalog.update(saves) == (3, 0)
+        assert len(catalog) == 3
+        assert catalog.query("SELECT path FROM invalid_files") == [(str(saves / "stray.dod"),)]
+
+
+def test_unchanged_files_are_not_parsed_again(saves, monkeypatch):
+    with SaveCatalog() as catalog:
+        catalog.update(saves)
+        parsed = []
+        real = save_catalog.parse_valid_saves
+
+        def spy(contents):
+            parsed.append(len(contents))
+            return real(contents)
+
+        monkeypatch.setattr(save_catalog, "parse_valid_saves", spy)
+        assert catalog.update(saves) == (0, 0)
+        assert parsed == []
+
+        write(saves, "a.dod", level=3, power=120)
+        os.utime(saves / "a.dod", ns=(1, 1))
+        assert catalog.update(saves) == (1, 0)
+        assert parsed == [1]
+        assert catalog.find(level=3) == [str(saves / "a.dod")]
+
+
+def test_deleted_files_are_removed(saves):
+    with SaveCatalog() as catalog:
+        catalog.update(saves)
+        os.unlink(saves / "b.dod")
+        os.unlink(saves / "stray.dod")
+        assert catalog.update(saves) == (0, 1)
+        assert len(catalog) == 2
+        assert catalog.query("SELECT COUNT(*) FROM invalid_files") == [(0,)]
+
+
+def test_file_deleted_while_updating(saves, monkeypatch):
+    real = SaveCatalog._read
+
+    def vanish(files):
+        os.unlink(saves / "c.dod")
+        return real(files)
+
+    with SaveCatalog() as catalog:
+        monkeypatch.setattr(SaveCatalog, "_read", staticmethod(vanish))
+        assert catalog.update(saves) == (2, 0)
+        assert sorted(catalog.find()) == [str(saves / "a.dod"), str(saves / "b.dod")]
+
+
+def test_find(saves):
+    with SaveCatalog() as catalog:
+        catalog.update(saves)
+        path = lambda name: str(saves / name)
+        assert sorted(catalog.find(level=2)) == [path("b.dod"), path("c.dod")]
+        assert catalog.find(min_power=100, max_power=200) == [path("a.dod")]
+        assert catalog.find(holding="iron sword") == [path("b.dod")]
+        assert catalog.find(creature="SPIDER", min_creatures=2) == [path("a.dod")]
+        assert catalog.find(creature="SPIDER", min_creatures=3) == []
+        assert catalog.find(creature=11) == [path("c.dod")]
+        assert len(catalog.find(limit=1)) == 1
+        with pytest.raises(KeyError):
+            catalog.find(holding="banana")
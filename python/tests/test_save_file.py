@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from infrastructure.save_file import (
+    FIELDS, ORIGINAL_FIELDS, ORIGINAL_LEVTAB, PACKED_DTYPE, SAVE_DTYPE, SaveFileError,
+    convert, format_save, from_binary, load_binary, load_save, load_saves,
+    parse_valid_saves, to_binary, view_binary, write_save,
+)
+
+
+def random_records(count, seed=0):
+    """Records with every field somewhere in its packed range"""
+    rng = np.random.default_rng(seed)
+    raw = rng.integers(0, 256, count * PACKED_DTYPE.itemsize, dtype=np.uint8)
+    return np.frombuffer(raw.tobytes(), dtype=PACKED_DTYPE).astype(SAVE_DTYPE)
+
+
+def test_text_round_trip(tmp_path):
+    records = random_records(3)
+    paths = []
+    for i, record in enumerate(records):
+        paths.append(tmp_path / f"game{i}.dod")
+        write_save(record, paths[-1], newline="\r\n" if i % 2 else "\n")
+
+    assert load_save(paths[0]) == records[0]
+    assert (load_saves(paths) == records).all()
+
+
+def test_original_save_gets_default_tail(tmp_path):
+    record = random_records(1)[0]
+    lines = format_save(record).splitlines(keepends=True)
+    path = tmp_path / "old.dod"
+    path.write_text("".join(lines[:ORIGINAL_FIELDS]))
+
+    loaded = load_save(path)
+    assert loaded["levtab"].tolist() == list(ORIGINAL_LEVTAB)
+    assert loaded["options"].tolist() == (0,) * len(SAVE_DTYPE["options"].names)
+    assert loaded["maze"].tolist() == record["maze"].tolist()
+
+
+def test_torn_text_save(tmp_path):
+    good, torn = tmp_path / "good.dod", tmp_path / "torn.dod"
+    record = random_records(1)[0]
+    write_save(record, good)
+    text = format_save(record)
+    torn.write_text(text[:len(text) // 2])
+
+    with pytest.raises(SaveFileError) as error:
+        load_saves([good, torn, good])
+    assert error.value.index == 1
+
+    records, bad = parse_valid_saves([good.read_bytes(), torn.read_bytes(), good.read_bytes()])
+    assert bad.tolist() == [1]
+    assert (records == record).all()
+
+
+@pytest.mark.parametrize("text", [b"", b"hello", b"\r\n", b"-"])
+def test_file_without_numbers(tmp_path, text):
+    path = tmp_path / "stray.dod"
+    path.write_bytes(text)
+    with pytest.raises(SaveFileError) as error:
+        load_saves([path])
+    assert error.value.index == 0
+
+    records, bad = parse_valid_saves([b"hello", text])
+    assert bad.tolist() == [0, 1]
+    assert len(records) == 0
+
+
+def test_binary_round_trip(tmp_path):
+    records = random_records(5, seed=1)
+    assert (from_binary(to_binary(records)) == records).all()
+
+    paths = []
+    for i, record in enumerate(records):
+        paths.append(tmp_path / f"game{i}.dod")
+        write_save(record, paths[-1])
+    assert convert(paths, tmp_path / "batch.bin") == len(records)
+    assert (load_binary(tmp_path / "batch.bin") == records).all()
+
+
+def test_binary_is_packed():
+    data = to_binary(random_records(4))
+    assert view_binary(data).dtype == PACKED_DTYPE
+    assert len(data) < 4 * FIELDS * 4 / 2
+
+
+@pytest.mark.parametrize("cut", [1, 8, PACKED_DTYPE.itemsize])
+def test_torn_binary_batch(cut):
+    data = to_binary(random_records(2))
+    with pytest.raises(SaveFileError):
+        from_binary(data[:-cut])
+
+
+def test_binary_rejects_other_files():
+    data = bytearray(to_binary(random_records(1)))
+    with pytest.raises(SaveFileError):
+        from_binary(b"DODX" + bytes(data[4:]))
+    data[4] = 99
+    with pytest.raises(SaveFileError):
+        from_binary(bytes(data))
+
+
+def test_out_of_range_number_is_not_wrapped():
+    records = random_records(2)
+    records[1]["player"]["pow"] = 70000
+    with pytest.raises(SaveFileError) as error:
+        to_binary(records)
+    assert error.value.index == 1
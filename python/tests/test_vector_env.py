@@ -0,0 +1,53 @@
+import numpy as np
+
+from infrastructure.engine_codec import encode_engine
+from simulation.vector_env import WIN_REWARD, StateEncoder, VectorEnv
+
+
+def encoded(engine):
+    out = np.zeros(StateEncoder.shape, dtype=np.float32)
+    StateEncoder().encode(engine, out)
+    return out
+
+
+def test_finished_games_reset_on_the_spot():
+    env = VectorEnv(3, seed_pool=2, max_episode_ms=20000)
+    env.reset()
+    assert env.seeds.tolist() == [0, 1, 0]
+    starts = {seed: encode_engine(env.engines[seed]) for seed in (0, 1)}
+    rng = np.random.default_rng(0)
+    returns, lengths = np.zeros(3), np.zeros(3, dtype=np.int64)
+    episodes, kinds = 3, set()
+
+    for step in range(400):
+        if step == 50:
+            env.engines[1].won = True
+        before = list(env.engines)
+        observations, rewards, finished, info = env.step(env.sample_actions(rng))
+        returns += rewards
+        lengths += 1
+        for index in range(3):
+            engine = env.engines[index]
+            if not finished[index]:
+                assert engine is before[index]
+                assert np.array_equal(observations[index], encoded(engine))
+                continue
+
+            old = before[index]
+            kinds.add("truncated" if info["truncated"][index] else "done")
+            assert info["truncated"][index] != (old.won or old.dead)
+            assert np.array_equal(info["final_observation"][index], encoded(old))
+            assert info["episode_return"][index] == returns[index]
+            if old.won:
+                assert rewards[index] >= WIN_REWARD
+            assert info["episode_length"][index] == lengths[index]
+            returns[index], lengths[index] = 0, 0
+
+            # A fresh episode from the pool, untouched by earlier plays of it
+            assert env.seeds[index] == episodes % 2
+            episodes += 1
+            assert engine is not old and engine.stats.attacks == 0
+            assert encode_engine(engine) == starts[env.seeds[index]]
+            assert np.array_equal(observations[index], encoded(engine))
+
+    assert kinds == {"done", "truncated"}
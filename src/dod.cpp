@@ -197,7 +197,7 @@ void printvls()
 
 Mix_Chunk *Utils::LoadSound(std::string snd)
 {
-	char fn[256];
+	char fn[MAX_FILENAME_LENGTH + 64];
 	snprintf(fn, sizeof(fn), "%s%s%s", oslink.soundDir, oslink.pathSep, snd.c_str());
 	return Mix_LoadWAV(fn);
 }
@@ -46,6 +46,13 @@ is held by Douglas J. Morgan.
 //#include <GLES2/gl2ext.h>
 #include <SDL2/SDL_mixer.h>
 
+// The shared library runs the game on a virtual clock instead
+// of the wall clock.  See dodlib.cpp.
+#ifdef DOD_LIBRARY
+Uint32 dod_ticks();
+#define SDL_GetTicks dod_ticks
+#endif
+
 // Standard headers
 #include <stdio.h>
 #include <stdlib.h>
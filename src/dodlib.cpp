@@ -0,0 +1,231 @@
+/****************************************
+Daggorath PC-Port Version 0.2.1
+Richard Hunerlach
+November 13, 2002
+
+The copyright for Dungeons of Daggorath
+is held by Douglas J. Morgan.
+(c) 1982, DynaMicro
+*****************************************/
+
+// Dungeons of Daggorath
+// PC-Port
+// Filename: dodlib.cpp
+//
+// Implementation of the C interface in dodlib.h
+//
+// Time is a virtual clock rather than SDL's: dod.h maps
+// SDL_GetTicks onto dod_ticks in the library build, and every
+// read moves the clock on one millisecond.  The busy waits in
+// the original code (sounds, fades, "PREPARE!") therefore end
+// without any real delay, and a given sequence of commands and
+// ticks always plays out the same way.
+
+#include <ctype.h>
+#include <algorithm>
+
+#include "dodlib.h"
+#include "dodstate.h"
+#include "dodgame.h"
+#include "player.h"
+#include "sched.h"
+#include "viewer.h"
+#include "oslink.h"
+#include "parser.h"
+
+extern dodGame		game;
+extern Player		player;
+extern Scheduler	scheduler;
+extern Viewer		viewer;
+extern OS_Link		oslink;
+extern Parser		parser;
+
+static Uint32		libClock = 0;
+static int			libStatus = DOD_STOPPED;
+static std::string	libText;
+
+// Refreshed whenever a call returns, so it always shows the
+// state between two commands.  dod_share_state moves it into
+// a file other processes can map.
+static DodState		localState;
+static DodState *	libState = &localState;
+
+Uint32 dod_ticks()
+{
+	return ++libClock;
+}
+
+// Runs scheduler passes until the clock reaches target, the
+// same way OS_Link::render does, but stops at death or victory
+// instead of starting the next game.
+static int runUntil(Uint32 target)
+{
+	while (libStatus == DOD_RUNNING && libClock < target)
+	{
+		if (scheduler.SCHED())
+		{
+			if (scheduler.ZFLAG == 0xFF)
+			{
+				game.LoadGame();
+				scheduler.ZFLAG = 0;
+			}
+			else if (game.hasWon)
+			{
+				libStatus = DOD_WON;
+			}
+			else
+			{
+				libStatus = DOD_DEAD;
+			}
+		}
+	}
+	return libStatus;
+}
+
+extern "C" {
+
+int dod_init(const char * assetDir)
+{
+	if (libStatus != DOD_STOPPED)
+	{
+		return DOD_ERROR;
+	}
+	// Asset paths are resolved against assetDir; the working
+	// directory belongs to the host program and is left alone
+	if (assetDir != NULL && !oslink.setAssetDir(assetDir))
+	{
+		return DOD_ERROR;
+	}
+	if (!oslink.initLibrary())
+	{
+		return DOD_ERROR;
+	}
+
+	// From COMINI, which also plays the title and the demo
+	viewer.VXSCAL = 0x80;
+	viewer.VYSCAL = 0x80;
+	viewer.VXSCALf = 128.0f;
+	viewer.VYSCALf = 128.0f;
+	game.AUTFLG = false;
+	return dod_restart();
+}
+
+int dod_restart()
+{
+	if (libStatus == DOD_STOPPED && oslink.sdlWindow == 0)
+	{
+		return DOD_ERROR;
+	}
+	libStatus = DOD_RUNNING;
+	game.Restart();
+	publishState(libState);
+	return libStatus;
+}
+
+int dod_step(const char * command)
+{
+	int len = 0;
+
+	if (libStatus != DOD_RUNNING)
+	{
+		return libStatus;
+	}
+	while (command[len] != '\0')
+	{
+		++len;
+	}
+	if (len > DOD_MAX_COMMAND)
+	{
+		return DOD_ERROR;
+	}
+
+	for (int ctr = 0; ctr < len; ++ctr)
+	{
+		parser.KBDPUT((dodBYTE) toupper((unsigned char) command[ctr]));
+	}
+	parser.KBDPUT(parser.C_CR);
+
+	// The player task reads and runs the whole line in one pass
+	while (libStatus == DOD_RUNNING && parser.KBDHDR != parser.KBDTAL)
+	{
+		runUntil(libClock + 1);
+	}
+	publishState(libState);
+	return libStatus;
+}
+
+int dod_tick(unsigned int ms)
+{
+	runUntil(libClock + ms);
+	publishState(libState);
+	return libStatus;
+}
+
+int dod_status()
+{
+	return libStatus;
+}
+
+unsigned int dod_time()
+{
+	return libClock;
+}
+
+const char * dod_text(int area)
+{
+	TXB * txb;
+	switch (area)
+	{
+	case DOD_TEXT_STATUS:
+		txb = &viewer.TXTSTS;
+		break;
+	case DOD_TEXT_EXAMINE:
+		txb = &viewer.TXTEXA;
+		break;
+	default:
+		txb = &viewer.TXTPRI;
+		break;
+	}
+
+	// Rows are 32 characters with no terminators between them.
+	// TXTSCR blanks a scrolled-in row with zeros, which would
+	// cut the string short for a C caller, so they become spaces.
+	libText.clear();
+	for (int row = 0; row < txb->len; row += 32)
+	{
+		std::string line(txb->area + row, 32);
+		std::replace(line.begin(), line.end(), '\0', ' ');
+		line.erase(line.find_last_not_of(' ') + 1);
+		libText.append(line);
+		libText.append(1, '\n');
+	}
+	return libText.c_str();
+}
+
+const DodState * dod_state()
+{
+	return libState;
+}
+
+int dod_share_state(const char * path)
+{
+	DodState * shared = openStateFile(path);
+	if (shared == NULL)
+	{
+		return DOD_ERROR;
+	}
+	publishState(shared);
+	libState = shared;
+	return libStatus;
+}
+
+void dod_teardown()
+{
+	if (oslink.sdlWindow != 0)
+	{
+		oslink.quitLibrary();
+	}
+	libStatus = DOD_STOPPED;
+}
+
+}
@@ -0,0 +1,61 @@
+/****************************************
+Daggorath PC-Port Version 0.2.1
+Richard Hunerlach
+November 13, 2002
+
+The copyright for Dungeons of Daggorath
+is held by Douglas J. Morgan.
+(c) 1982, DynaMicro
+*****************************************/
+
+// Dungeons of Daggorath
+// PC-Port
+// Filename: dodlib.h
+//
+// C interface for running the game inside another program,
+// such as the Python tools through ctypes.  It is compiled
+// into the shared library (make lib) with DOD_LIBRARY defined.
+//
+// The game lives in global objects, so a process holds one
+// game at a time.
+
+#ifndef DOD_LIBRARY_HEADER
+#define DOD_LIBRARY_HEADER
+
+// Game status, returned by most calls
+#define DOD_ERROR	-1
+#define DOD_RUNNING	0
+#define DOD_DEAD	1
+#define DOD_WON		2
+#define DOD_STOPPED	3
+
+// Text areas for dod_text
+#define DOD_TEXT_PRIMARY	0
+#define DOD_TEXT_STATUS		1
+#define DOD_TEXT_EXAMINE	2
+
+// Longest command line the keyboard buffer holds
+#define DOD_MAX_COMMAND		30
+
+struct DodState;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+int				dod_init(const char * assetDir);	// start a new game
+int				dod_step(const char * command);		// type one command line
+int				dod_tick(unsigned int ms);			// let game time pass
+int				dod_restart();						// new game after death or victory
+int				dod_status();
+unsigned int	dod_time();							// virtual clock, in ms
+const char *	dod_text(int area);					// screen text, one line per row
+const DodState *	dod_state();					// see dodstate.h
+int				dod_share_state(const char * path);	// also copy the state into a file
+void			dod_teardown();
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif // DOD_LIBRARY_HEADER
@@ -0,0 +1,166 @@
+/****************************************
+Daggorath PC-Port Version 0.2.1
+Richard Hunerlach
+November 13, 2002
+
+The copyright for Dungeons of Daggorath
+is held by Douglas J. Morgan.
+(c) 1982, DynaMicro
+*****************************************/
+
+// Dungeons of Daggorath
+// PC-Port
+// Filename: dodstate.cpp
+//
+// Implementation of the state copy described in dodstate.h
+
+#include <atomic>
+#include <string.h>
+
+#if !defined(_WIN32) && !defined(__EMSCRIPTEN__)
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#define DOD_STATE_FILES
+#endif
+
+#include "dodstate.h"
+#include "dodgame.h"
+#include "player.h"
+#include "object.h"
+#include "creature.h"
+#include "dungeon.h"
+#include "sched.h"
+
+extern dodGame		game;
+extern RNG			rng;
+extern Player		player;
+extern Object		object;
+extern Creature		creature;
+extern Dungeon		dungeon;
+extern Scheduler	scheduler;
+
+// The Python side depends on these exact sizes
+static_assert(sizeof(DodCreatureState) == 28, "DodCreatureState layout changed");
+static_assert(sizeof(DodObjectState) == 20, "DodObjectState layout changed");
+static_assert(sizeof(DodPlayerState) == 36, "DodPlayerState layout changed");
+static_assert(sizeof(DodState) == 3424, "DodState layout changed");
+
+void publishState(DodState * state)
+{
+	int ctr;
+
+	state->seq++;
+	std::atomic_thread_fence(std::memory_order_release);
+
+	state->magic = DOD_STATE_MAGIC;
+	state->version = DOD_STATE_VERSION;
+	state->size = sizeof(DodState);
+	state->time = scheduler.curTime;
+	state->level = game.LEVEL;
+	state->won = game.hasWon;
+	state->frozen = creature.FRZFLG;
+	state->pad = 0;
+	for (ctr = 0; ctr < 3; ++ctr)
+	{
+		state->seed[ctr] = rng.SEED[ctr];
+	}
+	state->carry = rng.carry;
+
+	DodPlayerState & p = state->player;
+	p.lhand = player.PLHAND;
+	p.rhand = player.PRHAND;
+	p.torch = player.PTORCH;
+	p.bagptr = player.BAGPTR;
+	p.pow = player.PPOW;
+	p.dam = player.PDAM;
+	p.objwt = player.POBJWT;
+	p.mgo = player.PMGO;
+	p.mgd = player.PMGD;
+	p.pho = player.PPHO;
+	p.phd = player.PPHD;
+	p.row = player.PROW;
+	p.col = player.PCOL;
+	p.dir = player.PDIR;
+	p.rlite = player.PRLITE;
+	p.mlite = player.PMLITE;
+	p.faint = player.FAINT;
+	p.heartf = player.HEARTF;
+	p.heartc = player.HEARTC;
+	p.heartr = player.HEARTR;
+	p.hearts = player.HEARTS;
+
+	memcpy(state->maze, dungeon.MAZLND, sizeof(state->maze));
+
+	for (ctr = 0; ctr < 32; ++ctr)
+	{
+		const CCB & ccb = creature.CCBLND[ctr];
+		DodCreatureState & c = state->creatures[ctr];
+		c.tmv = ccb.P_CCTMV;
+		c.tat = ccb.P_CCTAT;
+		c.obj = ccb.P_CCOBJ;
+		c.pow = ccb.P_CCPOW;
+		c.dam = ccb.P_CCDAM;
+		c.mgo = ccb.P_CCMGO;
+		c.mgd = ccb.P_CCMGD;
+		c.pho = ccb.P_CCPHO;
+		c.phd = ccb.P_CCPHD;
+		c.use = ccb.P_CCUSE;
+		c.id = ccb.creature_id;
+		c.dir = ccb.P_CCDIR;
+		c.row = ccb.P_CCROW;
+		c.col = ccb.P_CCCOL;
+		memset(c.pad, 0, sizeof(c.pad));
+	}
+
+	for (ctr = 0; ctr < 72; ++ctr)
+	{
+		const OCB & ocb = object.OCBLND[ctr];
+		DodObjectState & o = state->objects[ctr];
+		o.ptr = ocb.P_OCPTR;
+		o.xx0 = ocb.P_OCXX0;
+		o.xx1 = ocb.P_OCXX1;
+		o.xx2 = ocb.P_OCXX2;
+		o.row = ocb.P_OCROW;
+		o.col = ocb.P_OCCOL;
+		o.lvl = ocb.P_OCLVL;
+		o.own = ocb.P_OCOWN;
+		o.id = ocb.obj_id;
+		o.type = ocb.obj_type;
+		o.reveal = ocb.obj_reveal_lvl;
+		o.mgo = ocb.P_OCMGO;
+		o.pho = ocb.P_OCPHO;
+		o.pad = 0;
+	}
+
+	std::atomic_thread_fence(std::memory_order_release);
+	state->seq++;
+}
+
+DodState * openStateFile(const char * path)
+{
+#ifdef DOD_STATE_FILES
+	int fd = open(path, O_RDWR | O_CREAT, 0644);
+	if (fd < 0)
+	{
+		return NULL;
+	}
+	if (ftruncate(fd, sizeof(DodState)) != 0)
+	{
+		close(fd);
+		return NULL;
+	}
+	void * region = mmap(NULL, sizeof(DodState), PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+	close(fd);
+	if (region == MAP_FAILED)
+	{
+		return NULL;
+	}
+	DodState * state = (DodState *) region;
+	// Start from an even sequence whatever a previous run left
+	state->seq &= ~1u;
+	return state;
+#else
+	return NULL;
+#endif
+}
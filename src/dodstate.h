@@ -0,0 +1,127 @@
+/****************************************
+Daggorath PC-Port Version 0.2.1
+Richard Hunerlach
+November 13, 2002
+
+The copyright for Dungeons of Daggorath
+is held by Douglas J. Morgan.
+(c) 1982, DynaMicro
+*****************************************/
+
+// Dungeons of Daggorath
+// PC-Port
+// Filename: dodstate.h
+//
+// Flat copy of the game state for other programs to read
+// without going through the screen text.  The layout below
+// is fixed: every field has an explicit size, the structs
+// have no hidden padding, and numbers are in the host's byte
+// order.  python/infrastructure/native_state.py mirrors it;
+// bump DOD_STATE_VERSION whenever it changes.
+//
+// The running game (when DOD_STATE names a file) or the
+// shared library (dod_state) copies the globals in here.
+// Readers use seq as a sequence lock: it is odd while a copy
+// is being written, so a reader that sees the same even value
+// before and after reading has a consistent state.
+
+#ifndef DOD_STATE_HEADER
+#define DOD_STATE_HEADER
+
+#include <stdint.h>
+
+#define DOD_STATE_MAGIC		0x53444F44	// "DODS"
+#define DOD_STATE_VERSION	1
+
+// Creature control block (CCB), 28 bytes
+struct DodCreatureState
+{
+	int32_t		tmv;		// P_CCTMV - move delay
+	int32_t		tat;		// P_CCTAT - attack delay
+	int32_t		obj;		// P_CCOBJ - first carried object, -1 for none
+	uint16_t	pow;		// P_CCPOW
+	uint16_t	dam;		// P_CCDAM
+	uint8_t		mgo;		// P_CCMGO
+	uint8_t		mgd;		// P_CCMGD
+	uint8_t		pho;		// P_CCPHO
+	uint8_t		phd;		// P_CCPHD
+	uint8_t		use;		// P_CCUSE - nonzero while alive
+	uint8_t		id;			// creature type, Creature::CRT_*
+	uint8_t		dir;		// P_CCDIR
+	uint8_t		row;		// P_CCROW
+	uint8_t		col;		// P_CCCOL
+	uint8_t		pad[3];
+};
+
+// Object control block (OCB), 20 bytes
+struct DodObjectState
+{
+	int32_t		ptr;		// P_OCPTR - next object in the chain, -1 for none
+	uint16_t	xx0;		// P_OCXX0-2 - torch timers, ring charges, etc.
+	uint16_t	xx1;
+	uint16_t	xx2;
+	uint8_t		row;		// P_OCROW
+	uint8_t		col;		// P_OCCOL
+	uint8_t		lvl;		// P_OCLVL
+	uint8_t		own;		// P_OCOWN - nonzero when carried
+	uint8_t		id;			// Object::OBJ_*
+	uint8_t		type;		// Object::OBJT_*
+	uint8_t		reveal;		// obj_reveal_lvl
+	uint8_t		mgo;		// P_OCMGO
+	uint8_t		pho;		// P_OCPHO
+	uint8_t		pad;
+};
+
+// Player, 36 bytes
+struct DodPlayerState
+{
+	int32_t		lhand;		// PLHAND - object index, -1 for empty
+	int32_t		rhand;		// PRHAND
+	int32_t		torch;		// PTORCH - lit torch, -1 for none
+	int32_t		bagptr;		// BAGPTR - first backpack object, -1 for none
+	uint16_t	pow;		// PPOW
+	uint16_t	dam;		// PDAM - dead when greater than pow
+	uint16_t	objwt;		// POBJWT - weight carried
+	uint8_t		mgo;		// PMGO
+	uint8_t		mgd;		// PMGD
+	uint8_t		pho;		// PPHO
+	uint8_t		phd;		// PPHD
+	uint8_t		row;		// PROW
+	uint8_t		col;		// PCOL
+	uint8_t		dir;		// PDIR - 0 north, 1 east, 2 south, 3 west
+	uint8_t		rlite;		// PRLITE
+	uint8_t		mlite;		// PMLITE
+	uint8_t		faint;		// FAINT
+	uint8_t		heartf;		// HEARTF
+	uint8_t		heartc;		// HEARTC
+	uint8_t		heartr;		// HEARTR
+	uint8_t		hearts;		// HEARTS
+};
+
+struct DodState
+{
+	uint32_t	magic;		// DOD_STATE_MAGIC
+	uint32_t	version;	// DOD_STATE_VERSION
+	uint32_t	size;		// sizeof(DodState)
+	uint32_t	seq;		// sequence lock, see above
+	uint32_t	time;		// game clock, in ms
+	uint8_t		level;		// game.LEVEL
+	uint8_t		won;		// game.hasWon
+	uint8_t		frozen;		// FRZFLG - creatures frozen
+	uint8_t		pad;
+	uint8_t		seed[3];	// RNG state
+	uint8_t		carry;
+	DodPlayerState		player;
+	uint8_t				maze[1024];		// MAZLND, row * 32 + col
+	DodCreatureState	creatures[32];	// CCBLND
+	DodObjectState		objects[72];	// OCBLND
+};
+
+// Copies the game globals into state
+void publishState(DodState * state);
+
+// Maps the file at path (created or resized as needed) and
+// returns the state in it, or NULL where that is not possible
+DodState * openStateFile(const char * path);
+
+#endif // DOD_STATE_HEADER
@@ -29,6 +29,7 @@ using namespace std;
 #include "object.h"
 #include "creature.h"
 #include "enhanced.h"
+#include "dodstate.h"
 
 extern Creature		creature;
 extern Object		object;
@@ -44,7 +45,8 @@ extern Parser		parser;
 OS_Link::OS_Link() : width(0), height(0), bpp(0), flags(0),
 					 audio_rate(44100), audio_format(AUDIO_S16),
 					 audio_channels(2), audio_buffers(512),
-					 gamefileLen(50), keylayout(0), keyLen(256)
+					 gamefileLen(sizeof(gamefile)), keylayout(0), keyLen(256),
+					 sharedState(NULL), statePublished(0)
 {
 #define MACOSX
 #ifdef MACOSX
@@ -53,6 +55,7 @@ OS_Link::OS_Link() : width(0), height(0), bpp(0), flags(0),
 	strcpy(pathSep,"\\");
 #endif
 
+	assetPrefix[0] = '\0';
 	strcpy(confDir, "conf");
 	strcpy(soundDir, "sound");
 	strcpy(savedDir, "saved");
@@ -100,6 +103,13 @@ void OS_Link::render() {
 		    }
 	    }
     }
+
+	// At most one copy per millisecond of game time
+	if (sharedState != NULL && scheduler.curTime != statePublished)
+	{
+		publishState(sharedState);
+		statePublished = scheduler.curTime;
+	}
 }
 
 void main_game_loop(void* arg) {
@@ -125,6 +135,17 @@ void OS_Link::init()
 {
 	loadOptFile();
 
+	// Lets other programs follow the game, see dodstate.h
+	const char * statePath = getenv("DOD_STATE");
+	if (statePath != NULL && statePath[0] != '\0')
+	{
+		sharedState = openStateFile(statePath);
+		if (sharedState == NULL)
+		{
+			fprintf(stderr, "Unable to share state in %s\n", statePath);
+		}
+	}
+
 	if(SDL_Init(SDL_INIT_VIDEO | SDL_INIT_TIMER | SDL_INIT_AUDIO) < 0)
 	{
 		fprintf(stderr, "Video initialization failed: %s\n", SDL_GetError());
@@ -275,6 +296,80 @@ void OS_Link::init()
 
 
 
+// Sets up for running inside another program through the
+// interface in dodlib.cpp.  The renderer still needs a GL
+// context, so a hidden window is created, but audio is left
+// closed: every sound then fails to start and the loops that
+// wait for sounds to finish fall straight through.  There is
+// no main loop; the caller drives the scheduler.
+bool OS_Link::initLibrary()
+{
+	loadOptFile();
+
+	if(SDL_Init(SDL_INIT_VIDEO | SDL_INIT_TIMER) < 0)
+	{
+		fprintf(stderr, "Video initialization failed: %s\n", SDL_GetError());
+		return false;
+	}
+
+	creature.LoadSounds();
+	object.LoadSounds();
+	scheduler.LoadSounds();
+	player.LoadSounds();
+
+	// Nothing is shown, so draw at the original resolution,
+	// which keeps software rendering cheap
+	FullScreen = false;
+	width = 256;
+	sdlWindow = SDL_CreateWindow("DOD", SDL_WINDOWPOS_UNDEFINED, SDL_WINDOWPOS_UNDEFINED, width, (int) (width * 0.75), SDL_WINDOW_OPENGL|SDL_WINDOW_HIDDEN);
+	if(sdlWindow == 0){
+		fprintf(stderr, "Window creation failed: %s\n", SDL_GetError());
+		SDL_Quit();
+		return false;
+	}
+
+	sdlGlContext = SDL_GL_CreateContext(sdlWindow);
+	if(sdlGlContext == 0){
+		fprintf(stderr, "OpenGL context creation failed: %s\n", SDL_GetError());
+		SDL_DestroyWindow(sdlWindow);
+		SDL_Quit();
+		return false;
+	}
+
+	viewer.setVidInv(false);
+	changeVideoRes(width);
+	memset(keys, parser.C_SP, keyLen);
+	return true;
+}
+
+// Makes the conf, sound and saved directories relative to dir
+// rather than to the working directory, which belongs to the
+// host program.  Called before initLibrary reads the options.
+bool OS_Link::setAssetDir(const char * dir)
+{
+	char prefix[MAX_FILENAME_LENGTH + 1];
+	int len = snprintf(prefix, sizeof(prefix), "%s%s", dir, pathSep);
+
+	// Leave room for the longest of conf, sound and saved
+	if (len < 0 || len + 5 > MAX_FILENAME_LENGTH)
+	{
+		return false;
+	}
+	strcpy(assetPrefix, prefix);
+	snprintf(confDir, sizeof(confDir), "%sconf", assetPrefix);
+	snprintf(soundDir, sizeof(soundDir), "%ssound", assetPrefix);
+	snprintf(savedDir, sizeof(savedDir), "%ssaved", assetPrefix);
+	return true;
+}
+
+void OS_Link::quitLibrary()
+{
+	SDL_GL_DeleteContext(sdlGlContext);
+	SDL_DestroyWindow(sdlWindow);
+	sdlWindow = 0;
+	SDL_Quit();
+}
+
 // Used to check for keystrokes and application termination
 void OS_Link::process_events()
 {
@@ -1021,7 +1116,7 @@ void OS_Link::menu_string(char *newString, char *title, int maxLength)
 void OS_Link::loadOptFile(void)
  {
  char     inputString[80];
- char     fn[256];
+ char     fn[MAX_FILENAME_LENGTH + 16];
  int      in;
  ifstream fin;
  char *   breakPoint;
@@ -1091,7 +1186,7 @@ void OS_Link::loadOptFile(void)
     }
    else if(!strcmp(inputString, "saveDirectory"))
     {
-    strncpy(savedDir, "saved", MAX_FILENAME_LENGTH);
+    snprintf(savedDir, sizeof(savedDir), "%ssaved", assetPrefix);
     }
    else if(!strcmp(inputString, "fullScreen"))
     {
@@ -1149,7 +1244,7 @@ void OS_Link::loadOptFile(void)
 bool OS_Link::saveOptFile(void)
  {
  ofstream fout;
- char     fn[MAX_FILENAME_LENGTH];
+ char     fn[MAX_FILENAME_LENGTH + 16];
 
  snprintf(fn, sizeof(fn), "%s%s%s", confDir, pathSep, "opts.ini");
 
@@ -1206,7 +1301,7 @@ void OS_Link::loadDefaults(void)
  volumeLevel = MIX_MAX_VOLUME;
  creature.creSpeedMul = 200;
  creature.UpdateCreSpeed();
- strcpy(savedDir, "saved");
+ snprintf(savedDir, sizeof(savedDir), "%ssaved", assetPrefix);
  FullScreen = false;
  width = 1024;
  creatureRegen = 5;
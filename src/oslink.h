@@ -26,12 +26,14 @@ is held by Douglas J. Morgan.
 #include <SDL2/SDL_opengl.h>
 
 
- // Arbitrary Length of 80, maybe be changed if needed
-#define MAX_FILENAME_LENGTH 80
+ // Room for an absolute asset directory (see setAssetDir)
+#define MAX_FILENAME_LENGTH 256
 
 // Define a main game loop to handle set_main_game_loop_arg
 void main_game_loop(void* arg);
 
+struct DodState;
+
 class OS_Link
 {
 public:
@@ -47,18 +49,22 @@ public:
     void send_input(char * keys); // Send keys from external interfaces
     void stop_demo(); // Stop the demo / start game
     void render(void);
+	bool initLibrary();		// setup for in-process use (dodlib.cpp)
+	bool setAssetDir(const char * dir);	// find conf, sound and saved under dir
+	void quitLibrary();		// releases what initLibrary acquired
 
 	// Public Data Fields
 	int		width;	// actual screen width after video setup
 	int		height;	// same for height
 	int     volumeLevel; // Volume level
 
-	char	gamefile[50];
+	char	gamefile[MAX_FILENAME_LENGTH + 40];
 	int		gamefileLen;
 	char	pathSep[2];
 	FILE *	fptr;
-	char	confDir[5];
-	char	soundDir[6];
+	char	assetPrefix[MAX_FILENAME_LENGTH + 1];	// asset directory and separator, or empty
+	char	confDir[MAX_FILENAME_LENGTH + 1];
+	char	soundDir[MAX_FILENAME_LENGTH + 1];
 	char	savedDir[MAX_FILENAME_LENGTH + 1];
 	dodBYTE	keys[256];
 	int		keylayout;	// 0 = QWERTY, 1 = Dvorak
@@ -70,6 +76,7 @@ public:
 	int		audio_buffers;
 
 	SDL_Window * sdlWindow;
+	DodState *	sharedState;	// state file named by DOD_STATE, if any
 
 private:
 	// Internal Implementation
@@ -93,6 +100,7 @@ private:
 	int  flags;	    // SDL flags
 	bool FullScreen;    // FullScreen
 	int  creatureRegen; // Creature Regen Speed
+	Uint32 statePublished;	// game time of the last sharedState copy
 };
 
 #endif // OS_LINK_HEADER
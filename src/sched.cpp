@@ -424,6 +424,11 @@ void Scheduler::winFadeLoop()
 // Used by wizard fade in/out function
 bool Scheduler::keyCheck()
 {
+#ifdef DOD_LIBRARY
+	// No one is watching the fades when the game runs as a
+	// library, so act as if a key was pressed to skip them
+	return true;
+#else
 	SDL_Event event;
 	while(SDL_PollEvent(&event))
 	{
@@ -441,6 +446,7 @@ bool Scheduler::keyCheck()
 		}
 	}
 	return false;
+#endif
 }
 
 // Used by wizard fade in/out function